@@ -1,1754 +1,6804 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import logging
-import mido
-from mido import MidiFile
-import threading
-import socket
-import json
-import re
-import time
-import os
-import random
-import queue
-from datetime import datetime, timedelta
-import asyncio
-from pythonosc import dispatcher, osc_server, udp_client
-
-# --------------------- Logging Configuration --------------------- #
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    datefmt="%H:%M:%S",
-)
-
-# --------------------- Tooltip Class Definition --------------------- #
-class Tooltip:
-    """Creates a tooltip for a widget when the mouse hovers over it."""
-    def __init__(self, widget, text: str = "widget info"):
-        self.widget = widget
-        self.text = text
-        self.tooltip_window = None
-        self.widget.bind("<Enter>", self.show_tooltip)
-        self.widget.bind("<Leave>", self.hide_tooltip)
-
-    def show_tooltip(self, event=None) -> None:
-        if self.tooltip_window or not self.text:
-            return
-        self.tooltip_window = tw = tk.Toplevel(self.widget)
-        tw.wm_overrideredirect(True)
-        x_offset = self.widget.winfo_rootx() + 20
-        y_offset = self.widget.winfo_rooty() + 20
-        tw.wm_geometry(f"+{x_offset}+{y_offset}")
-        label = tk.Label(
-            tw,
-            text=self.text,
-            justify="left",
-            background="#333333",
-            foreground="#FFFFFF",
-            relief="solid",
-            borderwidth=1,
-            font=("tahoma", 8, "normal"),
-        )
-        label.pack(ipadx=1, ipady=1)
-
-    def hide_tooltip(self, event=None) -> None:
-        if self.tooltip_window:
-            self.tooltip_window.destroy()
-        self.tooltip_window = None
-
-# ----------------------- OSCMIDIApp Class ---------------------------- #
-class OSCMIDIApp:
-    CONFIG_FILE = "config.json"
-    MAX_LOG_MESSAGES = 100
-
-    def __init__(self, master: tk.Tk) -> None:
-        self.master = master
-        self.master.title("OSC2MIDI - Live Edition (Dark)")
-        self.setup_theme()
-
-        # Default MIDI channel (1-indexed)
-        self.default_midi_channel = 1
-
-        # Playback/Playlist State
-        self.original_playlist = []
-        self.playlist = []
-        self.current_index = 0
-        self.playing = False
-        self.looping = True
-        self.randomize = False
-
-        # Control Events
-        self.pause_event = threading.Event()
-        self.skip_event = threading.Event()
-        self.back_event = threading.Event()
-        self.previous_event = threading.Event()
-        self.skip_to_event = threading.Event()
-        self.skip_to_index = None
-
-        # BPM / Tempo
-        self.default_bpm = 120.0
-        self.user_bpm = 120.0
-        self.ticks_per_beat = 480
-        self.bpm_tick_times = []
-        self.alpha = 0.2
-        self.smoothed_bpm = self.default_bpm
-        self.bpm_locked = False
-        self.ignore_bpm_var = tk.BooleanVar(value=True)
-
-        # Sync BPM
-        self.sync_var = tk.BooleanVar(value=False)
-        self.sync_stop_event = threading.Event()
-        self.sync_thread = None
-
-        # Logging
-        self.log_queue = queue.Queue()
-        self.log_messages = []
-
-        # MIDI/OSC
-        self.midi_out = None
-        self.osc_client = None
-
-        # OSC Server
-        self.osc_server = None
-        self.osc_server_thread = None
-
-        # Alarms
-        self.alarms = []
-
-        # UI Visibility Flags
-        self.content_visible = False
-        self.alarm_frame_visible = False
-        self.cc_frame_visible = False
-
-        # Static OSC Addresses (editable)
-        self.osc_addresses_in = {
-            "pause": "/pause",
-            "play": "/play",
-            "skip": "/skip",
-            "back": "/back",
-            "previous": "/previous",
-            "bpm": "/bpm",
-            "bpm1": "/bpm1",
-            "resetbpm": "/resetbpm",
-            "generic": "/generic",
-        }
-        # Only “sync” remains for static outgoing. We removed “aftertouch.”
-        self.osc_addresses_out = {
-            "sync": "/sync",
-        }
-        # Dynamic addresses template for incoming:
-        self.osc_addresses_in["noteX"] = "/noteX"
-        self.osc_addresses_in["noteoffX"] = "/noteoffX"
-        self.osc_addresses_in["ccX"] = "/ccX"
-        self.osc_addresses_in["pitchX"] = "/pitchX"  # For pitch bend
-        self.osc_addresses_in["afterX"] = "/afterX"  # For aftertouch
-        self.default_osc_addresses_in = dict(self.osc_addresses_in)
-        self.default_osc_addresses_out = dict(self.osc_addresses_out)
-
-        # Note Off Delay default
-        self.note_off_delay = 0.5  # seconds
-
-        self.load_icon()
-        self.load_config()
-        self.setup_ui()
-        self.update_clock()
-        self.check_alarms()
-        self.display_osc_addresses()
-        self.master.after(100, self.poll_log_queue)
-        self.master.protocol("WM_DELETE_WINDOW", self.quit_app)
-
-    # ---------------- Theming ----------------
-    def setup_theme(self) -> None:
-        style = ttk.Style(self.master)
-        style.theme_use("clam")
-        style.configure(".", background="#2B2B2B", foreground="#FFFFFF", bordercolor="#2B2B2B")
-        style.configure("TFrame", background="#2B2B2B")
-        style.configure("TLabel", background="#2B2B2B", foreground="#FFFFFF")
-        style.configure("TButton", background="#3A3A3A", foreground="#FFFFFF")
-        style.map("TButton", background=[("active", "#4D4D4D")], foreground=[("active", "#FFFFFF")])
-        style.configure("TEntry", foreground="#FFFFFF", background="#3A3A3A",
-                        fieldbackground="#3A3A3A", insertcolor="#FFFFFF")
-        style.configure("TCombobox", foreground="#FFFFFF", fieldbackground="#3A3A3A", background="#2B2B2B")
-        self.master.configure(bg="#2B2B2B")
-
-    # ---------------- Icon, Config, IP ----------------
-    def load_icon(self) -> None:
-        try:
-            icon_path = os.path.join(os.path.dirname(__file__), "icon.png")
-            self.master.iconphoto(False, tk.PhotoImage(file=icon_path))
-        except Exception as e:
-            logging.warning(f"Icon load error: {e}")
-
-    def load_config(self) -> None:
-        if os.path.exists(self.CONFIG_FILE):
-            with open(self.CONFIG_FILE, "r") as f:
-                config = json.load(f)
-                self.saved_port = config.get("osc_in_port", "5550")
-                self.saved_midi_port = config.get("midi_input_port", "")
-                self.saved_midi_out_port = config.get("midi_output_port", "")
-                self.saved_out_ip = config.get("osc_out_ip", self.get_local_ip())
-                self.saved_out_port = config.get("osc_out_port", "3330")
-                # Update addresses from config, if present
-                self.osc_addresses_in.update(config.get("osc_addresses_in", {}))
-                self.osc_addresses_out.update(config.get("osc_addresses_out", {}))
-        else:
-            self.saved_port = "5550"
-            self.saved_midi_port = ""
-            self.saved_midi_out_port = ""
-            self.saved_out_ip = self.get_local_ip()
-            self.saved_out_port = "3330"
-
-    def save_config(self) -> None:
-        config = {
-            "osc_in_port": self.saved_port,
-            "midi_input_port": self.saved_midi_port,
-            "midi_output_port": self.saved_midi_out_port,
-            "osc_out_ip": self.saved_out_ip,
-            "osc_out_port": self.saved_out_port,
-            "osc_addresses_in": self.osc_addresses_in,
-            "osc_addresses_out": self.osc_addresses_out,
-        }
-        with open(self.CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=4)
-
-    def get_local_ip(self) -> str:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        ip = "127.0.0.1"
-        try:
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-        except Exception:
-            pass
-        finally:
-            s.close()
-        return ip
-
-    # ---------------- UI Setup ----------------
-    def setup_ui(self) -> None:
-        self.master.geometry("500x420")
-
-        # Menu Bar – Static OSC Addresses
-        menu_bar = tk.Menu(self.master, bg="#2B2B2B", fg="#FFFFFF")
-        self.master.config(menu=menu_bar)
-        help_menu = tk.Menu(menu_bar, tearoff=0, bg="#2B2B2B", fg="#FFFFFF")
-        menu_bar.add_cascade(label="Help", menu=help_menu)
-        help_menu.add_command(label="OSC Commands", command=self.show_help)
-        addr_menu = tk.Menu(menu_bar, tearoff=0, bg="#2B2B2B", fg="#FFFFFF")
-        menu_bar.add_cascade(label="Static OSC Addresses", menu=addr_menu)
-        addr_menu.add_command(label="Edit Static OSC Addresses", command=self.open_addresses_editor)
-
-        # Settings Frame
-        settings = ttk.Frame(self.master)
-        settings.pack(padx=10, pady=10, fill=tk.X)
-        ttk.Label(settings, text="IP for OSC In:").grid(row=0, column=0, sticky=tk.W, pady=2)
-        self.ip_entry = ttk.Entry(settings)
-        self.ip_entry.insert(0, self.get_local_ip())
-        self.ip_entry.config(state="readonly")
-        self.ip_entry.grid(row=0, column=1, sticky=tk.EW, pady=2)
-        Tooltip(self.ip_entry, "Local IP for OSC server.")
-        ttk.Label(settings, text="Port for OSC In:").grid(row=1, column=0, sticky=tk.W, pady=2)
-        self.port_entry = ttk.Entry(settings)
-        self.port_entry.insert(0, getattr(self, "saved_port", "5550"))
-        self.port_entry.grid(row=1, column=1, sticky=tk.EW, pady=2)
-        Tooltip(self.port_entry, "Port where OSC server listens.")
-        ttk.Label(settings, text="MIDI Input:").grid(row=2, column=0, sticky=tk.W, pady=2)
-        self.midi_input_combo = ttk.Combobox(settings, values=self.get_midi_ports())
-        self.midi_input_combo.set(getattr(self, "saved_midi_port", ""))
-        self.midi_input_combo.grid(row=2, column=1, sticky=tk.EW, pady=2)
-        Tooltip(self.midi_input_combo, "Select MIDI input (optional).")
-        ttk.Label(settings, text="MIDI Output:").grid(row=3, column=0, sticky=tk.W, pady=2)
-        self.midi_out_combo = ttk.Combobox(settings, values=self.get_midi_output_ports())
-        self.midi_out_combo.set(getattr(self, "saved_midi_out_port", ""))
-        self.midi_out_combo.grid(row=3, column=1, sticky=tk.EW, pady=2)
-        Tooltip(self.midi_out_combo, "Select MIDI output (optional).")
-        ttk.Label(settings, text="IP for OSC Out:").grid(row=4, column=0, sticky=tk.W, pady=2)
-        self.output_ip_entry = ttk.Entry(settings)
-        self.output_ip_entry.insert(0, getattr(self, "saved_out_ip", self.get_local_ip()))
-        self.output_ip_entry.grid(row=4, column=1, sticky=tk.EW, pady=2)
-        Tooltip(self.output_ip_entry, "Destination IP for OSC messages.")
-        ttk.Label(settings, text="Port for OSC Out:").grid(row=5, column=0, sticky=tk.W, pady=2)
-        self.output_port_entry = ttk.Entry(settings)
-        self.output_port_entry.insert(0, getattr(self, "saved_out_port", "3330"))
-        self.output_port_entry.grid(row=5, column=1, sticky=tk.EW, pady=2)
-        Tooltip(self.output_port_entry, "Destination port for OSC messages.")
-        settings.columnconfigure(1, weight=1)
-
-        # Server Buttons
-        server_frame = ttk.Frame(self.master)
-        server_frame.pack(pady=5)
-        self.bi_dir_button = ttk.Button(server_frame, text="Bi-Directional Server", command=self.start_bi_dir_server)
-        self.bi_dir_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.bi_dir_button, "Send & Receive MIDI.")
-        self.obs_button = ttk.Button(server_frame, text="OBS Server", command=self.start_obs_server)
-        self.obs_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.obs_button, "Only MIDI --> Patch with OBS support.")
-        
-        # Connection Indicator
-        conn_frame = ttk.Frame(self.master)
-        conn_frame.pack(pady=5)
-        self.connection_indicator = tk.Canvas(conn_frame, width=20, height=20, bg="#2B2B2B", highlightthickness=0)
-        self.connection_indicator.pack(side=tk.LEFT, padx=5)
-        self.indicator = self.connection_indicator.create_oval(5, 5, 15, 15, fill="red")
-
-        # Note Off Delay UI
-        note_off_frame = ttk.Frame(self.master)
-        note_off_frame.pack(fill=tk.X, padx=10, pady=5)
-
-        ttk.Label(note_off_frame, text="Note Off Delay:").pack(side=tk.LEFT, padx=5)
-        self.note_off_delay_slider = tk.Scale(
-            note_off_frame, from_=0.0, to=5.0, resolution=0.01,
-            orient=tk.HORIZONTAL, length=120, command=self.update_note_off_delay,
-            bg="#2B2B2B", fg="#FFFFFF", troughcolor="#3A3A3A", activebackground="#4D4D4D"
-        )
-        self.note_off_delay_slider.set(self.note_off_delay)
-        self.note_off_delay_slider.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.note_off_delay_slider, "Time (secs) before auto note_off is sent after a /noteX message.")
-
-        ttk.Label(note_off_frame, text="OSC Address:").pack(side=tk.LEFT, padx=5)
-        self.note_off_delay_address_entry = ttk.Entry(note_off_frame, width=10)
-        # Changed default to "/delay"
-        self.note_off_delay_address_entry.insert(0, "/delay")
-        self.note_off_delay_address_entry.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.note_off_delay_address_entry, "OSC address that sets this delay slider value.")
-
-        # Burger Menus
-        burger = ttk.Frame(self.master)
-        burger.pack(pady=2)
-        self.menu_button = ttk.Button(burger, text="≡ Midi Player/Log", command=self.toggle_midi_menu, width=17)
-        self.menu_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.menu_button, "Toggle MIDI Player/Log UI.")
-        self.alarm_menu_button = ttk.Button(burger, text="≡ Alarm Clock", command=self.toggle_alarm_menu, width=17)
-        self.alarm_menu_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.alarm_menu_button, "Toggle Alarm Clock UI.")
-        self.cc_menu_button = ttk.Button(burger, text="≡ CC", command=self.toggle_cc_menu, width=17)
-        self.cc_menu_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.cc_menu_button, "Toggle CC controls UI.")
-
-        # Content Frames
-        self.content_frame = ttk.Frame(self.master)
-        self.setup_midi_ui()
-        self.alarm_frame = ttk.Frame(self.master)
-        self.setup_alarm_ui()
-        self.cc_frame = ttk.Frame(self.master)
-        self.setup_cc_ui()
-        self.load_bottom_logo()
-
-    def update_note_off_delay(self, val_str):
-        """Callback for the note_off delay slider (UI)."""
-        try:
-            val = float(val_str)
-            if val < 0:
-                val = 0
-            elif val > 5:
-                val = 5
-            self.note_off_delay = val
-            self.log_message(f"Note Off Delay set to {val} sec (via slider)")
-        except ValueError:
-            pass
-
-    def load_bottom_logo(self) -> None:
-        try:
-            path = os.path.join(os.path.dirname(__file__), "bottomlogo.png")
-            orig = tk.PhotoImage(file=path)
-            self.bottom_logo = orig.subsample(2, 2)
-            lbl = tk.Label(self.master, image=self.bottom_logo, bg="#2B2B2B")
-            lbl.pack(side=tk.BOTTOM, pady=5)
-        except Exception as e:
-            logging.debug(f"Bottom logo load error: {e}")
-
-    def get_midi_ports(self):
-        try:
-            return mido.get_input_names()
-        except Exception:
-            return []
-
-    def get_midi_output_ports(self):
-        try:
-            return mido.get_output_names()
-        except Exception:
-            return []
-
-    # ---------------- MIDI/Log Frame ----------------
-    def setup_midi_ui(self) -> None:
-        ctrl_frame = ttk.Frame(self.content_frame)
-        ctrl_frame.pack(pady=5)
-        self.play_button = ttk.Button(ctrl_frame, text="Play", command=self.play)
-        self.play_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.play_button, "Start playback.")
-        self.stop_button = ttk.Button(ctrl_frame, text="Stop", command=self.stop)
-        self.stop_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.stop_button, "Stop playback.")
-        self.skip_button = ttk.Button(ctrl_frame, text="Skip", command=self.skip)
-        self.skip_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.skip_button, "Skip to next track.")
-        self.back_button = ttk.Button(ctrl_frame, text="Back", command=self.back)
-        self.back_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.back_button, "Restart current track.")
-        self.previous_button = ttk.Button(ctrl_frame, text="Previous", command=self.previous)
-        self.previous_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.previous_button, "Previous track.")
-
-        file_frame = ttk.Frame(self.content_frame)
-        file_frame.pack(pady=5)
-        self.load_button = ttk.Button(file_frame, text="Load MIDI", command=self.load_file)
-        self.load_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.load_button, "Load a MIDI file.")
-        self.load_folder_button = ttk.Button(file_frame, text="Load Folder", command=self.load_folder)
-        self.load_folder_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.load_folder_button, "Load MIDI files from folder.")
-        self.unload_button = ttk.Button(file_frame, text="Unload Playlist", command=self.unload_playlist)
-        self.unload_button.pack(side=tk.LEFT, padx=5)
-        Tooltip(self.unload_button, "Clear playlist.")
-
-        playb_frame = ttk.Frame(self.content_frame)
-        playb_frame.pack(pady=5)
-        self.looping_var = tk.BooleanVar(value=self.looping)
-        self.looping_checkbutton = ttk.Checkbutton(playb_frame, text="Loop Playlist", variable=self.looping_var, command=self.toggle_looping)
-        self.looping_checkbutton.pack(side=tk.LEFT, padx=5)
-        self.randomize_button = ttk.Button(playb_frame, text="Randomize Playlist", command=self.toggle_randomize_playlist)
-        self.randomize_button.pack(side=tk.LEFT, padx=5)
-        self.sync_checkbutton = ttk.Checkbutton(playb_frame, text="Sync BPM", variable=self.sync_var, command=self.toggle_sync)
-        self.sync_checkbutton.pack(side=tk.LEFT, padx=5)
-        self.info_label = tk.Label(self.content_frame, text="No file loaded", fg="#FFFFFF", bg="#2B2B2B")
-        self.info_label.pack(pady=5)
-
-        bpm_frame = ttk.Frame(self.content_frame)
-        bpm_frame.pack(pady=5, fill=tk.X)
-        ttk.Label(bpm_frame, text="Tempo (BPM):").pack(side=tk.LEFT)
-        self.bpm_slider = tk.Scale(bpm_frame, from_=20, to=420, orient=tk.HORIZONTAL, command=self.update_bpm,
-                                   bg="#2B2B2B", fg="#FFFFFF", troughcolor="#3A3A3A", activebackground="#4D4D4D")
-        self.bpm_slider.set(self.user_bpm)
-        self.bpm_slider.pack(side=tk.LEFT, padx=5)
-        self.reset_bpm_button = ttk.Button(bpm_frame, text="Reset Tempo", command=self.reset_bpm)
-        self.reset_bpm_button.pack(side=tk.LEFT, padx=5)
-        self.lock_bpm_button = ttk.Button(bpm_frame, text="Lock Tempo", command=self.toggle_lock_bpm)
-        self.lock_bpm_button.pack(side=tk.LEFT, padx=5)
-        self.ignore_bpm_checkbox = ttk.Checkbutton(bpm_frame, text="Ignore /bpm", variable=self.ignore_bpm_var, command=self.toggle_ignore_bpm)
-        self.ignore_bpm_checkbox.pack(side=tk.LEFT, padx=5)
-
-        log_frame = ttk.Frame(self.content_frame)
-        log_frame.pack(fill=tk.BOTH, expand=True, padx=10)
-        tk.Label(self.content_frame, text="Log Messages:", bg="#2B2B2B", fg="#FFFFFF").pack()
-        self.log_text = tk.Text(log_frame, height=8, width=70, state="disabled", bg="#1E1E1E", fg="#FFFFFF", wrap="word")
-        self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        log_scroll = ttk.Scrollbar(log_frame, command=self.log_text.yview)
-        self.log_text.config(yscrollcommand=log_scroll.set)
-        log_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-
-        playlist_frame = ttk.Frame(self.content_frame)
-        playlist_frame.pack(fill=tk.BOTH, expand=True, padx=10)
-        tk.Label(self.content_frame, text="Playlist:", bg="#2B2B2B", fg="#FFFFFF").pack()
-        self.playlist_box = tk.Listbox(playlist_frame, selectmode=tk.SINGLE,
-                                       bg="#1E1E1E", fg="#FFFFFF", selectbackground="#3A3A3A", height=10)
-        self.playlist_box.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        play_scroll = ttk.Scrollbar(playlist_frame, command=self.playlist_box.yview)
-        self.playlist_box.config(yscrollcommand=play_scroll.set)
-        play_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-
-    # ---------------- Alarm Clock UI ----------------
-    def setup_alarm_ui(self) -> None:
-        # Header with centered current date/time
-        header = tk.Label(self.alarm_frame, text="", font=("Helvetica", 14, "bold"), bg="#2B2B2B", fg="#FFFFFF")
-        header.pack(fill=tk.X, pady=5)
-        self.clock_label = header  # update_clock will update this label
-
-        # Alarm controls arranged neatly
-        controls = ttk.Frame(self.alarm_frame)
-        controls.pack(pady=5)
-        ttk.Label(controls, text="Date (YYYY-MM-DD):").grid(row=0, column=0, padx=5, pady=5, sticky=tk.E)
-        self.alarm_date_entry = ttk.Entry(controls, width=12)
-        self.alarm_date_entry.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
-        ttk.Label(controls, text="Time (HH:MM:SS):").grid(row=1, column=0, padx=5, pady=5, sticky=tk.E)
-        self.alarm_time_entry = ttk.Entry(controls, width=10)
-        self.alarm_time_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
-        ttk.Label(controls, text="OSC Address:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.E)
-        self.alarm_address_entry = ttk.Entry(controls, width=20)
-        self.alarm_address_entry.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
-        ttk.Label(controls, text="OSC Args (comma separated):").grid(row=3, column=0, padx=5, pady=5, sticky=tk.E)
-        self.alarm_args_entry = ttk.Entry(controls, width=20)
-        self.alarm_args_entry.grid(row=3, column=1, padx=5, pady=5, sticky=tk.W)
-        self.schedule_alarm_button = ttk.Button(controls, text="Schedule Alarm", command=self.schedule_alarm)
-        self.schedule_alarm_button.grid(row=4, column=0, columnspan=2, pady=5)
-
-        # Set default values for alarm inputs:
-        now = datetime.now()
-        self.alarm_date_entry.insert(0, now.strftime("%Y-%m-%d"))
-        self.alarm_time_entry.insert(0, (now + timedelta(minutes=2)).strftime("%H:%M:%S"))
-        self.alarm_address_entry.insert(0, "/alarm")
-        self.alarm_args_entry.insert(0, "1")
-
-        # Alarm list label using tk.Label
-        tk.Label(self.alarm_frame, text="Scheduled Alarms:", bg="#2B2B2B", fg="#FFFFFF").pack(pady=5)
-        list_frame = ttk.Frame(self.alarm_frame)
-        list_frame.pack(fill=tk.BOTH, expand=True, padx=10)
-        self.alarm_listbox = tk.Listbox(list_frame, selectmode=tk.SINGLE,
-                                        bg="#1E1E1E", fg="#FFFFFF", selectbackground="#3A3A3A", height=8)
-        self.alarm_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        al_scroll = ttk.Scrollbar(list_frame, command=self.alarm_listbox.yview)
-        self.alarm_listbox.config(yscrollcommand=al_scroll.set)
-        al_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        self.remove_alarm_button = ttk.Button(self.alarm_frame, text="Remove Selected Alarm", command=self.remove_selected_alarm)
-        self.remove_alarm_button.pack(pady=5)
-
-    # ---------------- CC Controls ----------------
-    def setup_cc_ui(self) -> None:
-        self.cc_sliders = []
-        self.cc_address_entries = []
-        ttk.Label(self.cc_frame, text="CC Controls", foreground="#FFFFFF").pack(pady=5)
-        cc_frame = ttk.Frame(self.cc_frame)
-        cc_frame.pack(padx=10, pady=10, fill=tk.X)
-        for i in range(6):
-            row = ttk.Frame(cc_frame)
-            row.pack(fill=tk.X, pady=3)
-            ttk.Label(row, text=f"CC {i+1}:", width=10).pack(side=tk.LEFT, padx=5)
-            slider = tk.Scale(row, from_=0, to=127, orient=tk.HORIZONTAL, length=150,
-                              bg="#2B2B2B", fg="#FFFFFF", troughcolor="#3A3A3A", activebackground="#4D4D4D",
-                              command=lambda val, idx=i: self.send_cc_message(idx))
-            slider.set(0)
-            slider.pack(side=tk.LEFT, padx=5)
-            self.cc_sliders.append(slider)
-            entry = ttk.Entry(row, width=15)
-            entry.insert(0, f"/cc{i+1}")
-            entry.pack(side=tk.LEFT, padx=5)
-            self.cc_address_entries.append(entry)
-
-    # ---------------- Log Handling ----------------
-    def log_message(self, message: str, level: int = logging.INFO) -> None:
-        logging.log(level, message)
-        if len(self.log_messages) >= self.MAX_LOG_MESSAGES:
-            self.log_messages.pop(0)
-        self.log_messages.append(message)
-        self.log_queue.put(message)
-
-    def poll_log_queue(self) -> None:
-        while not self.log_queue.empty():
-            msg = self.log_queue.get()
-            self.log_text.config(state="normal")
-            self.log_text.insert(tk.END, f"{msg}\n")
-            if len(self.log_messages) > self.MAX_LOG_MESSAGES:
-                self.log_text.delete("1.0", "2.0")
-            self.log_text.see(tk.END)
-            self.log_text.config(state="disabled")
-        self.master.after(100, self.poll_log_queue)
-
-    def clear_log(self):
-        self.log_messages.clear()
-        self.log_text.config(state="normal")
-        self.log_text.delete("1.0", tk.END)
-        self.log_text.config(state="disabled")
-
-    # ---------------- Playlist Management ----------------
-    def load_file(self) -> None:
-        path = filedialog.askopenfilename(filetypes=[("MIDI Files", "*.mid *.midi")])
-        if path:
-            self.playlist.append(path)
-            self.original_playlist.append(path)
-            self.playlist_box.insert(tk.END, f"{len(self.playlist)}: {os.path.basename(path)}")
-            self.info_label.config(text=f"Loaded: {path}")
-            self.log_message(f"Loaded MIDI file: {path}")
-        else:
-            self.info_label.config(text="No file selected.")
-            self.log_message("No file selected.")
-
-    def load_folder(self) -> None:
-        folder = filedialog.askdirectory()
-        if folder:
-            files = [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(('.mid', '.midi'))]
-            if files:
-                for f in files:
-                    self.playlist.append(f)
-                    self.original_playlist.append(f)
-                    self.playlist_box.insert(tk.END, f"{len(self.playlist)}: {os.path.basename(f)}")
-                self.info_label.config(text=f"Loaded {len(files)} MIDI files.")
-                self.log_message(f"Loaded {len(files)} files from {folder}")
-            else:
-                messagebox.showinfo("No MIDI Files", "No MIDI files found.")
-                self.log_message("No MIDI files found in folder.")
-        else:
-            self.info_label.config(text="No folder selected.")
-            self.log_message("No folder selected.")
-
-    def unload_playlist(self) -> None:
-        if self.playing:
-            messagebox.showwarning("Stop Playback", "Stop playback before unloading playlist.")
-            return
-        self.playlist.clear()
-        self.original_playlist.clear()
-        self.playlist_box.delete(0, tk.END)
-        self.info_label.config(text="Playlist unloaded.")
-        self.log_message("Playlist unloaded.")
-
-    def update_playlist_box(self) -> None:
-        self.playlist_box.delete(0, tk.END)
-        for i, f in enumerate(self.playlist, start=1):
-            self.playlist_box.insert(tk.END, f"{i}: {os.path.basename(f)}")
-
-    # ---------------- Playback Controls ----------------
-    def play(self) -> None:
-        if not self.playlist:
-            self.info_label.config(text="No MIDI files loaded.")
-            self.log_message("No MIDI files to play.")
-            return
-        if not self.playing:
-            self.playing = True
-            self.current_index = 0
-            self.log_message("Playback started.")
-            threading.Thread(target=self._play_midi_playlist, daemon=True).start()
-        else:
-            self.log_message("Playback already running.")
-
-    def stop(self) -> None:
-        if self.playing:
-            self.playing = False
-            self.pause_event.clear()
-            self.skip_event.set()
-            self.back_event.set()
-            self.previous_event.set()
-            self.skip_to_event.set()
-            self.info_label.config(text="Playback stopped.")
-            self.log_message("Playback stopped.")
-        else:
-            self.log_message("Stop requested, but nothing is playing.")
-
-    def skip(self) -> None:
-        if self.playing:
-            self.skip_event.set()
-            self.log_message("Skip requested.")
-        else:
-            self.log_message("Skip requested, but no playback active.")
-
-    def back(self) -> None:
-        if self.playing:
-            self.back_event.set()
-            self.log_message("Restart requested.")
-        else:
-            self.log_message("Back requested, but nothing is playing.")
-
-    def previous(self) -> None:
-        if self.playing:
-            if self.current_index > 0:
-                self.previous_event.set()
-                self.log_message("Previous track requested.")
-            else:
-                self.log_message("Already at first track.")
-        else:
-            self.log_message("Previous requested, but nothing is playing.")
-
-    def skip_to_number(self, num: int) -> None:
-        if not self.playing:
-            self.log_message(f"Skip to {num} requested but no playback active.")
-            return
-        if 1 <= num <= len(self.playlist):
-            self.skip_to_index = num - 1
-            self.skip_to_event.set()
-            self.log_message(f"Skip to track #{num}.")
-        else:
-            self.log_message(f"Invalid track number: {num}.")
-
-    def toggle_looping(self) -> None:
-        self.looping = self.looping_var.get()
-        self.log_message(f"Looping {'enabled' if self.looping else 'disabled'}.")
-
-    def toggle_randomize_playlist(self) -> None:
-        self.randomize = not self.randomize
-        if self.randomize:
-            if len(self.playlist) > 1:
-                random.shuffle(self.playlist)
-                self.update_playlist_box()
-                self.current_index = 0
-                self.log_message("Playlist randomized.")
-            else:
-                self.log_message("Not enough files to randomize.")
-        else:
-            self.playlist = self.original_playlist.copy()
-            self.update_playlist_box()
-            self.current_index = 0
-            self.log_message("Playlist restored to original order.")
-        self.randomize_button.config(text="Restore Order" if self.randomize else "Randomize Playlist")
-
-    def _play_midi_playlist(self) -> None:
-        try:
-            while self.playing and (0 <= self.current_index < len(self.playlist)):
-                f = self.playlist[self.current_index]
-                self._play_single_midi(f)
-                if not self.playing:
-                    break
-                if self.previous_event.is_set():
-                    self.previous_event.clear()
-                    self.current_index = max(0, self.current_index - 1)
-                    continue
-                if self.back_event.is_set():
-                    self.back_event.clear()
-                    continue
-                if self.skip_to_event.is_set():
-                    self.skip_to_event.clear()
-                    if self.skip_to_index is not None and 0 <= self.skip_to_index < len(self.playlist):
-                        self.current_index = self.skip_to_index
-                    self.skip_to_index = None
-                    continue
-                if self.looping and self.current_index == len(self.playlist) - 1:
-                    if self.randomize and len(self.playlist) > 1:
-                        random.shuffle(self.playlist)
-                        self.update_playlist_box()
-                        self.log_message("Playlist reshuffled for looping.")
-                    self.current_index = 0
-                else:
-                    self.current_index += 1
-            if self.playing:
-                self.playing = False
-                self.info_label.config(text="Playback finished.")
-                self.log_message("Playback finished.")
-        except Exception as e:
-            self.playing = False
-            self.log_message(f"Playback error: {e}", level=logging.ERROR)
-            self.info_label.config(text=f"Playback Error: {e}")
-
-    def _play_single_midi(self, path: str) -> None:
-        self.info_label.config(text=f"Playing: {path}")
-        self.log_message(f"Playing {path}")
-        try:
-            mid = MidiFile(path)
-        except Exception as e:
-            self.log_message(f"Failed to load MIDI: {e}", level=logging.ERROR)
-            return
-        if not self.bpm_locked:
-            bpm = self.get_file_bpm(mid)
-            if bpm:
-                self.default_bpm = max(1, round(bpm))
-                self.smoothed_bpm = float(self.default_bpm)
-                self.user_bpm = self.default_bpm
-                self.master.after(0, lambda: self.bpm_slider.set(self.user_bpm))
-                self.log_message(f"Default BPM set to {self.default_bpm}")
-            else:
-                self.log_message("No BPM found; using previous BPM.")
-        self.ticks_per_beat = mid.ticks_per_beat
-        events = []
-        for track in mid.tracks:
-            abs_ticks = 0
-            for msg in track:
-                abs_ticks += msg.time
-                if not msg.is_meta:
-                    events.append((abs_ticks, msg))
-        events.sort(key=lambda x: x[0])
-        last_ticks = 0
-        for abs_ticks, msg in events:
-            if not self.playing:
-                break
-            if self.skip_event.is_set():
-                self.skip_event.clear()
-                break
-            if self.previous_event.is_set() or self.back_event.is_set() or self.skip_to_event.is_set():
-                break
-            while self.pause_event.is_set() and self.playing:
-                time.sleep(0.1)
-            delta = abs_ticks - last_ticks
-            last_ticks = abs_ticks
-            if delta > 0:
-                t_delay = (delta / self.ticks_per_beat) * (60.0 / self.default_bpm) * (self.default_bpm / self.user_bpm)
-                time.sleep(t_delay)
-            self.handle_midi_message(msg, source="playback")
-
-    def get_file_bpm(self, mid: MidiFile):
-        for track in mid.tracks:
-            for msg in track:
-                if msg.type == "set_tempo":
-                    return mido.tempo2bpm(msg.tempo)
-        return None
-
-    # ---------------- MIDI Message Handling ----------------
-    def handle_midi_message(self, msg, source="input") -> None:
-        """Handles MIDI -> OSC (outgoing)"""
-        if hasattr(msg, "channel"):
-            ch = msg.channel + 1
-            if msg.type == "note_on":
-                if msg.velocity > 0:
-                    if self.osc_client:
-                        addr = f"/note{ch}"
-                        self.osc_client.send_message(addr, [msg.note, msg.velocity])
-                        self.log_message(f"Sent OSC -> {addr} [{msg.note}, {msg.velocity}]")
-                else:
-                    if self.osc_client:
-                        addr = f"/noteoff{ch}"
-                        self.osc_client.send_message(addr, [msg.note, 0])
-                        self.log_message(f"Sent OSC -> {addr} [{msg.note}, 0]")
-            elif msg.type == "note_off":
-                if self.osc_client:
-                    addr = f"/noteoff{ch}"
-                    self.osc_client.send_message(addr, [msg.note, 0])
-                    self.log_message(f"Sent OSC -> {addr} [{msg.note}, 0]")
-            elif msg.type == "control_change":
-                if self.osc_client:
-                    addr = f"/cc{ch}"
-                    self.osc_client.send_message(addr, [msg.control, msg.value])
-                    self.log_message(f"Sent OSC -> {addr} [{msg.control}, {msg.value}]")
-            elif msg.type == "pitchwheel":
-                if self.osc_client:
-                    addr = f"/pitch{ch}"
-                    self.osc_client.send_message(addr, [msg.pitch])
-                    self.log_message(f"Sent OSC -> {addr} [{msg.pitch}]")
-            elif msg.type == "aftertouch":
-                if self.osc_client:
-                    # Now dynamic /afterX for aftertouch
-                    addr = f"/after{ch}"
-                    self.osc_client.send_message(addr, [msg.value])
-                    self.log_message(f"Sent OSC -> {addr} [{msg.value}]")
-            else:
-                self.log_message(f"Ignored MIDI message: {msg.type}", level=logging.DEBUG)
-        else:
-            self.log_message(f"Ignored MIDI message without channel: {msg}", level=logging.DEBUG)
-
-    # ---------------- Dynamic OSC Handlers (Incoming) ----------------
-    def handle_osc_note_dynamic(self, address, *args):
-        m = re.match(r'/note(\d+)$', address)
-        if not m:
-            self.log_message(f"Invalid dynamic note address: {address}", level=logging.ERROR)
-            return
-        try:
-            ch = int(m.group(1))
-        except Exception as e:
-            self.log_message(f"Error parsing dynamic note channel: {e}", level=logging.ERROR)
-            return
-        if len(args) < 2:
-            self.log_message("Dynamic /note received with insufficient args.", level=logging.ERROR)
-            return
-        try:
-            note = int(args[0])
-            raw_vel = float(args[1])
-        except Exception as e:
-            self.log_message(f"Error parsing dynamic /note args: {e}", level=logging.ERROR)
-            return
-
-        # Convert 0–1 to 0–127, clamp
-        if raw_vel <= 1.0:
-            vel = int(max(0, min(127, raw_vel * 127)))
-        else:
-            vel = int(max(0, min(127, raw_vel)))  # clamp
-
-        msg = mido.Message("note_on", channel=ch-1, note=note, velocity=vel)
-        if self.midi_out:
-            try:
-                self.midi_out.send(msg)
-                self.log_message(f"OSC->MIDI: note_on (chan {ch}) note={note}, velocity={vel}")
-            except Exception as e:
-                self.log_message(f"MIDI Output error in dynamic /note: {e}", level=logging.ERROR)
-        else:
-            self.log_message("MIDI Output not set for dynamic /note.", level=logging.ERROR)
-
-        # Use the user-defined slider delay:
-        delay = self.note_off_delay
-        threading.Timer(delay, self.send_note_off_dynamic, args=(note, ch)).start()
-
-    def send_note_off_dynamic(self, note, ch):
-        if not self.midi_out:
-            self.log_message("MIDI Output not set for dynamic note_off.", level=logging.ERROR)
-            return
-        msg = mido.Message("note_off", channel=ch-1, note=note, velocity=0)
-        try:
-            self.midi_out.send(msg)
-            self.log_message(f"OSC->MIDI: note_off (chan {ch}) note={note}, velocity=0")
-        except Exception as e:
-            self.log_message(f"MIDI Output error in dynamic note_off: {e}", level=logging.ERROR)
-
-    def handle_osc_noteoff_dynamic(self, address, *args):
-        m = re.match(r'/noteoff(\d+)$', address)
-        if not m:
-            self.log_message(f"Invalid dynamic noteoff address: {address}", level=logging.ERROR)
-            return
-        try:
-            ch = int(m.group(1))
-        except Exception as e:
-            self.log_message(f"Error parsing dynamic noteoff channel: {e}", level=logging.ERROR)
-            return
-        if len(args) < 2:
-            self.log_message("Dynamic /noteoff received with insufficient args.", level=logging.ERROR)
-            return
-        try:
-            note = int(args[0])
-        except Exception as e:
-            self.log_message(f"Error parsing dynamic /noteoff args: {e}", level=logging.ERROR)
-            return
-        msg = mido.Message("note_off", channel=ch-1, note=note, velocity=0)
-        if self.midi_out:
-            try:
-                self.midi_out.send(msg)
-                self.log_message(f"OSC->MIDI: note_off (chan {ch}) note={note}, velocity=0")
-            except Exception as e:
-                self.log_message(f"MIDI Output error in dynamic noteoff: {e}", level=logging.ERROR)
-        else:
-            self.log_message("MIDI Output not set for dynamic noteoff.", level=logging.ERROR)
-
-    def handle_osc_cc_dynamic(self, address, *args):
-        m = re.match(r'/cc(\d+)$', address)
-        if not m:
-            self.log_message(f"Invalid dynamic cc address: {address}", level=logging.ERROR)
-            return
-        try:
-            ch = int(m.group(1))
-        except Exception as e:
-            self.log_message(f"Error parsing dynamic cc channel: {e}", level=logging.ERROR)
-            return
-        if len(args) < 2:
-            self.log_message("Dynamic /cc received with insufficient args.", level=logging.ERROR)
-            return
-        try:
-            cc_num = int(args[0])
-            raw_val = float(args[1])
-            if raw_val <= 1.0:
-                cc_val = int(max(0, min(127, raw_val * 127)))
-            else:
-                cc_val = int(max(0, min(127, raw_val)))
-        except Exception as e:
-            self.log_message(f"Error parsing dynamic /cc args: {e}", level=logging.ERROR)
-            return
-        msg = mido.Message("control_change", channel=ch-1, control=cc_num, value=cc_val)
-        if self.midi_out:
-            try:
-                self.midi_out.send(msg)
-                self.log_message(f"OSC->MIDI: cc (chan {ch}) cc={cc_num}, value={cc_val}")
-            except Exception as e:
-                self.log_message(f"MIDI Output error in dynamic cc: {e}", level=logging.ERROR)
-        else:
-            self.log_message("MIDI Output not set for dynamic cc.", level=logging.ERROR)
-
-    def handle_osc_pitch_dynamic(self, address, *args):
-        m = re.match(r'/pitch(\d+)$', address)
-        if not m:
-            self.log_message(f"Invalid dynamic pitch address: {address}", level=logging.ERROR)
-            return
-        try:
-            ch = int(m.group(1))
-        except Exception as e:
-            self.log_message(f"Error parsing dynamic pitch channel: {e}", level=logging.ERROR)
-            return
-        if len(args) < 1:
-            self.log_message("Dynamic /pitch received with insufficient args.", level=logging.ERROR)
-            return
-        try:
-            pitch = int(args[0])
-        except Exception as e:
-            self.log_message(f"Error parsing dynamic /pitch args: {e}", level=logging.ERROR)
-            return
-        msg = mido.Message("pitchwheel", channel=ch-1, pitch=pitch)
-        if self.midi_out:
-            try:
-                self.midi_out.send(msg)
-                self.log_message(f"OSC->MIDI: pitchwheel (chan {ch}) pitch={pitch}")
-            except Exception as e:
-                self.log_message(f"MIDI Output error in dynamic pitch: {e}", level=logging.ERROR)
-        else:
-            self.log_message("MIDI Output not set for dynamic pitch.", level=logging.ERROR)
-
-    def handle_osc_after_dynamic(self, address, *args):
-        m = re.match(r'/after(\d+)$', address)
-        if not m:
-            self.log_message(f"Invalid dynamic aftertouch address: {address}", level=logging.ERROR)
-            return
-        try:
-            ch = int(m.group(1))
-        except Exception as e:
-            self.log_message(f"Error parsing dynamic aftertouch channel: {e}", level=logging.ERROR)
-            return
-        if len(args) < 1:
-            self.log_message("Dynamic /after received with insufficient args.", level=logging.ERROR)
-            return
-        try:
-            val = int(float(args[0]))
-        except Exception as e:
-            self.log_message(f"Error parsing dynamic /after args: {e}", level=logging.ERROR)
-            return
-        msg = mido.Message("aftertouch", channel=ch-1, value=val)
-        if self.midi_out:
-            try:
-                self.midi_out.send(msg)
-                self.log_message(f"OSC->MIDI: aftertouch (chan {ch}) value={val}")
-            except Exception as e:
-                self.log_message(f"MIDI Output error in dynamic aftertouch: {e}", level=logging.ERROR)
-        else:
-            self.log_message("MIDI Output not set for dynamic aftertouch.", level=logging.ERROR)
-
-    def handle_osc_generic(self, address, *args):
-        if len(args) < 1:
-            self.log_message("Generic OSC received with insufficient args.", level=logging.ERROR)
-            return
-        try:
-            midi_type = str(args[0]).lower()
-            params = list(args[1:])
-        except Exception as e:
-            self.log_message(f"Error parsing generic OSC args: {e}", level=logging.ERROR)
-            return
-
-        # Default expectations: note_on/note_off expect 2 parameters, etc.
-        expected = {"note_on": 2, "note_off": 2, "control_change": 2, "pitchwheel": 1, "aftertouch": 1}
-        exp = expected.get(midi_type, None)
-        if exp is not None:
-            if len(params) < exp:
-                params.extend([0] * (exp - len(params)))
-        extra = params[exp:] if (exp is not None and len(params) > exp) else []
-        try:
-            kwargs = {"channel": self.default_midi_channel - 1}
-            if midi_type in ["note_on", "note_off"]:
-                if len(params) < 2:
-                    raise ValueError("Not enough parameters for note message.")
-                kwargs["note"] = int(params[0])
-                raw_vel = float(params[1])
-                # clamp velocity
-                vel = int(max(0, min(127, raw_vel*127))) if raw_vel <= 1 else int(max(0, min(127, raw_vel)))
-                kwargs["velocity"] = vel
-            elif midi_type == "control_change":
-                if len(params) < 2:
-                    raise ValueError("Not enough parameters for control_change.")
-                kwargs["control"] = int(params[0])
-                raw_val = float(params[1])
-                cc_val = int(max(0, min(127, raw_val*127))) if raw_val <= 1 else int(max(0, min(127, raw_val)))
-                kwargs["value"] = cc_val
-            elif midi_type == "pitchwheel":
-                if len(params) < 1:
-                    raise ValueError("Not enough parameters for pitchwheel.")
-                kwargs["pitch"] = int(params[0])
-            elif midi_type == "aftertouch":
-                if len(params) < 1:
-                    raise ValueError("Not enough parameters for aftertouch.")
-                kwargs["value"] = int(params[0])
-            else:
-                kwargs["data"] = params
-            if extra:
-                kwargs["data"] = extra
-            msg = mido.Message(midi_type, **kwargs)
-        except Exception as e:
-            self.log_message(f"Error building generic MIDI message: {e}", level=logging.ERROR)
-            return
-        if self.midi_out:
-            try:
-                self.midi_out.send(msg)
-                self.log_message(f"Generic OSC -> Sent MIDI: {msg}")
-            except Exception as e:
-                self.log_message(f"MIDI Output error in generic OSC: {e}", level=logging.ERROR)
-        else:
-            self.log_message("MIDI Output not set; generic OSC ignored.", level=logging.ERROR)
-
-    # ---------------- Alarm Clock ----------------
-    def update_clock(self) -> None:
-        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.clock_label.config(text=now_str)
-        self.master.after(1000, self.update_clock)
-
-    def check_alarms(self) -> None:
-        now = datetime.now()
-        for alarm in self.alarms:
-            if not alarm["triggered"] and now >= alarm["datetime"]:
-                addr = alarm["address"]
-                args = alarm["args"]
-                self.log_message(f"Alarm triggered -> sending OSC to {addr} with args {args}")
-                if self.osc_client:
-                    if args:
-                        parsed = []
-                        for a in args:
-                            try:
-                                parsed.append(int(a))
-                            except ValueError:
-                                try:
-                                    parsed.append(float(a))
-                                except ValueError:
-                                    parsed.append(a)
-                        self.osc_client.send_message(addr, parsed)
-                    else:
-                        self.osc_client.send_message(addr, [])
-                alarm["triggered"] = True
-        self.master.after(1000, self.check_alarms)
-
-    def schedule_alarm(self) -> None:
-        d_str = self.alarm_date_entry.get().strip()
-        t_str = self.alarm_time_entry.get().strip()
-        addr = self.alarm_address_entry.get().strip()
-        arg_str = self.alarm_args_entry.get().strip()
-        if not d_str or not t_str or not addr:
-            messagebox.showwarning("Incomplete Data", "Enter Date, Time, and OSC Address.")
-            return
-        try:
-            dt = datetime.strptime(f"{d_str} {t_str}", "%Y-%m-%d %H:%M:%S")
-            if dt <= datetime.now():
-                messagebox.showwarning("Invalid Time", "Alarm time must be in the future.")
-                return
-        except ValueError:
-            messagebox.showwarning("Invalid Date/Time", "Use YYYY-MM-DD and HH:MM:SS (24-hour).")
-            return
-        # Split the argument string on commas and trim whitespace
-        args = [a.strip() for a in arg_str.split(",")] if arg_str else []
-        alarm = {"datetime": dt, "address": addr, "args": args, "triggered": False}
-        self.alarms.append(alarm)
-        self.alarm_listbox.insert(tk.END, f"{dt.strftime('%Y-%m-%d %H:%M:%S')} -> {addr} {' '.join(args)}")
-        self.log_message(f"Scheduled alarm at {dt} for {addr} with args {args}")
-        # Reset the fields to defaults.
-        now = datetime.now()
-        self.alarm_date_entry.delete(0, tk.END)
-        self.alarm_date_entry.insert(0, now.strftime("%Y-%m-%d"))
-        self.alarm_time_entry.delete(0, tk.END)
-        self.alarm_time_entry.insert(0, (now + timedelta(minutes=2)).strftime("%H:%M:%S"))
-        self.alarm_address_entry.delete(0, tk.END)
-        self.alarm_address_entry.insert(0, "/alarm")
-        self.alarm_args_entry.delete(0, tk.END)
-        self.alarm_args_entry.insert(0, "1")
-
-    def remove_selected_alarm(self) -> None:
-        sel = self.alarm_listbox.curselection()
-        if not sel:
-            messagebox.showwarning("No Selection", "Select an alarm to remove.")
-            return
-        idx = sel[0]
-        self.alarm_listbox.delete(idx)
-        rem = self.alarms.pop(idx)
-        self.log_message(f"Removed alarm: {rem}")
-
-    # ---------------- OBS and Bi-Directional Server Functions ----------------
-    def start_bi_dir_server(self) -> None:
-        if self.bi_dir_button["text"] == "Bi-Directional Server":
-            midi_in_name = self.midi_input_combo.get()
-            midi_out_name = self.midi_out_combo.get()
-            osc_out_ip = self.output_ip_entry.get()
-            try:
-                osc_out_port = int(self.output_port_entry.get())
-                osc_in_port = int(self.port_entry.get())
-            except ValueError:
-                messagebox.showerror("Error", "Invalid port number.")
-                return
-            if self.is_port_in_use(osc_in_port):
-                messagebox.showerror("Error", f"Port {osc_in_port} is in use.")
-                return
-            if midi_in_name:
-                try:
-                    midi_in = mido.open_input(midi_in_name)
-                    threading.Thread(target=self.run_midi_loop, args=(midi_in,), daemon=True).start()
-                except Exception as e:
-                    messagebox.showwarning("MIDI Input Error", f"Cannot open MIDI input: {e}")
-            if midi_out_name:
-                try:
-                    self.midi_out = mido.open_output(midi_out_name)
-                except Exception as e:
-                    messagebox.showwarning("MIDI Output Error", f"Cannot open MIDI output: {e}")
-            self.osc_client = udp_client.SimpleUDPClient(osc_out_ip, osc_out_port)
-            self.saved_out_ip = osc_out_ip
-            self.saved_out_port = osc_out_port
-            self.saved_port = osc_in_port
-            self.saved_midi_port = midi_in_name
-            self.saved_midi_out_port = midi_out_name
-            self.save_config()
-            self.osc_server_thread = threading.Thread(target=self.start_osc_server_thread, args=(osc_in_port,), daemon=True)
-            self.osc_server_thread.start()
-            self.bi_dir_button.config(text="Stop and Close")
-            self.obs_button.config(text="Stop and Close")
-            self.log_message("Bi-Directional OSC Server started (threaded).")
-            self.set_connection_status("green")
-        else:
-            self.quit_app()
-
-    def start_obs_server(self) -> None:
-        if self.obs_button["text"] == "OBS Server":
-            midi_in_name = self.midi_input_combo.get()
-            midi_out_name = self.midi_out_combo.get()
-            osc_out_ip = self.output_ip_entry.get()
-            try:
-                osc_out_port = int(self.output_port_entry.get())
-                osc_in_port = int(self.port_entry.get())
-            except ValueError:
-                messagebox.showerror("Error", "Invalid port number.")
-                return
-            if self.is_port_in_use(osc_in_port):
-                messagebox.showerror("Error", f"Port {osc_in_port} is in use.")
-                return
-            if midi_in_name:
-                try:
-                    midi_in = mido.open_input(midi_in_name)
-                    threading.Thread(target=self.run_midi_loop, args=(midi_in,), daemon=True).start()
-                except Exception as e:
-                    messagebox.showwarning("MIDI Input Error", f"Cannot open MIDI input: {e}")
-            if midi_out_name:
-                try:
-                    self.midi_out = mido.open_output(midi_out_name)
-                except Exception as e:
-                    messagebox.showwarning("MIDI Output Error", f"Cannot open MIDI output: {e}")
-            self.osc_client = udp_client.SimpleUDPClient(osc_out_ip, osc_out_port)
-            self.saved_out_ip = osc_out_ip
-            self.saved_out_port = osc_out_port
-            self.saved_port = osc_in_port
-            self.saved_midi_port = midi_in_name
-            self.saved_midi_out_port = midi_out_name
-            self.save_config()
-            self.osc_server_thread = threading.Thread(target=self.start_async_server_thread, args=(osc_in_port,), daemon=True)
-            self.osc_server_thread.start()
-            self.bi_dir_button.config(text="Stop and Close")
-            self.obs_button.config(text="Stop and Close")
-            self.log_message("OBS OSC Server started (async).")
-            self.set_connection_status("green")
-        else:
-            self.quit_app()
-
-    # ---------------- OSC Server Functions ----------------
-    def is_port_in_use(self, port: int) -> bool:
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-            try:
-                s.bind(("0.0.0.0", port))
-                return False
-            except OSError:
-                return True
-
-    def start_osc_server_thread(self, port: int) -> None:
-        disp = dispatcher.Dispatcher()
-        # Map static incoming addresses
-        disp.map(self.osc_addresses_in["pause"], self.handle_pause)
-        disp.map(self.osc_addresses_in["play"], self.handle_play)
-        disp.map(self.osc_addresses_in["skip"], self.handle_skip)
-        disp.map(self.osc_addresses_in["back"], self.handle_back)
-        disp.map(self.osc_addresses_in["previous"], self.handle_previous)
-        disp.map(self.osc_addresses_in["bpm"], self.handle_bpm)
-        disp.map(self.osc_addresses_in["bpm1"], self.handle_bpm1_toggle)
-        disp.map(self.osc_addresses_in["resetbpm"], self.handle_resetbpm)
-        disp.map(self.osc_addresses_in["generic"], self.handle_osc_generic)
-        # Map dynamic incoming addresses: note, noteoff, cc, pitch, after
-        for ch in range(1, 17):
-            disp.map(f"/note{ch}", self.handle_osc_note_dynamic)
-            disp.map(f"/noteoff{ch}", self.handle_osc_noteoff_dynamic)
-            disp.map(f"/cc{ch}", self.handle_osc_cc_dynamic)
-            disp.map(f"/pitch{ch}", self.handle_osc_pitch_dynamic)
-            disp.map(f"/after{ch}", self.handle_osc_after_dynamic)
-        # Map numeric addresses for track skipping
-        for i in range(1, 51):
-            disp.map(f"/{i}", self.handle_numeric_skip)
-
-        # Map the Note Off Delay address from the UI (default "/delay")
-        disp.map(self.note_off_delay_address_entry.get(), self.handle_set_note_off_delay)
-
-        try:
-            self.osc_server = osc_server.ThreadingOSCUDPServer(("0.0.0.0", port), disp)
-            self.log_message(f"OSC Server bound to port {port}.")
-            self.set_connection_status("green")
-            self.osc_server.serve_forever()
-        except OSError as e:
-            self.log_message(f"OSC Server bind error: {e}", level=logging.ERROR)
-            messagebox.showerror("Binding Error", f"Could not bind to port {port}: {e}")
-            self.set_connection_status("red")
-
-    def start_async_server_thread(self, port: int) -> None:
-        async def server_coroutine():
-            disp = dispatcher.Dispatcher()
-            disp.map(self.osc_addresses_in["pause"], self.handle_pause)
-            disp.map(self.osc_addresses_in["play"], self.handle_play)
-            disp.map(self.osc_addresses_in["skip"], self.handle_skip)
-            disp.map(self.osc_addresses_in["back"], self.handle_back)
-            disp.map(self.osc_addresses_in["previous"], self.handle_previous)
-            disp.map(self.osc_addresses_in["bpm"], self.handle_bpm)
-            disp.map(self.osc_addresses_in["bpm1"], self.handle_bpm1_toggle)
-            disp.map(self.osc_addresses_in["resetbpm"], self.handle_resetbpm)
-            disp.map(self.osc_addresses_in["generic"], self.handle_osc_generic)
-            for ch in range(1, 17):
-                disp.map(f"/note{ch}", self.handle_osc_note_dynamic)
-                disp.map(f"/noteoff{ch}", self.handle_osc_noteoff_dynamic)
-                disp.map(f"/cc{ch}", self.handle_osc_cc_dynamic)
-                disp.map(f"/pitch{ch}", self.handle_osc_pitch_dynamic)
-                disp.map(f"/after{ch}", self.handle_osc_after_dynamic)
-            for i in range(1, 51):
-                disp.map(f"/{i}", self.handle_numeric_skip)
-
-            # Also map the Note Off Delay address
-            disp.map(self.note_off_delay_address_entry.get(), self.handle_set_note_off_delay)
-
-            try:
-                server = osc_server.AsyncIOOSCUDPServer(("0.0.0.0", port), disp, asyncio.get_running_loop())
-                transport, protocol = await server.create_serve_endpoint()
-                self.log_message(f"Async OSC Server bound to port {port}.")
-                self.set_connection_status("green")
-                while True:
-                    await asyncio.sleep(1)
-            except Exception as e:
-                self.log_message(f"Async OSC Server error: {e}", level=logging.ERROR)
-                self.set_connection_status("red")
-
-        asyncio.run(server_coroutine())
-
-    def set_connection_status(self, color: str) -> None:
-        if color not in ["red", "green"]:
-            color = "red"
-        self.master.after(0, lambda: self.connection_indicator.itemconfig(self.indicator, fill=color))
-
-    def handle_numeric_skip(self, address, *args):
-        m = re.match(r'^/(\d+)$', address)
-        if m:
-            num = int(m.group(1))
-            self.skip_to_number(num)
-        else:
-            self.log_message(f"Unhandled numeric OSC address: {address}")
-
-    # ---------------- Handler for setting Note Off Delay via OSC ----------------
-    def handle_set_note_off_delay(self, address, *args):
-        """Allows changing the Note Off Delay slider via an OSC message."""
-        if len(args) < 1:
-            return
-        try:
-            val = float(args[0])
-        except ValueError:
-            return
-        val = max(0, min(5, val))  # clamp to [0..5]
-        self.note_off_delay_slider.set(val)
-        self.note_off_delay = val
-        self.log_message(f"Note Off Delay set via OSC to {val} sec")
-
-    # ---------------- Static OSC Handlers ----------------
-    def handle_bpm1_toggle(self, address, *args):
-        current = self.ignore_bpm_var.get()
-        new_val = not current
-        self.ignore_bpm_var.set(new_val)
-        self.log_message(f"'{self.osc_addresses_in.get('bpm1')}' toggled -> ignoring /bpm = {new_val}")
-
-    def handle_resetbpm(self, address, *args):
-        if not self.playing:
-            self.log_message("Received /resetbpm but no playback active.")
-            return
-        self.user_bpm = max(1, round(self.default_bpm))
-        self.smoothed_bpm = float(self.user_bpm)
-        self.bpm_slider.set(self.user_bpm)
-        self.log_message("BPM reset to default from MIDI file.")
-
-    def handle_pause(self, address, *args):
-        if self.playing and not self.pause_event.is_set():
-            self.pause_event.set()
-            self.info_label.config(text="Playback paused.")
-            self.log_message("Playback paused (OSC).")
-
-    def handle_play(self, address, *args):
-        if self.playing and self.pause_event.is_set():
-            self.pause_event.clear()
-            self.info_label.config(text="Playback resumed.")
-            self.log_message("Playback resumed (OSC).")
-
-    def handle_skip(self, address, *args):
-        if self.playing:
-            self.skip_event.set()
-            self.log_message("Skip requested (OSC).")
-        else:
-            self.log_message("Skip requested but no playback active.")
-
-    def handle_back(self, address, *args):
-        if self.playing:
-            self.back_event.set()
-            self.log_message("Back requested (OSC).")
-        else:
-            self.log_message("Back requested but no playback active.")
-
-    def handle_bpm(self, address, *args):
-        if self.bpm_locked or self.ignore_bpm_var.get():
-            self.log_message(f"Received {address} but BPM updates are locked/ignored.")
-            return
-        now_ts = time.time()
-        self.bpm_tick_times.append(now_ts)
-        if len(self.bpm_tick_times) > 4:
-            self.bpm_tick_times.pop(0)
-        if len(self.bpm_tick_times) == 4:
-            intervals = [self.bpm_tick_times[i+1]-self.bpm_tick_times[i] for i in range(3)]
-            avg_int = sum(intervals)/len(intervals)
-            new_bpm = 60.0/avg_int
-            self.smoothed_bpm = (self.alpha*new_bpm)+((1-self.alpha)*self.smoothed_bpm)
-            final_bpm = max(1, round(self.smoothed_bpm))
-            self.user_bpm = final_bpm
-            self.master.after(0, lambda: self.bpm_slider.set(final_bpm))
-            self.log_message(f"{address} -> {final_bpm} BPM")
-
-    # ---------------- CC Controls ----------------
-    def send_cc_message(self, idx: int) -> None:
-        addr = self.cc_address_entries[idx].get().strip()
-        val = self.cc_sliders[idx].get()
-        if not addr.startswith("/"):
-            messagebox.showerror("Invalid OSC Address", f"OSC address for CC {idx+1} must start with '/'.")
-            return
-        if self.osc_client:
-            try:
-                self.osc_client.send_message(addr, val)
-                self.log_message(f"Sent OSC -> {addr} with value {val}")
-            except Exception as e:
-                self.log_message(f"Error sending OSC to {addr}: {e}", level=logging.ERROR)
-        else:
-            self.log_message("OSC Client not connected; CC not sent.", level=logging.ERROR)
-
-    # ---------------- BPM & Tempo ----------------
-    def update_bpm(self, new_bpm_str) -> None:
-        if self.bpm_locked:
-            return
-        try:
-            new_bpm = float(new_bpm_str)
-            self.smoothed_bpm = (self.alpha*new_bpm)+((1-self.alpha)*self.smoothed_bpm)
-            final_bpm = max(1, round(self.smoothed_bpm))
-            self.user_bpm = final_bpm
-            self.bpm_slider.set(final_bpm)
-            self.log_message(f"User BPM set to {final_bpm}")
-        except ValueError:
-            pass
-
-    def reset_bpm(self) -> None:
-        self.user_bpm = max(1, round(self.default_bpm))
-        self.smoothed_bpm = float(self.user_bpm)
-        self.bpm_slider.set(self.user_bpm)
-        self.log_message(f"Tempo reset to {self.user_bpm} BPM")
-
-    def toggle_lock_bpm(self) -> None:
-        self.bpm_locked = not self.bpm_locked
-        if self.bpm_locked:
-            self.bpm_slider.config(state="disabled")
-            self.lock_bpm_button.config(text="Unlock Tempo")
-            self.log_message("BPM slider locked.")
-        else:
-            self.bpm_slider.config(state="normal")
-            self.lock_bpm_button.config(text="Lock Tempo")
-            self.log_message("BPM slider unlocked.")
-
-    def toggle_ignore_bpm(self) -> None:
-        if self.ignore_bpm_var.get():
-            self.log_message("Ignoring incoming /bpm messages.")
-        else:
-            self.log_message("Processing incoming /bpm messages.")
-
-    # ---------------- BPM Sync ----------------
-    def toggle_sync(self) -> None:
-        if self.sync_var.get():
-            if not self.sync_thread or not self.sync_thread.is_alive():
-                self.sync_stop_event.clear()
-                self.sync_thread = threading.Thread(target=self._sync_loop, daemon=True)
-                self.sync_thread.start()
-                self.log_message("Sync BPM started.")
-        else:
-            if self.sync_thread and self.sync_thread.is_alive():
-                self.sync_stop_event.set()
-                self.log_message("Sync BPM stopped.")
-
-    def _sync_loop(self) -> None:
-        while not self.sync_stop_event.is_set() and self.sync_var.get():
-            current = max(1, round(self.user_bpm))
-            delay = 60.0/current
-            time.sleep(delay)
-            if self.sync_stop_event.is_set() or not self.sync_var.get():
-                break
-            if self.osc_client:
-                self.osc_client.send_message(self.osc_addresses_out.get("sync", "/sync"), current)
-                self.log_message(f"Sent OSC -> {self.osc_addresses_out.get('sync', '/sync')} at BPM {current}")
-
-    # ---------------- MIDI Input Loop ----------------
-    def run_midi_loop(self, midi_in) -> None:
-        while True:
-            for msg in midi_in.iter_pending():
-                self.handle_midi_message(msg, source="input")
-            time.sleep(0.01)
-
-    # ---------------- Addresses Editor ----------------
-    def open_addresses_editor(self) -> None:
-        # Create a new Toplevel window.
-        editor = tk.Toplevel(self.master)
-        editor.title("Edit OSC Addresses")
-        editor.geometry("600x400")
-        editor.resizable(True, True)
-        # Create a canvas with vertical scrollbar.
-        canvas = tk.Canvas(editor, bg="#2B2B2B")
-        scrollbar = ttk.Scrollbar(editor, orient="vertical", command=canvas.yview)
-        canvas.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
-        canvas.pack(side="left", fill="both", expand=True)
-        # Create a frame inside the canvas.
-        frame = ttk.Frame(canvas)
-        frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        canvas.create_window((0, 0), window=frame, anchor="nw")
-        # At the very top-right, create a frame for Save and Reset buttons (stacked vertically).
-        top_btn_frame = ttk.Frame(frame)
-        top_btn_frame.grid(row=0, column=1, sticky="ne", padx=5, pady=5)
-        ttk.Button(top_btn_frame, text="Save Edit",
-                   command=lambda: self.save_addresses(editor, static_in_entries, static_out_entries, dynamic_entries)
-                   ).pack(pady=(0,5))
-        ttk.Button(top_btn_frame, text="Reset to Default",
-                   command=lambda: self.reset_addresses(static_in_entries, static_out_entries, dynamic_entries)
-                   ).pack()
-        # Now create the Notebook for the address fields.
-        nb = ttk.Notebook(frame)
-        nb.grid(row=1, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
-        static_in_frame = ttk.Frame(nb)
-        nb.add(static_in_frame, text="Static Incoming")
-        static_out_frame = ttk.Frame(nb)
-        nb.add(static_out_frame, text="Static Outgoing")
-        dynamic_frame = ttk.Frame(nb)
-        nb.add(dynamic_frame, text="Dynamic (Template)")
-
-        static_in_entries = {}
-        static_out_entries = {}
-        dynamic_templates = {
-            "Note": self.osc_addresses_in.get("noteX", "/noteX"),
-            "NoteOff": self.osc_addresses_in.get("noteoffX", "/noteoffX"),
-            "CC": self.osc_addresses_in.get("ccX", "/ccX"),
-            "Pitch": self.osc_addresses_in.get("pitchX", "/pitchX"),
-            "Aftertouch": self.osc_addresses_in.get("afterX", "/afterX")
-        }
-        dynamic_entries = {}
-
-        # For static_in, exclude the ones ending with X.
-        def create_fields(frm, data, entries):
-            for idx, (key, addr) in enumerate(data.items()):
-                ttk.Label(frm, text=f"{key}:").grid(row=idx, column=0, sticky=tk.W, padx=5, pady=5)
-                ent = ttk.Entry(frm, width=30)
-                ent.grid(row=idx, column=1, sticky=tk.W, padx=5, pady=5)
-                ent.insert(0, addr)
-                entries[key] = ent
-
-        # Filter out dynamic (X) from static_in
-        static_in = {k: v for k, v in self.osc_addresses_in.items()
-                     if not k.endswith("X") and k not in ["afterX", "pitchX"]}
-        create_fields(static_in_frame, static_in, static_in_entries)
-
-        # For static_out, we only have "sync"
-        create_fields(static_out_frame, self.osc_addresses_out, static_out_entries)
-
-        # Dynamic
-        create_fields(dynamic_frame, dynamic_templates, dynamic_entries)
-
-    def save_addresses(self, window, static_in, static_out, dynamic):
-        for k, ent in static_in.items():
-            addr = ent.get().strip()
-            if not addr.startswith("/"):
-                messagebox.showerror("Invalid Address", f"Address for {k} must start with '/'.")
-                return
-            self.osc_addresses_in[k] = addr
-        for k, ent in static_out.items():
-            addr = ent.get().strip()
-            if not addr.startswith("/"):
-                messagebox.showerror("Invalid Address", f"Address for {k} must start with '/'.")
-                return
-            self.osc_addresses_out[k] = addr
-        for k, ent in dynamic.items():
-            addr = ent.get().strip()
-            if not addr.startswith("/"):
-                messagebox.showerror("Invalid Address", f"Dynamic address for {k} must start with '/'.")
-                return
-            if k.lower() == "note":
-                self.osc_addresses_in["noteX"] = addr
-            elif k.lower() == "noteoff":
-                self.osc_addresses_in["noteoffX"] = addr
-            elif k.lower() == "cc":
-                self.osc_addresses_in["ccX"] = addr
-            elif k.lower() == "pitch":
-                self.osc_addresses_in["pitchX"] = addr
-            elif k.lower() == "aftertouch":
-                self.osc_addresses_in["afterX"] = addr
-        self.save_config()
-        self.log_message("OSC Addresses updated and saved.")
-        messagebox.showinfo("Success", "OSC Addresses updated.")
-        window.destroy()
-
-    def reset_addresses(self, static_in, static_out, dynamic):
-        for k, ent in static_in.items():
-            default = self.default_osc_addresses_in.get(k, "")
-            ent.delete(0, tk.END)
-            ent.insert(0, default)
-            self.osc_addresses_in[k] = default
-
-        for k, ent in static_out.items():
-            default = self.default_osc_addresses_out.get(k, "")
-            ent.delete(0, tk.END)
-            ent.insert(0, default)
-            self.osc_addresses_out[k] = default
-
-        defaults = {
-            "Note": "/noteX",
-            "NoteOff": "/noteoffX",
-            "CC": "/ccX",
-            "Pitch": "/pitchX",
-            "Aftertouch": "/afterX"
-        }
-        for k, ent in dynamic.items():
-            default = defaults.get(k, "")
-            ent.delete(0, tk.END)
-            ent.insert(0, default)
-            if k.lower() == "note":
-                self.osc_addresses_in["noteX"] = default
-            elif k.lower() == "noteoff":
-                self.osc_addresses_in["noteoffX"] = default
-            elif k.lower() == "cc":
-                self.osc_addresses_in["ccX"] = default
-            elif k.lower() == "pitch":
-                self.osc_addresses_in["pitchX"] = default
-            elif k.lower() == "aftertouch":
-                self.osc_addresses_in["afterX"] = default
-
-        self.save_config()
-        self.log_message("OSC Addresses reset to default.")
-        messagebox.showinfo("Reset", "OSC Addresses reset to default.")
-
-    # ---------------- Show Help ----------------
-    def show_help(self) -> None:
-        help_win = tk.Toplevel(self.master)
-        help_win.title("Help - OSC Commands")
-        help_win.geometry("500x700")
-        help_win.resizable(False, False)
-        help_win.transient(self.master)
-        help_win.grab_set()
-        text = tk.Text(help_win, wrap="word", bg="#2B2B2B", fg="#FFFFFF", font=("Courier", 10))
-        text.pack(expand=True, fill="both", padx=10, pady=10)
-        help_text = f"""
------- OSC Addresses (Incoming) ------
-Static (editable):
-  pause: {self.osc_addresses_in.get("pause", "/pause")}
-  play: {self.osc_addresses_in.get("play", "/play")}
-  skip: {self.osc_addresses_in.get("skip", "/skip")}
-  back: {self.osc_addresses_in.get("back", "/back")}
-  previous: {self.osc_addresses_in.get("previous", "/previous")}
-  bpm: {self.osc_addresses_in.get("bpm", "/bpm")}
-  bpm1: {self.osc_addresses_in.get("bpm1", "/bpm1")}
-  resetbpm: {self.osc_addresses_in.get("resetbpm", "/resetbpm")}
-  generic: {self.osc_addresses_in.get("generic", "/generic")}
-
-Dynamic Incoming (Template):
-  /noteX         (for note_on messages)
-  /noteoffX      (for note_off messages)
-  /ccX           (for control change messages)
-  /pitchX        (for pitchbend messages)
-  /afterX        (for aftertouch messages)
-
------- OSC Addresses (Outgoing) ------
-Static (editable):
-  sync: {self.osc_addresses_out.get("sync", "/sync")}
-
-Dynamic Outgoing (automatic by channel):
-  note_on  --> /noteX
-  note_off --> /noteoffX
-  cc       --> /ccX
-  pitchwheel --> /pitchX
-  aftertouch --> /afterX
-
-Example OSC Commands:
-  /note5 60 0.8         --> MIDI note_on on channel 5, velocity ~102, auto note_off after slider delay.
-  /noteoff5 60 0        --> MIDI note_off on channel 5.
-  /cc3 10 0.5           --> MIDI control_change on channel 3, cc=10, value=~63.
-  /pitch2 4096          --> MIDI pitchbend on channel 2.
-  /after2 64            --> MIDI aftertouch on channel 2.
-  /generic "note_on" 60 0.8  --> Converts OSC to MIDI note_on (default channel).
-  /delay 1.2            --> Sets the Note Off Delay to 1.2s via OSC.
-"""
-        text.insert("1.0", help_text)
-        text.config(state="disabled")
-
-    # ---------------- UI Toggles ----------------
-    def toggle_midi_menu(self) -> None:
-        if self.alarm_frame_visible:
-            self.alarm_frame.pack_forget()
-            self.alarm_frame_visible = False
-            self.alarm_menu_button.config(text="≡ Alarm Clock")
-        if self.cc_frame_visible:
-            self.cc_frame.pack_forget()
-            self.cc_frame_visible = False
-            self.cc_menu_button.config(text="≡ CC")
-        if self.content_visible:
-            self.content_frame.pack_forget()
-            self.content_visible = False
-            self.menu_button.config(text="≡ Midi Player/Log")
-            self.log_message("MIDI Player/Log UI hidden.")
-        else:
-            self.content_frame.pack(fill=tk.BOTH, expand=True)
-            self.content_visible = True
-            self.menu_button.config(text="≡ Hide Midi Player/Log")
-            self.log_message("MIDI Player/Log UI shown.")
-        self.master.update_idletasks()
-        self.master.geometry("")
-
-    def toggle_alarm_menu(self) -> None:
-        if self.content_visible:
-            self.content_frame.pack_forget()
-            self.content_visible = False
-            self.menu_button.config(text="≡ Midi Player/Log")
-        if self.cc_frame_visible:
-            self.cc_frame.pack_forget()
-            self.cc_frame_visible = False
-            self.cc_menu_button.config(text="≡ CC")
-        if self.alarm_frame_visible:
-            self.alarm_frame.pack_forget()
-            self.alarm_frame_visible = False
-            self.alarm_menu_button.config(text="≡ Alarm Clock")
-            self.log_message("Alarm Clock UI hidden.")
-        else:
-            self.alarm_frame.pack(fill=tk.BOTH, expand=True)
-            self.alarm_frame_visible = True
-            self.alarm_menu_button.config(text="≡ Hide Alarm Clock")
-            self.log_message("Alarm Clock UI shown.")
-        self.master.update_idletasks()
-        self.master.geometry("")
-
-    def toggle_cc_menu(self) -> None:
-        if self.content_visible:
-            self.content_frame.pack_forget()
-            self.content_visible = False
-            self.menu_button.config(text="≡ Midi Player/Log")
-        if self.alarm_frame_visible:
-            self.alarm_frame.pack_forget()
-            self.alarm_frame_visible = False
-            self.alarm_menu_button.config(text="≡ Alarm Clock")
-        if self.cc_frame_visible:
-            self.cc_frame.pack_forget()
-            self.cc_frame_visible = False
-            self.cc_menu_button.config(text="≡ CC")
-            self.log_message("CC UI hidden.")
-        else:
-            self.cc_frame.pack(fill=tk.BOTH, expand=True)
-            self.cc_frame_visible = True
-            self.cc_menu_button.config(text="≡ Hide CC")
-            self.log_message("CC UI shown.")
-        self.master.update_idletasks()
-        self.master.geometry("")
-
-    # ---------------- Connection / Cleanup ----------------
-    def quit_app(self) -> None:
-        try:
-            if self.midi_out:
-                self.midi_out.close()
-        except Exception as e:
-            logging.debug(f"Error closing MIDI output: {e}")
-        finally:
-            self.playing = False
-            self.pause_event.clear()
-            self.skip_event.set()
-            self.back_event.set()
-            self.previous_event.set()
-            self.skip_to_event.set()
-            self.sync_stop_event.set()
-            if self.sync_thread and self.sync_thread.is_alive():
-                self.sync_thread.join(timeout=1)
-            if self.osc_server:
-                self.osc_server.shutdown()
-                self.osc_server = None
-                self.set_connection_status("red")
-                self.log_message("OSC Server stopped.")
-            self.master.quit()
-
-    # ---------------- Display OSC Addresses ----------------
-    def display_osc_addresses(self) -> None:
-        self.log_message("------ OSC Addresses ------")
-        self.log_message("Static Incoming:")
-        for k, v in self.osc_addresses_in.items():
-            if not k.endswith("X"):
-                self.log_message(f"  {k}: {v}")
-        self.log_message("Static Outgoing:")
-        for k, v in self.osc_addresses_out.items():
-            self.log_message(f"  {k}: {v}")
-        self.log_message("Dynamic Incoming (Template):")
-        self.log_message("  /noteX         (for note_on messages)")
-        self.log_message("  /noteoffX      (for note_off messages)")
-        self.log_message("  /ccX           (for control change messages)")
-        self.log_message("  /pitchX        (for pitchbend messages)")
-        self.log_message("  /afterX        (for aftertouch messages)")
-        self.log_message("------------------------------")
-
-    # ---------------- Wrapper for Previous ----------------
-    def handle_previous(self, *args):
-        self.previous()
-
-# ---------------- Main Execution ----------------
-if __name__ == "__main__":
-    root = tk.Tk()
-    root.geometry("500x420")
-    app = OSCMIDIApp(root)
-    root.protocol("WM_DELETE_WINDOW", app.quit_app)
-    root.mainloop()
-
+import time
+
+STARTUP_T0 = time.perf_counter()  # time-to-first-window is measured from here, before the heavy imports
+
+import argparse  # noqa: E402
+import logging  # noqa: E402
+import logging.handlers  # noqa: E402
+import mido  # noqa: E402
+from mido import MidiFile  # noqa: E402
+import threading  # noqa: E402
+import socket  # noqa: E402
+import json  # noqa: E402
+import re  # noqa: E402
+import os  # noqa: E402
+import random  # noqa: E402
+import queue  # noqa: E402
+import heapq  # noqa: E402
+import bisect  # noqa: E402
+import itertools  # noqa: E402
+import math  # noqa: E402
+from array import array  # noqa: E402
+from collections import deque, namedtuple  # noqa: E402
+from datetime import datetime, timedelta  # noqa: E402
+import asyncio  # noqa: E402
+import signal  # noqa: E402
+import sys  # noqa: E402
+import struct  # noqa: E402
+import zlib  # noqa: E402
+import multiprocessing as mp  # noqa: E402
+from multiprocessing import shared_memory  # noqa: E402
+from pythonosc import dispatcher, osc_server, udp_client, osc_bundle, osc_message  # noqa: E402
+from pythonosc import osc_bundle_builder, osc_message_builder  # noqa: E402
+from pythonosc.parsing import osc_types  # noqa: E402
+
+# --------------------- Logging Configuration --------------------- #
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "off": logging.CRITICAL + 1,
+}
+
+
+def parse_log_level(value) -> int:
+    """Accepts a level name from LOG_LEVELS or a numeric logging level."""
+    if isinstance(value, str) and value.lower() in LOG_LEVELS:
+        return LOG_LEVELS[value.lower()]
+    return int(float(value))
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """One compact JSON object per record, for loading into analysis tools afterwards."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "t": round(record.created, 6),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(",", ":"))
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler formats every record in the calling thread; here that
+    would be a MIDI, OSC or playback thread. Records stay in-process, so they
+    are queued as they are. When the queue is full the record is dropped and
+    counted rather than blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogBackend:
+    """
+    Routes the root logger through a bounded queue to a QueueListener thread,
+    which writes the console, a size-rotated text log and, optionally, a
+    JSON-lines file. Callers only pay for building a record and a put.
+    """
+    QUEUE_SIZE = 10000
+    MAX_BYTES = 1_000_000
+    BACKUP_COUNT = 3
+
+    def __init__(self, level: int = logging.INFO, log_file: str = None, json_file: str = None,
+                 console: bool = True) -> None:
+        self.queue = queue.Queue(self.QUEUE_SIZE)
+        self.handler = DeferredQueueHandler(self.queue)
+        handlers = []
+        text = logging.Formatter(LOG_FORMAT, datefmt="%H:%M:%S")
+        if console:
+            stream = logging.StreamHandler()
+            stream.setFormatter(text)
+            handlers.append(stream)
+        if log_file:
+            rotating = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=self.MAX_BYTES, backupCount=self.BACKUP_COUNT, encoding="utf-8")
+            rotating.setFormatter(logging.Formatter(LOG_FORMAT))
+            handlers.append(rotating)
+        if json_file:
+            jsonl = logging.handlers.RotatingFileHandler(
+                json_file, maxBytes=self.MAX_BYTES, backupCount=self.BACKUP_COUNT, encoding="utf-8")
+            jsonl.setFormatter(JSONLinesFormatter())
+            handlers.append(jsonl)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers)
+        self.level = level
+
+    def start(self) -> None:
+        root = logging.getLogger()
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Flushes everything queued so far and closes the files."""
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        if self.handler.dropped:
+            sys.stderr.write(f"{self.handler.dropped} log records dropped (queue full)\n")
+
+# --------------------- Tk (loaded on demand) --------------------- #
+tk = ttk = messagebox = filedialog = None
+
+
+def import_tk() -> None:
+    """Imports tkinter into the module globals; headless mode never loads it."""
+    global tk, ttk, messagebox, filedialog
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog
+
+# --------------------- Tooltip Class Definition --------------------- #
+class Tooltip:
+    """Creates a tooltip for a widget when the mouse hovers over it."""
+    def __init__(self, widget, text: str = "widget info"):
+        self.widget = widget
+        self.text = text
+        self.tooltip_window = None
+        self.widget.bind("<Enter>", self.show_tooltip)
+        self.widget.bind("<Leave>", self.hide_tooltip)
+
+    def show_tooltip(self, event=None) -> None:
+        if self.tooltip_window or not self.text:
+            return
+        self.tooltip_window = tw = tk.Toplevel(self.widget)
+        tw.wm_overrideredirect(True)
+        x_offset = self.widget.winfo_rootx() + 20
+        y_offset = self.widget.winfo_rooty() + 20
+        tw.wm_geometry(f"+{x_offset}+{y_offset}")
+        label = tk.Label(
+            tw,
+            text=self.text,
+            justify="left",
+            background="#333333",
+            foreground="#FFFFFF",
+            relief="solid",
+            borderwidth=1,
+            font=("tahoma", 8, "normal"),
+        )
+        label.pack(ipadx=1, ipady=1)
+
+    def hide_tooltip(self, event=None) -> None:
+        if self.tooltip_window:
+            self.tooltip_window.destroy()
+        self.tooltip_window = None
+
+# --------------------- MIDI Port Watcher --------------------- #
+class MidiPortWatcher:
+    """Polls the MIDI port lists on a background thread and reports changes."""
+    def __init__(self, on_change, on_poll=None, interval: float = 2.0):
+        self.on_change = on_change
+        self.on_poll = on_poll
+        self.interval = interval
+        self.input_ports = []
+        self.output_ports = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def refresh(self) -> bool:
+        """Re-enumerates ports; calls on_change and returns True if either list changed."""
+        try:
+            inputs = mido.get_input_names()
+        except Exception:
+            inputs = []
+        try:
+            outputs = mido.get_output_names()
+        except Exception:
+            outputs = []
+        if inputs == self.input_ports and outputs == self.output_ports:
+            return False
+        self.input_ports = inputs
+        self.output_ports = outputs
+        self.on_change(inputs, outputs)
+        return True
+
+    def _run(self) -> None:
+        # The first scan runs straight away here rather than on the startup path.
+        while True:
+            try:
+                self.refresh()
+                if self.on_poll:
+                    self.on_poll(self.input_ports, self.output_ports)
+            except Exception as e:
+                logging.debug(f"MIDI port refresh error: {e}")
+            if self._stop_event.wait(self.interval):
+                break
+
+# --------------------- Local Interfaces --------------------- #
+def list_local_ips():
+    """Returns [(interface, IPv4 address)] without contacting any external host.
+
+    Linux asks every interface for its address. Elsewhere the host name is
+    resolved, falling back to a routing lookup (a UDP connect sends nothing).
+    """
+    ips = []
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            for _, name in socket.if_nameindex():
+                try:
+                    req = struct.pack("256s", name.encode()[:15])
+                    addr = fcntl.ioctl(s.fileno(), 0x8915, req)[20:24]  # SIOCGIFADDR
+                except OSError:
+                    continue  # down, or no IPv4 address
+                ips.append((name, socket.inet_ntoa(addr)))
+        return ips
+    host = socket.gethostname()
+    try:
+        for info in socket.getaddrinfo(host, None, socket.AF_INET):
+            if (host, info[4][0]) not in ips:
+                ips.append((host, info[4][0]))
+    except OSError:
+        pass
+    if not any(not ip.startswith("127.") for _, ip in ips):
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.connect(("8.8.8.8", 80))
+            ips.append(("default route", s.getsockname()[0]))
+        except OSError:
+            pass
+        finally:
+            s.close()
+    return ips
+
+
+def primary_ip(ips) -> str:
+    """First non-loopback address in ips, else 127.0.0.1."""
+    for _, ip in ips:
+        if not ip.startswith("127."):
+            return ip
+    return "127.0.0.1"
+
+# --------------------- Ring Buffers --------------------- #
+def pack_midi(data) -> int:
+    """Packs a 1-3 byte MIDI message into an int (length in bits 24-31); -1 if it doesn't fit."""
+    n = len(data)
+    if not 0 < n <= 3:
+        return -1
+    word = n << 24
+    for i, b in enumerate(data):
+        word |= b << (16 - 8 * i)
+    return word
+
+
+def unpack_midi(word: int):
+    n = (word >> 24) & 0xFF
+    return [(word >> (16 - 8 * i)) & 0xFF for i in range(n)]
+
+
+class SPSCRing:
+    """Preallocated single-producer/single-consumer ring of (float, int) records.
+
+    Records live in two fixed arrays; the head index is written only by the
+    producer and the tail only by the consumer, so neither side takes a lock
+    and push/pop allocate no containers. Overflow policies:
+      DROP_NEWEST  reject the record being pushed
+      DROP_OLDEST  overwrite the oldest unread record; the consumer skips ahead
+      BLOCK        yield until there is room, dropping after block_timeout
+    """
+    DROP_NEWEST, DROP_OLDEST, BLOCK = "drop_newest", "drop_oldest", "block"
+
+    def __init__(self, name: str, capacity: int = 1024, policy: str = DROP_NEWEST, block_timeout: float = 0.005):
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError("Ring capacity must be a power of two.")
+        self.name = name
+        self.capacity = capacity
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._mask = capacity - 1
+        self._times = array("d", bytes(8 * capacity))
+        self._words = array("Q", bytes(8 * capacity))
+        self._head = 0  # producer only
+        self._tail = 0  # consumer only
+        # Metrics: pushed/dropped/high_water are producer-owned, overwritten is consumer-owned.
+        self.pushed = 0
+        self.dropped = 0
+        self.high_water = 0
+        self.overwritten = 0
+
+    def __len__(self) -> int:
+        return min(self._head - self._tail, self.capacity)
+
+    def full(self) -> bool:
+        return self._head - self._tail >= self.capacity
+
+    def push(self, t: float, word: int) -> bool:
+        head = self._head
+        if head - self._tail >= self.capacity and self.policy != self.DROP_OLDEST:
+            if self.policy == self.BLOCK:
+                give_up = time.perf_counter() + self.block_timeout
+                while head - self._tail >= self.capacity:
+                    if time.perf_counter() >= give_up:
+                        self.dropped += 1
+                        return False
+                    time.sleep(0)
+            else:
+                self.dropped += 1
+                return False
+        i = head & self._mask
+        self._times[i] = t
+        self._words[i] = word
+        self._head = head + 1
+        self.pushed += 1
+        used = head + 1 - self._tail
+        if used > self.high_water:
+            self.high_water = min(used, self.capacity)
+        return True
+
+    def pop(self):
+        """Returns the oldest (t, word), or None when empty."""
+        while True:
+            tail, head = self._tail, self._head
+            if head - tail > self.capacity:
+                # DROP_OLDEST: the producer lapped us.
+                self.overwritten += head - self.capacity - tail
+                tail = head - self.capacity
+            if tail == head:
+                self._tail = tail
+                return None
+            i = tail & self._mask
+            t, word = self._times[i], self._words[i]
+            if self._head - tail > self.capacity:
+                continue  # overwritten while we read it; skip ahead and retry
+            self._tail = tail + 1
+            return t, word
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "occupancy": len(self),
+            "capacity": self.capacity,
+            "high_water": self.high_water,
+            "dropped": self.dropped + self.overwritten,
+            "policy": self.policy,
+        }
+
+    def describe(self) -> str:
+        st = self.stats()
+        return (f"{st['name']}: {st['occupancy']}/{st['capacity']} queued, peak {st['high_water']}, "
+                f"{st['dropped']} dropped ({st['policy']})")
+
+
+class RingConsumer:
+    """Drains an SPSCRing on a dedicated thread, calling handler(t, word) per record.
+
+    The thread parks on an Event only when the ring is empty, and the producer
+    only touches that Event while the consumer is parked, so a busy stream never
+    takes a lock.
+    """
+    def __init__(self, ring: SPSCRing, handler, name: str):
+        self.ring = ring
+        self.handler = handler
+        self._wake = threading.Event()
+        self._parked = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def push(self, t: float, word: int) -> bool:
+        if not self.ring.push(t, word):
+            return False
+        if self._parked:
+            self._wake.set()
+        return True
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+
+    def _run(self) -> None:
+        ring = self.ring
+        while not self._stopped:
+            rec = ring.pop()
+            if rec is None:
+                self._parked = True
+                if not len(ring):
+                    self._wake.wait(0.5)
+                self._wake.clear()
+                self._parked = False
+                continue
+            try:
+                self.handler(*rec)
+            except Exception as e:
+                logging.error(f"{ring.name} consumer error: {e}")
+
+
+class PrecisionSender:
+    """Dedicated thread that releases ring records at their time.perf_counter() deadlines.
+
+    Records are drained into a local min-heap. The thread sleeps until just
+    before the earliest deadline, then spins for the last SPIN seconds, so
+    emission is not bound to the event loop's timer granularity.
+    handler(deadline, word) runs on this thread.
+    """
+    SPIN = 0.0015
+
+    def __init__(self, handler, name: str = "PrecisionSender", capacity: int = 4096):
+        self.ring = SPSCRing(name, capacity, SPSCRing.DROP_NEWEST)
+        self.handler = handler
+        self.name = name
+        self._heap = []
+        self._wake = threading.Event()
+        self._parked = False
+        self._stopped = False
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+
+    def full(self) -> bool:
+        return self.ring.full()
+
+    def push(self, deadline: float, word: int) -> bool:
+        if not self.ring.push(deadline, word):
+            return False
+        if self._parked:
+            self._wake.set()
+        return True
+
+    def _run(self) -> None:
+        ring, heap = self.ring, self._heap
+        seq = 0
+        while not self._stopped:
+            rec = ring.pop()
+            while rec is not None:
+                heapq.heappush(heap, (rec[0], seq, rec[1]))
+                seq += 1
+                rec = ring.pop()
+            timeout = heap[0][0] - time.perf_counter() - self.SPIN if heap else 0.5
+            if timeout > 0:
+                self._parked = True
+                if not len(ring):
+                    self._wake.wait(timeout)
+                self._wake.clear()
+                self._parked = False
+                continue
+            deadline, _, word = heapq.heappop(heap)
+            while time.perf_counter() < deadline:
+                time.sleep(0)
+            try:
+                self.handler(deadline, word)
+            except Exception as e:
+                logging.error(f"{self.name} handler error: {e}")
+
+# --------------------- Async Engine --------------------- #
+class AsyncEngine:
+    """Runs OSC receive/send, MIDI input, playback, note-offs and sync on one asyncio loop.
+
+    The loop owns a single background thread so Tk keeps the main thread.
+    Bridge handlers run on this loop; other threads hand work over with
+    call_soon(), call_later() or submit().
+    """
+    MIDI_IN_CAPACITY = 1024
+
+    def __init__(self):
+        self.loop = None
+        self._thread = None
+        self._osc_transport = None
+        self._timer_period_set = False
+        # MIDI input thread -> loop. BLOCK pushes back on the driver thread briefly
+        # rather than dropping live notes.
+        self.midi_in_ring = SPSCRing("midi->osc", self.MIDI_IN_CAPACITY, SPSCRing.BLOCK)
+        self._midi_in_handler = None
+        self._midi_in_scheduled = False
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        if sys.platform == "win32":
+            # The proactor loop waits with millisecond timeouts that Windows rounds up to
+            # its ~15.6 ms tick unless the system timer resolution is raised.
+            try:
+                import ctypes
+                ctypes.windll.winmm.timeBeginPeriod(1)
+                self._timer_period_set = True
+            except Exception as e:
+                logging.debug(f"timeBeginPeriod failed: {e}")
+        ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="AsyncEngine", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _run(self, ready: threading.Event) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+
+    def stop(self) -> None:
+        if not self._thread or not self.loop.is_running():
+            return
+        self.stop_osc()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout=2)
+        if self._timer_period_set:
+            import ctypes
+            ctypes.windll.winmm.timeEndPeriod(1)
+            self._timer_period_set = False
+
+    def in_loop(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def call_soon(self, fn, *args) -> None:
+        if self.in_loop():
+            self.loop.call_soon(fn, *args)
+        else:
+            self.loop.call_soon_threadsafe(fn, *args)
+
+    def call_later(self, delay: float, fn, *args) -> None:
+        if self.in_loop():
+            self.loop.call_later(delay, fn, *args)
+        else:
+            self.loop.call_soon_threadsafe(self.loop.call_later, delay, fn, *args)
+
+    def submit(self, coro):
+        """Schedules a coroutine on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    # ---------------- OSC ----------------
+    def serve_osc(self, port: int, disp, timeout: float = 2.0) -> None:
+        """Binds the OSC receive endpoint on the loop. Raises OSError if the port can't be bound."""
+        async def bind():
+            server = osc_server.AsyncIOOSCUDPServer(("0.0.0.0", port), disp, self.loop)
+            transport, _ = await server.create_serve_endpoint()
+            return transport
+        self.stop_osc()
+        self._osc_transport = self.submit(bind()).result(timeout)
+
+    def stop_osc(self) -> None:
+        transport, self._osc_transport = self._osc_transport, None
+        if transport:
+            self.call_soon(transport.close)
+
+    @property
+    def serving(self) -> bool:
+        return self._osc_transport is not None
+
+    # ---------------- MIDI ----------------
+    def open_midi_input(self, name: str, handler):
+        """Opens a MIDI input whose messages are delivered to handler on the loop.
+
+        Short messages go through midi_in_ring and the loop is only woken when no
+        drain is already pending, so a burst costs one wakeup instead of one per
+        message. SysEx and other long messages are handed over directly.
+        """
+        loop, ring = self.loop, self.midi_in_ring
+        self._midi_in_handler = handler
+
+        def on_message(msg):
+            word = pack_midi(msg.bytes())
+            if word < 0:
+                loop.call_soon_threadsafe(handler, msg)
+            elif ring.push(time.perf_counter(), word) and not self._midi_in_scheduled:
+                self._midi_in_scheduled = True
+                loop.call_soon_threadsafe(self._drain_midi_in)
+        return mido.open_input(name, callback=on_message)
+
+    def _drain_midi_in(self) -> None:
+        ring, handler = self.midi_in_ring, self._midi_in_handler
+        while True:
+            rec = ring.pop()
+            while rec is not None:
+                try:
+                    # time carries the perf_counter arrival time, for clock following.
+                    handler(mido.Message.from_bytes(unpack_midi(rec[1]), time=rec[0]))
+                except Exception as e:
+                    logging.error(f"MIDI input handler error: {e}")
+                rec = ring.pop()
+            self._midi_in_scheduled = False
+            # A push that saw the flag still set didn't ring; pick its record up here.
+            if not len(ring):
+                return
+            self._midi_in_scheduled = True
+
+# --------------------- Feedback Loop Guard --------------------- #
+class FeedbackGuard:
+    """Remembers hashes of recently emitted messages, per direction, to spot echoes.
+
+    A direction is "osc->midi" (MIDI we sent for incoming OSC) or "midi->osc"
+    (OSC we sent for incoming MIDI). An incoming message matching something
+    we emitted in that direction within the window is our own output coming
+    back round a loop, and each emitted message can cancel at most one echo.
+
+    OSC sent by the playback process is seen through a SharedEchoWindow
+    (see follow()), so osc_key must give the same key in every process.
+    """
+    MAX_ENTRIES = 4096
+
+    def __init__(self, window: float = 0.5):
+        self.window = window
+        self._recent = {"osc->midi": deque(), "midi->osc": deque()}
+        self._counts = {"osc->midi": {}, "midi->osc": {}}  # emitted and not yet matched by an echo
+        self._matched = {"osc->midi": {}, "midi->osc": {}}  # matched, still waiting in _recent to expire
+        self.dropped = {"osc->midi": 0, "midi->osc": 0}
+        self._lock = threading.Lock()
+        self._shared = None  # SharedEchoWindow of the playback process's midi->osc output
+        self._shared_read = 0
+
+    @staticmethod
+    def midi_key(msg) -> int:
+        return hash(tuple(msg.bytes()))
+
+    _FLOAT32 = struct.Struct("<f")
+
+    @classmethod
+    def osc_key(cls, address: str, args) -> int:
+        if not isinstance(args, (list, tuple)):
+            args = (args,)
+        # The same OSC value can come back as another type (60 as 60.0) or at float32 precision.
+        args = tuple(cls._osc_number(a) if isinstance(a, float) else a for a in args)
+        # Not hash(): string hashes differ between processes.
+        return zlib.crc32(repr((address, args)).encode())
+
+    @classmethod
+    def _osc_number(cls, value: float):
+        if value.is_integer():
+            return int(value)
+        try:
+            return cls._FLOAT32.unpack(cls._FLOAT32.pack(value))[0]
+        except OverflowError:
+            return value
+
+    def follow(self, window) -> None:
+        """Also treats keys the playback process writes to window (a SharedEchoWindow, or None) as midi->osc output."""
+        with self._lock:
+            self._shared = window
+            self._shared_read = window.count if window else 0
+
+    def record(self, direction: str, key: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(direction, now)
+            self._add(direction, now + self.window, key)
+
+    def is_echo(self, direction: str, key: int) -> bool:
+        """True (and counted as dropped) if key was emitted in this direction within the window."""
+        now = time.monotonic()
+        with self._lock:
+            counts = self._counts[direction]
+            if self._shared and direction == "midi->osc":
+                self._shared_read, entries = self._shared.read(self._shared_read)
+                for sent_at, shared_key in entries:
+                    self._add(direction, sent_at + self.window, shared_key)
+            self._expire(direction, now)
+            if not counts.get(key):
+                return False
+            self._discount(counts, key)
+            matched = self._matched[direction]
+            matched[key] = matched.get(key, 0) + 1
+            self.dropped[direction] += 1
+            return True
+
+    def _add(self, direction: str, expires: float, key: int) -> None:
+        recent, counts = self._recent[direction], self._counts[direction]
+        if len(recent) >= self.MAX_ENTRIES:
+            self._pop_oldest(direction)
+        recent.append((expires, key))
+        counts[key] = counts.get(key, 0) + 1
+
+    def _expire(self, direction: str, now: float) -> None:
+        recent = self._recent[direction]
+        while recent and recent[0][0] <= now:
+            self._pop_oldest(direction)
+
+    def _pop_oldest(self, direction: str) -> None:
+        # Echoes match the oldest emissions of a key first, so a key's oldest
+        # entry is a matched one while any are; it must not also cancel a
+        # newer, unmatched emission of the same key.
+        _, key = self._recent[direction].popleft()
+        matched = self._matched[direction]
+        self._discount(matched if matched.get(key) else self._counts[direction], key)
+
+    @staticmethod
+    def _discount(counts, key: int) -> None:
+        n = counts.get(key, 0) - 1
+        if n > 0:
+            counts[key] = n
+        else:
+            counts.pop(key, None)
+
+class SharedEchoWindow:
+    """Ring of (time.monotonic(), osc_key) in shared memory: OSC the playback process sent.
+
+    The playback process pushes each key before the datagram leaves, so the
+    UI process's FeedbackGuard already has it when an echo can arrive. Slot 0
+    holds the number of keys pushed so far, written after the entry itself;
+    there is one writer, and a reader that falls more than SLOTS behind
+    skips to the oldest entry still in the ring.
+    """
+    SLOTS = 1024
+    COUNT = struct.Struct("<q")
+    ENTRY = struct.Struct("<dq")
+
+    def __init__(self, name: str = None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.COUNT.size + self.ENTRY.size * self.SLOTS)
+            self.shm.buf[:self.COUNT.size] = bytes(self.COUNT.size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+    @property
+    def count(self) -> int:
+        return self.COUNT.unpack_from(self.shm.buf, 0)[0]
+
+    def push(self, key: int) -> None:
+        n = self.count
+        self.ENTRY.pack_into(self.shm.buf, self.COUNT.size + self.ENTRY.size * (n % self.SLOTS), time.monotonic(), key)
+        self.COUNT.pack_into(self.shm.buf, 0, n + 1)
+
+    def read(self, since: int):
+        """(new count, [(time, key)]) for the entries pushed after the first since."""
+        n = self.count
+        since = max(since, n - self.SLOTS)
+        buf, entry, base = self.shm.buf, self.ENTRY, self.COUNT.size
+        return n, [entry.unpack_from(buf, base + entry.size * (i % self.SLOTS)) for i in range(since, n)]
+
+    def close(self) -> None:
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.shm.unlink()
+
+# --------------------- Timed OSC Dispatch --------------------- #
+class JitterBuffer:
+    """Evens out network jitter for one source that timetags its bundles.
+
+    Transit time (arrival minus timetag) includes the unknown offset between
+    the sender's clock and ours, but its variation is the jitter. The fastest
+    transit among the last WINDOW bundles is taken as the network's base
+    delay, and each bundle is released at its timetag + base + delay, where
+    delay is the QUANTILE of recent excess transit (at most MAX_DELAY). Delay
+    rises at once when jitter grows and relaxes slowly, so the spacing the
+    sender intended is kept.
+    """
+    WINDOW = 256
+    QUANTILE = 0.95
+    MAX_DELAY = 0.15
+    RELAX = 0.05  # fraction of the gap closed per update when jitter falls
+    UPDATE_EVERY = 16
+
+    def __init__(self):
+        self.transits = deque(maxlen=self.WINDOW)
+        self.delay = 0.0
+        self.jitter = 0.0  # RFC 3550 style smoothed transit variation, seconds
+        self.released = self.late = 0
+        self._last = None
+
+    def release_time(self, timetag: float, arrival: float) -> float:
+        """When (on arrival's clock) a bundle stamped timetag should be handled."""
+        transit = arrival - timetag
+        if self._last is not None:
+            self.jitter += (abs(transit - self._last) - self.jitter) / 16.0
+        self._last = transit
+        self.transits.append(transit)
+        base = min(self.transits)
+        self.released += 1
+        if self.released % self.UPDATE_EVERY == 0 or self.released < self.UPDATE_EVERY:
+            excess = sorted(t - base for t in self.transits)
+            target = min(self.MAX_DELAY, excess[int(self.QUANTILE * (len(excess) - 1))])
+            self.delay = target if target > self.delay else self.delay + (target - self.delay) * self.RELAX
+        release = timetag + base + self.delay
+        if release < arrival:
+            self.late += 1
+            return arrival
+        return release
+
+    def describe(self) -> str:
+        return (f"jitter {self.jitter * 1000.0:.1f} ms, delay {self.delay * 1000.0:.1f} ms, "
+                f"{self.late}/{self.released} late")
+
+
+class TimedDispatcher(dispatcher.Dispatcher):
+    """Dispatcher that honours the timetags of incoming OSC bundles.
+
+    Plain messages and bundles tagged "immediately" are handled on arrival, as
+    before. A bundle tagged for the future is held in a PrecisionSender and its
+    messages are handled on that thread at the stated time, so the MIDI they
+    produce is written then, the way playback writes it. A bundle whose time
+    has already passed follows late_policy: "play" handles it now, "drop"
+    discards it. Margins are measured against time.time(), the clock timetags
+    are given in.
+
+    With jitter_buffer on, timetags are read relative to each source instead:
+    a JitterBuffer per sender address holds its bundles just long enough to
+    even out network jitter, which works without synchronised clocks. Plain
+    messages carry no send time, so they are still handled on arrival.
+    """
+    LATE_POLICIES = ("play", "drop")
+    MAX_AHEAD = 60.0  # timetags further out than this are taken as clock errors and handled now
+
+    def __init__(self, late_policy: str = "play", jitter_buffer: bool = False, name: str = "BundleSender"):
+        super().__init__(strict_timing=False)
+        self.late_policy = late_policy
+        self.jitter_buffer = jitter_buffer
+        self.sources = {}  # sender address -> JitterBuffer
+        self.recorder = None  # SessionRecorder that journals every datagram received
+        self.received = 0  # datagrams received, reported to /ping
+        self.sender = PrecisionSender(self._send, name)
+        self._pending = {}  # record id -> (client address, messages) waiting in the sender
+        self._ids = itertools.count()
+        self.seen = 0  # timetagged bundles received so far
+        self.early = self.late = self.dropped = 0
+        self.max_early_ms = self.max_late_ms = 0.0
+
+    def close(self) -> None:
+        self.sender.stop()
+        self._pending.clear()
+
+    def describe(self) -> str:
+        parts = []
+        if self.early or self.late:
+            parts.append(f"bundles: {self.early} early (max {self.max_early_ms:.1f} ms ahead), "
+                         f"{self.late} late (max {self.max_late_ms:.1f} ms), {self.dropped} dropped")
+        for (ip, port), buffer in list(self.sources.items()):
+            parts.append(f"{ip}:{port} {buffer.describe()}")
+        return "\n".join(parts) or "bundles: none"
+
+    def call_handlers_for_packet(self, data: bytes, client_address):
+        self.received += 1
+        if self.recorder is not None and self.recorder.active:
+            self.recorder.record(SessionRecorder.OSC_IN, data)
+        if not osc_bundle.OscBundle.dgram_is_bundle(data):
+            return super().call_handlers_for_packet(data, client_address)
+        try:
+            bundles = self._flatten(osc_bundle.OscBundle(data))
+        except (osc_bundle.ParseError, osc_message.ParseError):
+            return []
+        now, clock = time.time(), time.perf_counter()
+        results = []
+        for timestamp, messages in bundles:
+            margin = timestamp - now
+            if timestamp == osc_types.IMMEDIATELY:
+                results.extend(self._invoke(client_address, messages))
+                continue
+            self.seen += 1
+            if self.jitter_buffer:
+                buffer = self.sources.get(client_address)
+                if buffer is None:
+                    buffer = self.sources[client_address] = JitterBuffer()
+                self._schedule(clock + buffer.release_time(timestamp, now) - now, client_address, messages)
+            elif margin > self.MAX_AHEAD:
+                results.extend(self._invoke(client_address, messages))
+            elif margin > 0:
+                self.early += 1
+                self.max_early_ms = max(self.max_early_ms, margin * 1000.0)
+                self._schedule(clock + margin, client_address, messages)
+            else:
+                self.late += 1
+                self.max_late_ms = max(self.max_late_ms, -margin * 1000.0)
+                if self.late_policy == "drop":
+                    self.dropped += 1
+                else:
+                    results.extend(self._invoke(client_address, messages))
+        return results
+
+    def _schedule(self, deadline: float, client_address, messages) -> None:
+        key = next(self._ids)
+        self._pending[key] = (client_address, messages)
+        if self.sender.push(deadline, key):
+            self.sender.start()
+        else:
+            del self._pending[key]
+            self.dropped += 1
+
+    @classmethod
+    def _flatten(cls, bundle):
+        """(timetag, messages) for a bundle and each bundle nested in it."""
+        messages = [c for c in bundle if isinstance(c, osc_message.OscMessage)]
+        out = [(bundle.timestamp, messages)] if messages else []
+        for content in bundle:
+            if isinstance(content, osc_bundle.OscBundle):
+                out.extend(cls._flatten(content))
+        return out
+
+    def _invoke(self, client_address, messages) -> list:
+        results = []
+        for message in messages:
+            for handler in self.handlers_for_address(message.address):
+                result = handler.invoke(client_address, message)
+                if result is not None:
+                    results.append(result)
+        return results
+
+    def _send(self, deadline: float, key: int) -> None:
+        entry = self._pending.pop(key, None)
+        if entry is not None:
+            self._invoke(*entry)
+
+# --------------------- Channel State --------------------- #
+class ChannelState:
+    """What has been sent to one destination, per MIDI channel, as 16x128 byte matrices.
+
+    update() is O(1) and runs on the send path. held notes can be released
+    in one batch, and messages() rebuilds the whole state (program,
+    controllers, pitch bend, channel pressure and held notes) for a receiver
+    that joins late or reconnects. Single-byte writes need no lock.
+    """
+    UNSET = 0xFF
+
+    def __init__(self):
+        self.notes = bytearray(16 * 128)  # velocity of each held note, 0 when off
+        self.controls = bytearray(b"\xff" * (16 * 128))
+        self.programs = bytearray(b"\xff" * 16)
+        self.pressure = bytearray(b"\xff" * 16)
+        self.bends = [None] * 16
+
+    def update(self, msg) -> None:
+        kind = msg.type
+        if kind == "note_on":
+            self.notes[msg.channel << 7 | msg.note] = msg.velocity
+        elif kind == "note_off":
+            self.notes[msg.channel << 7 | msg.note] = 0
+        elif kind == "control_change":
+            self.controls[msg.channel << 7 | msg.control] = msg.value
+            if msg.control in (120, 123):  # all sound off / all notes off
+                self.notes[msg.channel << 7:(msg.channel + 1) << 7] = bytes(128)
+        elif kind == "pitchwheel":
+            self.bends[msg.channel] = msg.pitch
+        elif kind == "program_change":
+            self.programs[msg.channel] = msg.program
+        elif kind == "aftertouch":
+            self.pressure[msg.channel] = msg.value
+
+    def held(self):
+        """(channel, note, velocity) of every held note."""
+        notes = self.notes
+        if not any(notes):
+            return []
+        return [(i >> 7, i & 0x7F, v) for i, v in enumerate(notes) if v]
+
+    def release(self) -> list:
+        """note_offs for every held note, which are then forgotten."""
+        offs = [mido.Message("note_off", channel=ch, note=note) for ch, note, _ in self.held()]
+        self.notes[:] = bytes(len(self.notes))
+        return offs
+
+    def messages(self, notes: bool = True) -> list:
+        """The messages that recreate this state: program, controllers, pitch bend, pressure, then notes."""
+        out = [mido.Message("program_change", channel=ch, program=p)
+               for ch, p in enumerate(self.programs) if p != self.UNSET]
+        out += [mido.Message("control_change", channel=i >> 7, control=i & 0x7F, value=v)
+                for i, v in enumerate(self.controls) if v != self.UNSET]
+        out += [mido.Message("pitchwheel", channel=ch, pitch=b) for ch, b in enumerate(self.bends) if b is not None]
+        out += [mido.Message("aftertouch", channel=ch, value=v)
+                for ch, v in enumerate(self.pressure) if v != self.UNSET]
+        if notes:
+            out += [mido.Message("note_on", channel=ch, note=note, velocity=v) for ch, note, v in self.held()]
+        return out
+
+    def clear(self) -> None:
+        self.__init__()
+
+# --------------------- MIDI Transforms --------------------- #
+TRANSFORM_DIRECTIONS = ("midi_to_osc", "osc_to_midi")
+
+
+class TransformTable:
+    """One direction's transform rules, compiled into per-channel lookup tables.
+
+    Rules are keyed by input channel ("1".."16", or "all" for defaults that a
+    channel's own rules override):
+      channel     output channel (1-16)
+      mute        true drops the channel
+      transpose   semitones added to notes
+      notes       [low, high]: notes outside are dropped (before transposing)
+      velocity    a curve for note_on velocities: a gamma number, or
+                  {"gamma", "min", "max"}, or [[in, out], ...] points
+      cc          {"in": out} renumbers controllers; an out of null drops one
+
+    Everything is resolved into 16x128 byte tables at compile time, so apply()
+    costs a few indexings per message and returns msg itself when nothing
+    changes it, or None when it is dropped.
+    """
+    DROP = 0xFF
+    RULE_KEYS = ("channel", "mute", "transpose", "notes", "velocity", "cc")
+
+    def __init__(self, rules: dict):
+        self.channels = bytearray(range(16))
+        self.notes = bytearray(16 * 128)
+        self.velocities = bytearray(16 * 128)
+        self.controls = bytearray(16 * 128)
+        defaults = rules.get("all", {})
+        for key in rules:
+            if key != "all" and not (key.isdigit() and 1 <= int(key) <= 16):
+                raise ValueError(f"unknown channel '{key}' (use 1-16 or all)")
+        for ch in range(16):
+            self._compile(ch, {**defaults, **rules.get(str(ch + 1), {})})
+
+    def _compile(self, ch: int, rule: dict) -> None:
+        unknown = set(rule) - set(self.RULE_KEYS)
+        if unknown:
+            raise ValueError(f"channel {ch + 1}: unknown rule {', '.join(sorted(unknown))}")
+        base = ch << 7
+        out = int(rule.get("channel", ch + 1))
+        if not 1 <= out <= 16:
+            raise ValueError(f"channel {ch + 1}: output channel {out} out of range 1-16")
+        self.channels[ch] = self.DROP if rule.get("mute") else out - 1
+        transpose = int(rule.get("transpose", 0))
+        low, high = rule.get("notes", (0, 127))
+        for note in range(128):
+            moved = note + transpose
+            keep = low <= note <= high and 0 <= moved <= 127
+            self.notes[base + note] = moved if keep else self.DROP
+        self.velocities[base:base + 128] = bytes(self.velocity_curve(rule.get("velocity")))
+        cc = rule.get("cc", {})
+        for control in range(128):
+            target = cc.get(str(control), control)
+            if target is not None and not 0 <= int(target) <= 127:
+                raise ValueError(f"channel {ch + 1}: controller {target} out of range 0-127")
+            self.controls[base + control] = self.DROP if target is None else int(target)
+
+    @staticmethod
+    def velocity_curve(spec) -> list:
+        """Output velocity for each input velocity; 0 stays 0 and nothing else becomes 0 (a note-off)."""
+        if spec is None:
+            return list(range(128))
+        if isinstance(spec, (int, float)):
+            spec = {"gamma": spec}
+        if isinstance(spec, dict):
+            gamma = float(spec.get("gamma", 1.0))
+            low, high = int(spec.get("min", 1)), int(spec.get("max", 127))
+            if gamma <= 0:
+                raise ValueError("velocity gamma must be positive")
+            curve = [low + (high - low) * (v / 127.0) ** gamma for v in range(128)]
+        else:
+            points = sorted((int(a), int(b)) for a, b in spec)
+            if not points:
+                raise ValueError("velocity points list is empty")
+            xs = [a for a, _ in points]
+            curve = []
+            for v in range(128):
+                i = bisect.bisect_left(xs, v)
+                if i == 0:
+                    curve.append(points[0][1])
+                elif i == len(points):
+                    curve.append(points[-1][1])
+                else:
+                    (x0, y0), (x1, y1) = points[i - 1], points[i]
+                    curve.append(y0 + (y1 - y0) * (v - x0) / (x1 - x0))
+        return [0] + [min(127, max(1, round(c))) for c in curve[1:]]
+
+    def apply(self, msg):
+        channel = getattr(msg, "channel", None)
+        if channel is None:
+            return msg
+        out = self.channels[channel]
+        if out == self.DROP:
+            return None
+        kind = msg.type
+        if kind == "note_on" or kind == "note_off" or kind == "polytouch":
+            index = channel << 7
+            note = self.notes[index | msg.note]
+            if note == self.DROP:
+                return None
+            # from_bytes is the cheapest way to build a mido message.
+            if kind == "note_on":
+                velocity = self.velocities[index | msg.velocity]
+                if note != msg.note or velocity != msg.velocity or out != channel:
+                    return mido.Message.from_bytes((0x90 | out, note, velocity))
+                return msg
+            if note != msg.note or out != channel:
+                if kind == "note_off":
+                    return mido.Message.from_bytes((0x80 | out, note, msg.velocity))
+                return mido.Message.from_bytes((0xA0 | out, note, msg.value))
+            return msg
+        if kind == "control_change":
+            control = self.controls[channel << 7 | msg.control]
+            if control == self.DROP:
+                return None
+            if control != msg.control or out != channel:
+                return mido.Message.from_bytes((0xB0 | out, control, msg.value))
+            return msg
+        return msg if out == channel else msg.copy(channel=out)
+
+
+def read_transform_file(path: str) -> dict:
+    """Reads a transform file: {"midi_to_osc": rules, "osc_to_midi": rules}, either optional.
+    Returns the rules after checking that both compile (raises ValueError if not)."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("expected an object with midi_to_osc and/or osc_to_midi")
+    unknown = set(data) - set(TRANSFORM_DIRECTIONS)
+    if unknown:
+        raise ValueError(f"unknown direction {', '.join(sorted(unknown))}")
+    for rules in data.values():
+        TransformTable(rules)
+    return data
+
+# --------------------- Playback Engine --------------------- #
+def midi_to_osc(msg):
+    """Maps a channel MIDI message to its outgoing (address, args), or None if it isn't bridged."""
+    if not hasattr(msg, "channel"):
+        return None
+    ch = msg.channel + 1
+    if msg.type == "note_on":
+        if msg.velocity > 0:
+            return f"/note{ch}", [msg.note, msg.velocity]
+        return f"/noteoff{ch}", [msg.note, 0]
+    if msg.type == "note_off":
+        return f"/noteoff{ch}", [msg.note, 0]
+    if msg.type == "control_change":
+        return f"/cc{ch}", [msg.control, msg.value]
+    if msg.type == "pitchwheel":
+        return f"/pitch{ch}", [msg.pitch]
+    if msg.type == "aftertouch":
+        return f"/after{ch}", [msg.value]
+    return None
+
+
+def midi_to_osc_bundle(msgs, raw_address: str = None):
+    """One immediate OSC bundle carrying the bridged form of msgs; returns (bundle, [(address, args)]).
+
+    With raw_address, each message goes as raw MIDI on that address instead.
+    """
+    builder = osc_bundle_builder.OscBundleBuilder(osc_bundle_builder.IMMEDIATELY)
+    sent = []
+    for msg in msgs:
+        if raw_address:
+            message = raw_midi_message(raw_address, msg.bytes())
+            builder.add_content(message)
+            sent.append((raw_address, message.params))
+            continue
+        out = midi_to_osc(msg)
+        if out is None:
+            continue
+        message = osc_message_builder.OscMessageBuilder(out[0])
+        for arg in out[1]:
+            message.add_arg(arg)
+        builder.add_content(message.build())
+        sent.append(out)
+    return builder.build(), sent
+
+
+def midi_message_length(status: int) -> int:
+    """Length in bytes of the short (non-SysEx) MIDI message starting with status."""
+    if status < 0xF0:
+        return 2 if status & 0xF0 in (0xC0, 0xD0) else 3
+    return {0xF1: 2, 0xF2: 3, 0xF3: 2}.get(status, 1)
+
+
+def raw_midi_message(address: str, data):
+    """An OSC message carrying MIDI bytes unchanged: one 'm' argument up to three bytes, else a blob.
+
+    SysEx is always a blob, however short: an 'm' argument has no length, and
+    on decode its status alone would say one byte.
+    """
+    builder = osc_message_builder.OscMessageBuilder(address)
+    if len(data) <= 3 and data[0] != 0xF0:
+        builder.add_arg((0, *data) + (0,) * (3 - len(data)), builder.ARG_TYPE_MIDI)
+    else:
+        builder.add_arg(bytes(data), builder.ARG_TYPE_BLOB)
+    return builder.build()
+
+
+def raw_midi_bytes(arg):
+    """The MIDI bytes in an 'm' (port, status, data1, data2) or blob OSC argument; None for anything else."""
+    if isinstance(arg, tuple) and len(arg) == 4 and arg[1] & 0x80:
+        return bytes(arg[1:1 + midi_message_length(arg[1])])
+    if isinstance(arg, bytes) and arg:
+        return arg
+    return None
+
+
+# A parsed playlist file: everything _play_file needs, built off the event loop.
+LoadedFile = namedtuple("LoadedFile", ["ticks_per_beat", "bpm", "beats_per_bar", "ticks", "msgs", "snapshots"])
+
+
+class PlaybackEngine:
+    """Walks the playlist and plays each file against absolute deadlines.
+
+    Side effects go through callbacks so the same engine can run in-process on
+    AsyncEngine or inside the playback process:
+      emit(msg)            every file event, at its scheduled time (on the sender thread)
+      notify(kind, value)  "status" text, "log" (text, level), "bpm" (file tempo),
+                           "playlist" (new order after a reshuffle), "timeline"
+                           (generation) when a file, seek or resume starts a new one
+      submit(coro)         schedules the playlist coroutine on the event loop
+
+    Files are parsed in the loop's default executor, so loading a long file
+    never holds up OSC, MIDI input or the clocks sharing the loop. The
+    coroutine only schedules: it runs LOOKAHEAD ahead of the music and
+    pushes (deadline, generation | event index) into a PrecisionSender ring,
+    whose thread emits each event on time. Transport changes bump the
+    generation so anything already queued for the old position is dropped.
+
+    A seek finds its event with a binary search over the file's event ticks,
+    releases the notes held at the old position and sends the controller,
+    program and pitch-bend state in effect at the new one before playing on.
+    That state is chased from the nearest of the snapshots taken every
+    SNAPSHOT_INTERVAL events at load, so a seek costs the same on any length
+    of file; the chase messages are addressed by CHASE words, not appended.
+    The sender keeps a ChannelState of what it emitted; whenever playback
+    leaves a position (stop, skip, seek, end of file) a RELEASE record makes
+    it send note_offs for whatever is still held, after anything still valid
+    and before the next file's events.
+    """
+    RELEASE = 1 << 63  # sender word: release held notes rather than emit an event
+    CHASE = 1 << 31  # sender word index bit: a seek's chase message rather than a file event
+    SNAPSHOT_INTERVAL = 512  # events between the chase-state snapshots taken at load
+    MAX_LAG = 0.25  # seconds behind schedule before playback resyncs instead of catching up
+    LATE_THRESHOLD = 0.002  # seconds; emissions later than this are counted as late
+    LOOKAHEAD = 0.02  # seconds the scheduler runs ahead of the sender
+    CONTROL_POLL = 0.05  # longest wait between events before transport requests are checked
+    SEEK_KINDS = ("time", "bar")
+
+    def __init__(self, emit, notify, submit):
+        self.emit = emit
+        self.notify = notify
+        self.submit = submit
+        self._task = None
+        self.sender = PrecisionSender(self._send, "PlaybackSender")
+        self.state = ChannelState()
+        self._generations = itertools.count(1)
+        self._current = (0, (), ())  # (generation, events, chase messages) read together by the sender
+
+        # Control Events
+        self.pause_event = threading.Event()
+        self._loop = None
+        self._resumed = None  # asyncio.Event a paused _play_file waits on
+        self.skip_event = threading.Event()
+        self.back_event = threading.Event()
+        self.previous_event = threading.Event()
+        self.skip_to_event = threading.Event()
+        self.skip_to_index = None
+        self.seek_event = threading.Event()
+        self.seek_target = None  # ("time", seconds) or ("bar", 1-based bar)
+
+        # Playlist / Transport
+        self.playlist = []
+        self.current_index = 0
+        self.playing = False
+        self.looping = True
+        self.randomize = False
+
+        # Tempo
+        self.default_bpm = 120.0
+        self.user_bpm = 120.0
+        self.ticks_per_beat = 480
+        self.beats_per_bar = 4.0
+        self.bpm_locked = False
+
+        # Position in the current file and timing counters since play()
+        self.position = 0.0
+        self.position_ticks = 0
+        self._timeline = None
+        self._start_at = None  # perf_counter time the next file starts, if not now
+        self.events_sent = 0
+        self.late_events = 0
+        self.max_late_ms = 0.0
+
+    # ---------------- Transport ----------------
+    @property
+    def paused(self) -> bool:
+        return self.pause_event.is_set()
+
+    @property
+    def timeline(self):
+        """(generation, anchor_time, anchor_beat, beats_per_bar) of the file playing now, or None.
+
+        The beat at perf_counter time t is anchor_beat + (t - anchor_time) * user_bpm / 60;
+        the anchor moves to each event as it is scheduled. None while stopped or paused.
+        """
+        if not self.playing or self.paused:
+            return None
+        return self._timeline
+
+    def play(self, index: int = 0, start_at: float = None) -> None:
+        """Plays the playlist from index; start_at is the perf_counter time of the first beat (default: now)."""
+        for event in (self.pause_event, self.skip_event, self.back_event, self.previous_event, self.skip_to_event,
+                      self.seek_event):
+            event.clear()
+        self.playing = True
+        self.current_index = index
+        self._start_at = start_at
+        self.events_sent = 0
+        self.late_events = 0
+        self.max_late_ms = 0.0
+        self.sender.start()
+        self._task = self.submit(self.run())
+
+    def stop(self) -> None:
+        self.playing = False
+        self.pause_event.clear()
+        self.skip_event.set()
+        self.back_event.set()
+        self.previous_event.set()
+        self.skip_to_event.set()
+        self._invalidate()
+        self._wake()
+        # Cancelling wakes the coroutine from a long inter-event sleep, so a quick
+        # stop/play can't leave the old run going alongside the new one.
+        if self._task:
+            self._task.cancel()
+
+    def close(self) -> None:
+        """Stops playback and the sender thread, for an engine that is being replaced or shut down."""
+        self.stop()
+        self.sender.stop()
+
+    def pause(self) -> None:
+        self.pause_event.set()
+
+    def resume(self) -> None:
+        self.pause_event.clear()
+        self._wake()
+
+    def _wake(self) -> None:
+        """Wakes a paused _play_file; callable from any thread."""
+        resumed, loop = self._resumed, self._loop
+        if resumed is not None and loop is not None:
+            loop.call_soon_threadsafe(resumed.set)
+
+    def skip(self) -> None:
+        self.skip_event.set()
+        self._invalidate()
+
+    def back(self) -> None:
+        self.back_event.set()
+        self._invalidate()
+
+    def previous(self) -> None:
+        self.previous_event.set()
+        self._invalidate()
+
+    def skip_to(self, index: int) -> None:
+        self.skip_to_index = index
+        self.skip_to_event.set()
+        self._invalidate()
+
+    def seek(self, kind: str, value: float) -> None:
+        """Moves within the current file to value seconds ("time") or to the start of bar value ("bar")."""
+        self.seek_target = (kind, value)
+        self.seek_event.set()
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        """Drops events already handed to the sender for the current position."""
+        self._current = (next(self._generations), (), ())
+        self._timeline = None
+
+    def playlist_updated(self) -> None:
+        """Called after the playlist list is changed in place; the in-process engine shares it."""
+
+    def set_osc_target(self, ip: str, port: int) -> None:
+        """In-process playback sends through the app's OSC client."""
+
+    def resync(self) -> None:
+        """In-process playback output is already in the app's OSC ChannelState."""
+
+    def set_transforms(self, rules) -> None:
+        """In-process playback output goes through the app's own midi_to_osc transforms."""
+
+    def set_raw_midi(self, address: str) -> None:
+        """In-process playback output follows the app's own raw MIDI setting."""
+
+    def set_journal(self, enabled: bool) -> None:
+        """In-process playback output is journaled by the app's own OSC client."""
+
+    def _log(self, text: str, level: int = logging.INFO) -> None:
+        self.notify("log", (text, level))
+
+    # ---------------- Playlist Loop ----------------
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        try:
+            while self.playing and (0 <= self.current_index < len(self.playlist)):
+                f = self.playlist[self.current_index]
+                await self._play_file(f)
+                if not self.playing:
+                    break
+                if self.previous_event.is_set():
+                    self.previous_event.clear()
+                    self.current_index = max(0, self.current_index - 1)
+                    continue
+                if self.back_event.is_set():
+                    self.back_event.clear()
+                    continue
+                if self.skip_to_event.is_set():
+                    self.skip_to_event.clear()
+                    if self.skip_to_index is not None and 0 <= self.skip_to_index < len(self.playlist):
+                        self.current_index = self.skip_to_index
+                    self.skip_to_index = None
+                    continue
+                if self.looping and self.current_index == len(self.playlist) - 1:
+                    if self.randomize and len(self.playlist) > 1:
+                        random.shuffle(self.playlist)
+                        self.notify("playlist", list(self.playlist))
+                        self._log("Playlist reshuffled for looping.")
+                    self.current_index = 0
+                else:
+                    self.current_index += 1
+            if self.playing:
+                self.playing = False
+                self.notify("status", "Playback finished.")
+                self._log("Playback finished.")
+        except Exception as e:
+            self.playing = False
+            self._log(f"Playback error: {e}", logging.ERROR)
+            self.notify("status", f"Playback Error: {e}")
+        finally:
+            # Also reached when stop() cancels the coroutine mid-file.
+            self._release_notes()
+
+    async def _play_file(self, path: str) -> None:
+        self.notify("status", f"Playing: {path}")
+        self._log(f"Playing {path}")
+        try:
+            loaded = await self._loop.run_in_executor(None, self.load_file, path)
+        except Exception as e:
+            self._log(f"Failed to load MIDI: {e}", logging.ERROR)
+            return
+        if not self.bpm_locked:
+            bpm = loaded.bpm
+            if bpm:
+                self.default_bpm = max(1, round(bpm))
+                self.user_bpm = self.default_bpm
+                self.notify("bpm", self.default_bpm)
+                self._log(f"Default BPM set to {self.default_bpm}")
+            else:
+                self._log("No BPM found; using previous BPM.")
+        self.ticks_per_beat = loaded.ticks_per_beat
+        self.beats_per_bar = loaded.beats_per_bar
+        ticks, msgs = loaded.ticks, loaded.msgs
+        gen = next(self._generations)
+        self._current = (gen, msgs, ())
+        tag = gen << 32
+        sender = self.sender
+        # Events are timed against absolute perf_counter deadlines, so sleep overshoot
+        # never accumulates; a tempo change applies from the next scheduled event.
+        clock = time.perf_counter
+        started = deadline = max(clock(), self._start_at or 0.0)
+        self._start_at = None
+        last_ticks = 0
+        self._timeline = (gen, started, 0.0, self.beats_per_bar)
+        self.notify("timeline", gen)
+        late_events = self.late_events
+        finished = True
+        idx = 0
+        while idx < len(msgs):
+            if not self.playing:
+                finished = False
+                break
+            if self.skip_event.is_set():
+                self.skip_event.clear()
+                finished = False
+                break
+            if self.previous_event.is_set() or self.back_event.is_set() or self.skip_to_event.is_set():
+                finished = False
+                break
+            if self.seek_event.is_set():
+                self.seek_event.clear()
+                target = self._seek_ticks(*self.seek_target)
+                new_idx = bisect.bisect_left(ticks, target)
+                chase = self.chase_state(msgs, new_idx, loaded.snapshots)
+                gen = next(self._generations)
+                self._current = (gen, msgs, chase)
+                tag = gen << 32
+                deadline = clock()
+                self._release_notes(deadline)
+                for k in range(len(chase)):
+                    while sender.full():
+                        await asyncio.sleep(0.001)
+                    sender.push(deadline, tag | self.CHASE | k)
+                idx, last_ticks = new_idx, target
+                started = deadline - (target / self.ticks_per_beat) * (60.0 / self.user_bpm)
+                self.position, self.position_ticks = deadline - started, target
+                self._timeline = (gen, deadline, target / self.ticks_per_beat, self.beats_per_bar)
+                self.notify("timeline", gen)
+                self._log(f"Seek to {self.position:.2f} s (bar {target / self.ticks_per_beat / self.beats_per_bar + 1:.2f}); "
+                          f"{len(chase)} state messages sent.")
+                continue
+            if self.pause_event.is_set():
+                paused_at = clock()
+                self._timeline = None
+                resumed = self._resumed = asyncio.Event()
+                while self.pause_event.is_set() and self.playing:
+                    await resumed.wait()
+                    resumed.clear()
+                self._resumed = None
+                deadline += clock() - paused_at
+                started += clock() - paused_at
+                self._timeline = (gen, deadline, last_ticks / self.ticks_per_beat, self.beats_per_bar)
+                self.notify("timeline", gen)
+            abs_ticks = ticks[idx]
+            if abs_ticks > last_ticks:
+                deadline += ((abs_ticks - last_ticks) / self.ticks_per_beat) * (60.0 / self.user_bpm)
+                last_ticks = abs_ticks
+                if clock() - deadline > self.MAX_LAG:
+                    # Far behind (e.g. the machine stalled): resync instead of bursting.
+                    deadline = clock()
+            wait = deadline - clock() - self.LOOKAHEAD
+            if wait > 0:
+                # Long gaps are waited out in slices so a seek or skip is acted on promptly.
+                await asyncio.sleep(min(wait, self.CONTROL_POLL))
+                continue
+            while sender.full():
+                await asyncio.sleep(0.001)
+            sender.push(deadline, tag | idx)
+            idx += 1
+            self.position = deadline - started
+            self.position_ticks = abs_ticks
+            self._timeline = (gen, deadline, abs_ticks / self.ticks_per_beat, self.beats_per_bar)
+        if finished:
+            # Let the queued tail play out before the next file starts its clock.
+            remaining = deadline - clock()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        self._release_notes()
+        self._log(f"Timing: {self.late_events - late_events} late events (>{self.LATE_THRESHOLD * 1000:.0f} ms) "
+                  f"in {os.path.basename(path)}; worst {self.max_late_ms:.1f} ms since play; "
+                  f"{sender.ring.describe()}.", logging.DEBUG)
+
+    def _release_notes(self, deadline: float = None) -> None:
+        """Queues a RELEASE record at deadline (default now); only called on the loop, the sender ring's one producer.
+
+        Equal deadlines go out in push order, so it precedes whatever is pushed after it for that time.
+        """
+        if not self.sender.push(time.perf_counter() if deadline is None else deadline, self.RELEASE):
+            self._log("Playback buffer full; held notes were not released.", logging.WARNING)
+
+    def _send(self, deadline: float, word: int) -> None:
+        """PrecisionSender handler: emits one scheduled event unless it was invalidated."""
+        if word & self.RELEASE:
+            for msg in self.state.release():
+                self.emit(msg)
+            return
+        gen, events, chase = self._current
+        if word >> 32 != gen:
+            return
+        late = time.perf_counter() - deadline
+        index = word & 0xFFFFFFFF
+        msg = chase[index ^ self.CHASE] if index & self.CHASE else events[index]
+        self.emit(msg)
+        self.state.update(msg)
+        self.events_sent += 1
+        if late > self.LATE_THRESHOLD:
+            self.late_events += 1
+            self.max_late_ms = max(self.max_late_ms, late * 1000.0)
+
+    def _seek_ticks(self, kind: str, value: float) -> int:
+        if kind == "bar":
+            beats = (value - 1) * self.beats_per_bar
+        else:
+            beats = value * self.user_bpm / 60.0
+        return max(0, round(beats * self.ticks_per_beat))
+
+    @classmethod
+    def chase_snapshots(cls, msgs) -> list:
+        """(programs, controls, bends) in effect before every SNAPSHOT_INTERVAL-th event."""
+        snapshots = []
+        programs, controls, bends = {}, {}, {}
+        for i, msg in enumerate(msgs):
+            if not i % cls.SNAPSHOT_INTERVAL:
+                snapshots.append((dict(programs), dict(controls), dict(bends)))
+            cls._chase(msg, programs, controls, bends)
+        return snapshots
+
+    @classmethod
+    def chase_state(cls, msgs, end: int, snapshots=None) -> list:
+        """The program, controller and pitch-bend messages in effect after msgs[:end], in that order.
+
+        With snapshots from chase_snapshots, only the events after the nearest one are scanned.
+        """
+        start = 0
+        programs, controls, bends = {}, {}, {}
+        if snapshots:
+            k = min(end // cls.SNAPSHOT_INTERVAL, len(snapshots) - 1)
+            start = k * cls.SNAPSHOT_INTERVAL
+            programs, controls, bends = (dict(d) for d in snapshots[k])
+        for msg in msgs[start:end]:
+            cls._chase(msg, programs, controls, bends)
+        return list(programs.values()) + list(controls.values()) + list(bends.values())
+
+    @staticmethod
+    def _chase(msg, programs: dict, controls: dict, bends: dict) -> None:
+        if msg.type == "control_change":
+            controls[(msg.channel, msg.control)] = msg
+        elif msg.type == "program_change":
+            programs[msg.channel] = msg
+        elif msg.type == "pitchwheel":
+            bends[msg.channel] = msg
+
+    @classmethod
+    def load_file(cls, path: str) -> LoadedFile:
+        """Parses path and merges its tracks into one tick-sorted event list (runs in an executor)."""
+        mid = MidiFile(path)
+        events = []
+        for track in mid.tracks:
+            abs_ticks = 0
+            for msg in track:
+                abs_ticks += msg.time
+                if not msg.is_meta:
+                    events.append((abs_ticks, msg))
+        events.sort(key=lambda x: x[0])
+        msgs = [msg for _, msg in events]
+        # Tick of each event: the time index seeks search (time is ticks at the current tempo).
+        return LoadedFile(mid.ticks_per_beat, cls.get_file_bpm(mid), cls.get_file_beats_per_bar(mid),
+                          [t for t, _ in events], msgs, cls.chase_snapshots(msgs))
+
+    @staticmethod
+    def get_file_bpm(mid: MidiFile):
+        for track in mid.tracks:
+            for msg in track:
+                if msg.type == "set_tempo":
+                    return mido.tempo2bpm(msg.tempo)
+        return None
+
+    @staticmethod
+    def get_file_beats_per_bar(mid: MidiFile) -> float:
+        """Bar length in quarter-note beats from the first time signature (4/4 if there is none)."""
+        for track in mid.tracks:
+            for msg in track:
+                if msg.type == "time_signature":
+                    return msg.numerator * 4.0 / msg.denominator
+        return 4.0
+
+# --------------------- Playback Process --------------------- #
+class SharedControlBlock:
+    """Transport state, tempo, position and counters shared with the playback process.
+
+    Every field is one aligned 8-byte slot. The playback process writes the
+    transport, position and counters; the UI writes user_bpm, plus the
+    transport state optimistically when it sends play/stop.
+    """
+    STOPPED, PLAYING, PAUSED = 0, 1, 2
+    FIELDS = (
+        ("state", "q"), ("current_index", "q"), ("ticks_per_beat", "q"), ("position_ticks", "q"),
+        ("events_sent", "q"), ("late_events", "q"),
+        ("user_bpm", "d"), ("default_bpm", "d"), ("position", "d"), ("max_late_ms", "d"),
+        # Beat timeline (see PlaybackEngine.timeline); timeline_seq is odd while it is being written.
+        ("timeline_seq", "q"), ("timeline_gen", "q"), ("anchor_time", "d"), ("anchor_beat", "d"),
+        ("beats_per_bar", "d"),
+    )
+
+    def __init__(self, name: str = None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=8 * len(self.FIELDS))
+            self.shm.buf[:] = bytes(self.shm.size)
+            self.user_bpm = self.default_bpm = 120.0
+            self.ticks_per_beat = 480
+        else:
+            # Attached from the playback process, which shares the UI's resource tracker.
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+    def close(self) -> None:
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.shm.unlink()
+
+    @property
+    def timeline(self):
+        while True:
+            seq = self.timeline_seq
+            if not seq & 1:
+                line = (self.timeline_gen, self.anchor_time, self.anchor_beat, self.beats_per_bar)
+                if self.timeline_seq == seq:
+                    return line if line[0] else None
+            time.sleep(0)
+
+    @timeline.setter
+    def timeline(self, line) -> None:
+        seq = self.timeline_seq
+        self.timeline_seq = seq + 1
+        if line is None:
+            self.timeline_gen = 0
+        else:
+            self.timeline_gen, self.anchor_time, self.anchor_beat, self.beats_per_bar = line
+        self.timeline_seq = seq + 2
+
+
+def _shared_field(offset: int, fmt: str):
+    packer = struct.Struct("<" + fmt)
+    return property(lambda self: packer.unpack_from(self.shm.buf, offset)[0],
+                    lambda self, value: packer.pack_into(self.shm.buf, offset, value))
+
+
+for _i, (_name, _fmt) in enumerate(SharedControlBlock.FIELDS):
+    setattr(SharedControlBlock, _name, _shared_field(8 * _i, _fmt))
+
+
+def _block_attr(name: str):
+    return property(lambda self: getattr(self.block, name),
+                    lambda self, value: setattr(self.block, name, value))
+
+
+class SharedPlaybackEngine(PlaybackEngine):
+    """PlaybackEngine (run in the playback process) whose state lives in a SharedControlBlock.
+
+    Playback OSC leaves through this process's own client; the key of each
+    message goes to echo first, so the UI process's FeedbackGuard still
+    recognises its echoes. While set_journal is on, each datagram sent also
+    goes back to the UI as an "osc_out" event for its SessionRecorder.
+    """
+    COMMANDS = ("play", "stop", "pause", "resume", "skip", "back", "previous", "skip_to", "seek", "resync",
+                "set_transforms", "set_raw_midi", "set_journal")
+    SETTABLE = ("playlist", "looping", "randomize", "bpm_locked", "current_index")
+
+    current_index = _block_attr("current_index")
+    ticks_per_beat = _block_attr("ticks_per_beat")
+    user_bpm = _block_attr("user_bpm")
+    default_bpm = _block_attr("default_bpm")
+    position = _block_attr("position")
+    position_ticks = _block_attr("position_ticks")
+    events_sent = _block_attr("events_sent")
+    late_events = _block_attr("late_events")
+    max_late_ms = _block_attr("max_late_ms")
+    _timeline = _block_attr("timeline")
+
+    def __init__(self, block: SharedControlBlock, notify, submit, echo: SharedEchoWindow = None):
+        self.block = block
+        self.echo = echo
+        self.journal = False
+        self.osc_client = None
+        self.transform = None  # midi_to_osc TransformTable, swapped on the sender thread
+        self._next_transform = None
+        self.raw_midi = ""  # address for raw MIDI output; empty bridges per message type
+        # Keep the tempo the UI already put in the block.
+        user_bpm, default_bpm = block.user_bpm, block.default_bpm
+        super().__init__(self.emit_osc, notify, submit)
+        self.user_bpm, self.default_bpm = user_bpm, default_bpm
+
+    @property
+    def playing(self) -> bool:
+        return self.block.state != SharedControlBlock.STOPPED
+
+    @playing.setter
+    def playing(self, value: bool) -> None:
+        if not value:
+            self.block.state = SharedControlBlock.STOPPED
+        elif self.pause_event.is_set():
+            self.block.state = SharedControlBlock.PAUSED
+        else:
+            self.block.state = SharedControlBlock.PLAYING
+
+    def pause(self) -> None:
+        super().pause()
+        if self.playing:
+            self.block.state = SharedControlBlock.PAUSED
+
+    def resume(self) -> None:
+        super().resume()
+        if self.playing:
+            self.block.state = SharedControlBlock.PLAYING
+
+    def play(self, playlist=None, looping=None, randomize=None, bpm_locked=None, index: int = 0,
+             start_at: float = None) -> None:
+        if playlist is not None:
+            self.playlist, self.looping, self.randomize, self.bpm_locked = playlist, looping, randomize, bpm_locked
+        if self._task and not self._task.done():
+            # Already running: the UI only optimistically flagged the transport.
+            return
+        # perf_counter is system-wide, so start_at means the same moment in both processes.
+        super().play(index, start_at)
+
+    def emit_osc(self, msg) -> None:
+        if self.transform:
+            msg = self.transform.apply(msg)
+            if msg is None:
+                return
+        if not self.osc_client:
+            return
+        if self.raw_midi:
+            message = raw_midi_message(self.raw_midi, msg.bytes())
+        else:
+            out = midi_to_osc(msg)
+            if out is None:
+                return
+            builder = osc_message_builder.OscMessageBuilder(out[0])
+            for arg in out[1]:
+                builder.add_arg(arg)
+            message = builder.build()
+        if self.echo:
+            self.echo.push(FeedbackGuard.osc_key(message.address, message.params))
+        self.osc_client.send(message)
+        if self.journal:
+            self.notify("osc_out", (time.perf_counter(), message.dgram))
+
+    def resync(self) -> None:
+        """Sends the state of playback's output to the OSC target as one bundle."""
+        msgs = self.state.messages()
+        if msgs and self.osc_client:
+            bundle, sent = midi_to_osc_bundle(msgs, self.raw_midi)
+            if self.echo:
+                for address, args in sent:
+                    self.echo.push(FeedbackGuard.osc_key(address, args))
+            self.osc_client.send(bundle)
+            if self.journal:
+                self.notify("osc_out", (time.perf_counter(), bundle.dgram))
+
+    def set_osc_target(self, ip: str, port: int) -> None:
+        self.osc_client = udp_client.SimpleUDPClient(ip, port) if ip else None
+
+    def set_transforms(self, rules) -> None:
+        """New midi_to_osc rules; while playing, held notes are first released through the old ones."""
+        table = TransformTable(rules) if rules else None
+        if not self.playing:
+            self.transform = table
+            return
+        self._next_transform = (table,)
+        self._release_notes()
+
+    def set_raw_midi(self, address: str) -> None:
+        self.raw_midi = address
+
+    def set_journal(self, enabled: bool) -> None:
+        self.journal = enabled
+
+    def _send(self, deadline: float, word: int) -> None:
+        super()._send(deadline, word)
+        if word & self.RELEASE and self._next_transform is not None:
+            self.transform, self._next_transform = self._next_transform[0], None
+
+    def handle_command(self, cmd: str, *args) -> None:
+        if cmd in self.COMMANDS:
+            getattr(self, cmd)(*args)
+        elif cmd == "set" and args[0] in self.SETTABLE:
+            setattr(self, args[0], args[1])
+        elif cmd == "target":
+            self.set_osc_target(*args)
+
+
+def playback_process_main(block_name: str, echo_name: str, commands, events) -> None:
+    """Entry point of the playback process: runs commands from the UI until told to quit."""
+    block = SharedControlBlock(block_name)
+    echo = SharedEchoWindow(echo_name)
+    engine = AsyncEngine()
+    engine.start()
+    player = SharedPlaybackEngine(block, lambda kind, value: events.put((kind, value)), engine.submit, echo)
+    try:
+        while True:
+            cmd, *args = commands.get()
+            if cmd == "quit":
+                break
+            engine.call_soon(player.handle_command, cmd, *args)
+    except (KeyboardInterrupt, EOFError, OSError):
+        pass
+    finally:
+        engine.call_soon(player.stop)
+        engine.stop()
+        block.close()
+        echo.close()
+
+
+class PlaybackProcess:
+    """UI-side stand-in for PlaybackEngine that drives playback in a separate process.
+
+    Transport, tempo, position and counters are read from (and user_bpm written
+    to) a SharedControlBlock; everything else goes over a command queue.
+    Notifications come back on an event queue and are passed to notify().
+    The keys of the OSC playback sends come back in echo, a SharedEchoWindow
+    for the UI's FeedbackGuard to follow.
+    """
+    def __init__(self, notify):
+        ctx = mp.get_context("spawn")
+        self.notify = notify
+        self.block = SharedControlBlock()
+        self.echo = SharedEchoWindow()
+        self.commands = ctx.Queue()
+        self.events = ctx.Queue()
+        self._playlist = []
+        self._looping = True
+        self._randomize = False
+        self._bpm_locked = False
+        self.process = ctx.Process(target=playback_process_main, name="PlaybackProcess",
+                                   args=(self.block.name, self.echo.name, self.commands, self.events), daemon=True)
+        try:
+            self.process.start()
+        except Exception:
+            for shared in (self.block, self.echo):
+                shared.close()
+                shared.unlink()
+            raise
+        self._reader = threading.Thread(target=self._read_events, daemon=True)
+        self._reader.start()
+
+    def _read_events(self) -> None:
+        while True:
+            try:
+                item = self.events.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            try:
+                self.notify(*item)
+            except Exception as e:
+                logging.debug(f"Playback process event error: {e}")
+
+    def _send(self, *cmd) -> None:
+        self.commands.put(cmd)
+
+    def close(self) -> None:
+        self._send("quit")
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.events.put(None)
+        for shared in (self.block, self.echo):
+            shared.close()
+            shared.unlink()
+
+    # ---------------- State (shared memory) ----------------
+    @property
+    def playing(self) -> bool:
+        return self.block.state != SharedControlBlock.STOPPED
+
+    @property
+    def paused(self) -> bool:
+        return self.block.state == SharedControlBlock.PAUSED
+
+    @property
+    def timeline(self):
+        if self.block.state != SharedControlBlock.PLAYING:
+            return None
+        return self.block.timeline
+
+    @property
+    def current_index(self) -> int:
+        return self.block.current_index
+
+    @current_index.setter
+    def current_index(self, value: int) -> None:
+        self._send("set", "current_index", value)
+
+    user_bpm = _block_attr("user_bpm")
+    default_bpm = _block_attr("default_bpm")
+    ticks_per_beat = property(lambda self: self.block.ticks_per_beat)
+    position = property(lambda self: self.block.position)
+    position_ticks = property(lambda self: self.block.position_ticks)
+    events_sent = property(lambda self: self.block.events_sent)
+    late_events = property(lambda self: self.block.late_events)
+    max_late_ms = property(lambda self: self.block.max_late_ms)
+
+    # ---------------- Settings (command queue) ----------------
+    @property
+    def playlist(self):
+        return self._playlist
+
+    @playlist.setter
+    def playlist(self, value) -> None:
+        self._playlist = value
+        self._send("set", "playlist", list(value))
+
+    @property
+    def looping(self) -> bool:
+        return self._looping
+
+    @looping.setter
+    def looping(self, value: bool) -> None:
+        self._looping = value
+        self._send("set", "looping", value)
+
+    @property
+    def randomize(self) -> bool:
+        return self._randomize
+
+    @randomize.setter
+    def randomize(self, value: bool) -> None:
+        self._randomize = value
+        self._send("set", "randomize", value)
+
+    @property
+    def bpm_locked(self) -> bool:
+        return self._bpm_locked
+
+    @bpm_locked.setter
+    def bpm_locked(self, value: bool) -> None:
+        self._bpm_locked = value
+        self._send("set", "bpm_locked", value)
+
+    def playlist_updated(self) -> None:
+        self._send("set", "playlist", list(self._playlist))
+
+    def set_osc_target(self, ip: str, port: int) -> None:
+        self._send("target", ip, port)
+
+    # ---------------- Transport (command queue) ----------------
+    def play(self, index: int = 0, start_at: float = None) -> None:
+        self.block.state = SharedControlBlock.PLAYING
+        self._send("play", list(self._playlist), self._looping, self._randomize, self._bpm_locked, index, start_at)
+
+    def stop(self) -> None:
+        self.block.state = SharedControlBlock.STOPPED
+        self._send("stop")
+
+    def pause(self) -> None:
+        self._send("pause")
+
+    def resume(self) -> None:
+        self._send("resume")
+
+    def skip(self) -> None:
+        self._send("skip")
+
+    def back(self) -> None:
+        self._send("back")
+
+    def previous(self) -> None:
+        self._send("previous")
+
+    def skip_to(self, index: int) -> None:
+        self._send("skip_to", index)
+
+    def seek(self, kind: str, value: float) -> None:
+        self._send("seek", kind, value)
+
+    def resync(self) -> None:
+        self._send("resync")
+
+    def set_transforms(self, rules) -> None:
+        self._send("set_transforms", rules)
+
+    def set_raw_midi(self, address: str) -> None:
+        self._send("set_raw_midi", address)
+
+    def set_journal(self, enabled: bool) -> None:
+        self._send("set_journal", enabled)
+
+# --------------------- Decks --------------------- #
+class Deck:
+    """One file layered over the playlist: its events plus channel remap, mute and tempo mode.
+
+    In "lock" mode the deck plays at the player's tempo (and starts on its next
+    bar while a file plays); in "file" mode it keeps the tempo in its own file.
+    Scheduling fields are only touched on the engine loop; state is the
+    sender thread's record of what this deck has sounded.
+    """
+    TEMPO_MODES = ("lock", "file")
+
+    def __init__(self, deck_id: int, path: str, remap: str = "", tempo: str = "lock", loop: bool = True):
+        if tempo not in self.TEMPO_MODES:
+            raise ValueError(f"tempo mode must be one of {', '.join(self.TEMPO_MODES)}")
+        mid = MidiFile(path)
+        events = []
+        length = 0
+        for track in mid.tracks:
+            abs_ticks = 0
+            for msg in track:
+                abs_ticks += msg.time
+                if not msg.is_meta:
+                    events.append((abs_ticks, msg))
+            length = max(length, abs_ticks)
+        events.sort(key=lambda x: x[0])
+        self.id = deck_id
+        self.path = path
+        self.ticks = [t for t, _ in events]
+        self.msgs = [msg for _, msg in events]
+        self.ticks_per_beat = mid.ticks_per_beat
+        self.bpm = PlaybackEngine.get_file_bpm(mid) or 120.0
+        self.beats_per_bar = PlaybackEngine.get_file_beats_per_bar(mid)
+        # A loop repeats after whole bars, so a drum pattern stays on the grid.
+        bar = max(1, round(self.beats_per_bar * self.ticks_per_beat))
+        self.length = max(bar, math.ceil(length / bar) * bar)
+        self.channel_map = self.parse_remap(remap)
+        self.remap = remap.strip()
+        self.tempo = tempo
+        self.loop = loop
+        self.muted = False
+        self.playing = False
+        self.removed = False
+        self.gen = 0  # bumped on stop so events already queued are dropped
+        self.state = ChannelState()
+        self.index = 0
+        self.offset = 0  # ticks added by completed loops
+        self.position = 0  # tick of the event last scheduled
+        self.deadline = 0.0
+
+    @staticmethod
+    def parse_remap(text: str) -> list:
+        """Output channel for each input channel (0-based) from "10" (everything to 10) or "1:10, 2:11"."""
+        channels = list(range(16))
+        text = text.strip()
+        if not text:
+            return channels
+        if ":" not in text:
+            target = int(text)
+            if not 1 <= target <= 16:
+                raise ValueError(f"channel {target} out of range 1-16")
+            return [target - 1] * 16
+        for pair in text.split(","):
+            src, dst = (int(part) for part in pair.split(":"))
+            if not (1 <= src <= 16 and 1 <= dst <= 16):
+                raise ValueError(f"channel pair {src}:{dst} out of range 1-16")
+            channels[src - 1] = dst - 1
+        return channels
+
+    def describe(self) -> str:
+        flags = [self.tempo]
+        if self.remap:
+            flags.append(f"ch {self.remap}")
+        if self.muted:
+            flags.append("muted")
+        if not self.loop:
+            flags.append("once")
+        state = "playing" if self.playing else "stopped"
+        return f"{self.id}. {os.path.basename(self.path)} ({state}; {', '.join(flags)})"
+
+    def start(self, at: float, bpm: float) -> float:
+        """Rewinds to the first event; returns its deadline for a start at perf_counter time at."""
+        self.index = 0
+        self.offset = 0
+        self.position = self.ticks[0]
+        self.deadline = at + self.position / self.ticks_per_beat * 60.0 / self.tempo_bpm(bpm)
+        return self.deadline
+
+    def advance(self, bpm: float):
+        """Moves past the event just queued; returns the next deadline, or None at the end of a one-shot."""
+        self.index += 1
+        if self.index >= len(self.ticks):
+            if not self.loop:
+                return None
+            self.index = 0
+            self.offset += self.length
+        ticks = self.offset + self.ticks[self.index]
+        self.deadline += (ticks - self.position) / self.ticks_per_beat * 60.0 / self.tempo_bpm(bpm)
+        self.position = ticks
+        return self.deadline
+
+    def tempo_bpm(self, bpm: float) -> float:
+        return max(1.0, bpm if self.tempo == "lock" else self.bpm)
+
+
+class DeckMixer:
+    """Plays any number of Decks at once through one heap scheduler and one PrecisionSender.
+
+    The heap holds one (deadline, deck id, generation) entry per playing deck;
+    the scheduler coroutine pops the earliest, queues that event LOOKAHEAD
+    ahead and pushes the deck's next event back, so the cost per event is
+    O(log decks) and an idle deck costs nothing. Entries and sender words carry
+    the deck's generation, and stopping a deck bumps it, so whatever that deck
+    already queued is dropped. Changes are marshalled onto the engine loop,
+    the sender ring's one producer.
+
+    Callbacks:
+      emit(msg)        every deck event, remapped, at its time (sender thread)
+      timeline()       the player's timeline, for starting locked decks on a bar
+      bpm()            the player's tempo, which locked decks follow
+      call_soon(fn)    runs fn on the engine loop
+      submit(coro)     schedules the scheduler coroutine on the engine loop
+    """
+    RELEASE = 1 << 63  # sender word: release the deck's held notes
+    LOOKAHEAD = 0.02
+    POLL = 0.05  # longest wait before tempo changes are picked up
+    MAX_LAG = 0.25  # seconds behind schedule before a deck skips ahead instead of catching up
+    START_DELAY = 0.01  # lets the first events of a deck reach the sender
+    LATE_THRESHOLD = 0.002
+
+    def __init__(self, emit, timeline, bpm, call_soon, submit, name: str = "DeckSender"):
+        self.emit = emit
+        self.timeline = timeline
+        self.bpm = bpm
+        self.call_soon = call_soon
+        self.submit = submit
+        self.decks = []  # in load order, for the UI
+        self._by_id = {}  # deck id -> Deck, read by the sender thread
+        self._ids = itertools.count(1)
+        self._heap = []
+        self._running = False
+        self._wake = None
+        self.sender = PrecisionSender(self._send, name)
+        self.events_sent = 0
+        self.late_events = 0
+
+    @property
+    def playing(self) -> bool:
+        return any(deck.playing for deck in self.decks)
+
+    def describe(self) -> tuple:
+        return tuple(deck.describe() for deck in self.decks)
+
+    # ---------------- Decks (any thread) ----------------
+    def add(self, path: str, remap: str = "", tempo: str = "lock", loop: bool = True) -> Deck:
+        """Loads a deck (stopped); raises OSError or ValueError for a bad file or remap."""
+        deck = Deck(next(self._ids) & 0x7FFF, path, remap, tempo, loop)
+        if not deck.ticks:
+            raise ValueError("no MIDI events in file")
+        self.decks.append(deck)
+        self._by_id[deck.id] = deck
+        self.sender.start()
+        return deck
+
+    def remove(self, deck: Deck) -> None:
+        if deck in self.decks:
+            self.decks.remove(deck)
+        deck.removed = True
+        self.call_soon(self._stop, deck)
+
+    def start(self, decks=None) -> None:
+        """Starts decks (all by default) together, on the player's next bar for locked decks while it plays."""
+        self.call_soon(self._start, list(self.decks if decks is None else decks))
+
+    def stop(self, decks=None) -> None:
+        for deck in list(self.decks if decks is None else decks):
+            self.call_soon(self._stop, deck)
+
+    def set_muted(self, deck: Deck, muted: bool) -> None:
+        self.call_soon(self._set_muted, deck, muted)
+
+    def set_remap(self, deck: Deck, text: str) -> None:
+        """Changes the deck's channel map; raises ValueError for a bad one."""
+        channels = Deck.parse_remap(text)
+        self.call_soon(self._set_remap, deck, channels, text.strip())
+
+    def set_tempo(self, deck: Deck, mode: str) -> None:
+        if mode not in Deck.TEMPO_MODES:
+            raise ValueError(f"tempo mode must be one of {', '.join(Deck.TEMPO_MODES)}")
+        deck.tempo = mode  # read by the scheduler for the next event
+
+    # ---------------- Engine Loop ----------------
+    def _start(self, decks) -> None:
+        clock = time.perf_counter
+        now = clock()
+        at = now + self.START_DELAY
+        bpm = self.bpm()
+        line = self.timeline()
+        if line:
+            # The player's next bar line, for locked decks.
+            _, anchor_time, anchor_beat, beats_per_bar = line
+            beat = anchor_beat + (at - anchor_time) * bpm / 60.0
+            bar_at = at + (math.ceil(beat / beats_per_bar) * beats_per_bar - beat) * 60.0 / bpm
+        else:
+            bar_at = at
+        for deck in decks:
+            if deck.playing or deck.removed:
+                continue
+            deck.gen = (deck.gen + 1) & 0xFFFF
+            deck.playing = True
+            deadline = deck.start(bar_at if deck.tempo == "lock" else at, bpm)
+            heapq.heappush(self._heap, (deadline, deck.id, deck.gen))
+        self._kick()
+
+    def _stop(self, deck: Deck) -> None:
+        deck.gen = (deck.gen + 1) & 0xFFFF
+        deck.playing = False
+        self._release(deck)
+
+    def _set_muted(self, deck: Deck, muted: bool) -> None:
+        deck.muted = muted
+        if muted:
+            self._release(deck)
+
+    def _set_remap(self, deck: Deck, channels, text: str) -> None:
+        # Notes started on the old channels are released there before the map changes.
+        self._release(deck)
+        deck.channel_map = channels
+        deck.remap = text
+
+    def _release(self, deck: Deck) -> None:
+        if not self.sender.push(time.perf_counter(), self.RELEASE | deck.id << 48):
+            logging.warning("Deck buffer full; held notes of deck %d were not released.", deck.id)
+
+    def _kick(self) -> None:
+        if self._running:
+            if self._wake:
+                self._wake.set()
+        elif self._heap:
+            self._running = True
+            self.submit(self._run())
+
+    async def _run(self) -> None:
+        clock = time.perf_counter
+        heap = self._heap
+        self._wake = asyncio.Event()
+        try:
+            while heap:
+                deadline, deck_id, gen = heap[0]
+                deck = self._by_id.get(deck_id)
+                if deck is None or deck.gen != gen or not deck.playing:
+                    heapq.heappop(heap)
+                    continue
+                wait = deadline - clock() - self.LOOKAHEAD
+                if wait > 0:
+                    # Woken early when a deck starts, so its first event isn't held behind a long gap.
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), min(wait, self.POLL))
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if not self.sender.push(deadline, deck_id << 48 | gen << 32 | deck.index):
+                    await asyncio.sleep(0.001)  # ring full: let the sender catch up
+                    continue
+                deadline = deck.advance(self.bpm())
+                if deadline is None:
+                    deck.playing = False
+                    heapq.heappop(heap)
+                    continue
+                if clock() - deadline > self.MAX_LAG:
+                    deadline = deck.deadline = clock()
+                heapq.heapreplace(heap, (deadline, deck_id, gen))
+        finally:
+            self._running = False
+            self._wake = None
+
+    def _send(self, deadline: float, word: int) -> None:
+        """PrecisionSender handler: emits one deck event, remapped, unless it was invalidated or muted."""
+        deck = self._by_id.get(word >> 48 & 0x7FFF)
+        if deck is None:
+            return
+        if word & self.RELEASE:
+            for msg in deck.state.release():
+                self.emit(msg)
+            if deck.removed:
+                self._by_id.pop(deck.id, None)
+            return
+        if word >> 32 & 0xFFFF != deck.gen or deck.muted:
+            return
+        late = time.perf_counter() - deadline
+        msg = deck.msgs[word & 0xFFFFFFFF]
+        if hasattr(msg, "channel"):
+            channel = deck.channel_map[msg.channel]
+            if channel != msg.channel:
+                msg = msg.copy(channel=channel)
+            deck.state.update(msg)
+        self.emit(msg)
+        self.events_sent += 1
+        if late > self.LATE_THRESHOLD:
+            self.late_events += 1
+
+# --------------------- Sync Clock --------------------- #
+class SyncClock:
+    """Generates sync ticks on a beat grid against absolute perf_counter deadlines.
+
+    While a file plays, the grid is the player's timeline, so ticks stay
+    phase-locked to the music through tempo changes, pauses and skips; otherwise
+    it free-runs on from the last tick (or, without free_run, stays silent).
+    Ticks are scheduled LOOKAHEAD ahead through a PrecisionSender, each at the
+    tempo current when it is scheduled, so a tempo change takes effect from the
+    next subdivision. Between ticks it re-reads tempo and timeline every POLL,
+    or at once when wake() says playback has published a new timeline, so
+    the first downbeat of a file goes out with its first note.
+
+    Callbacks run on the sender thread, in deadline order:
+      emit(bpm, bar, beat, sub)    every tick; counters are 1-based
+      transport(kind, position)    "start", "continue" or "stop" as the clock locks
+                                   onto or leaves the timeline; position is in
+                                   sixteenth notes (MIDI Song Position units)
+    """
+    DIVISIONS = {"1/4": 1, "1/8": 2, "1/16": 4, "24ppqn": 24}
+    TRANSPORT_KINDS = ("start", "continue", "stop")
+    TRANSPORT = 1 << 47  # word flag: a transport record rather than a tick
+    LOOKAHEAD = 0.02
+    MAX_LAG = 0.25  # seconds behind before the grid skips ahead instead of catching up
+    POLL = 0.05  # longest wait before tempo and timeline are read again
+    LOCK_POLL = 0.005  # wait while silent and waiting for playback to start
+
+    def __init__(self, timeline, bpm, emit, submit, division: str = "1/4", free_run: bool = True,
+                 transport=None, name: str = "SyncSender"):
+        self.timeline = timeline
+        self.bpm = bpm
+        self.emit = emit
+        self.transport = transport
+        self.submit = submit
+        self.division = division
+        self.free_run = free_run
+        self.sender = PrecisionSender(self._send, name, capacity=256)
+        self._run_id = 0  # bumped on stop so records already queued are dropped
+        self._future = None
+        self._loop = None
+        self._woken = None  # asyncio.Event set by wake()
+
+    @property
+    def running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._run_id = (self._run_id + 1) & 0xFFFF
+        self.sender.start()
+        self._future = self.submit(self._run(self._run_id))
+
+    def stop(self) -> None:
+        self._run_id = (self._run_id + 1) & 0xFFFF
+        if self._future:
+            self._future.cancel()
+
+    def close(self) -> None:
+        self.stop()
+        self.sender.stop()
+
+    def wake(self) -> None:
+        """Re-reads the timeline now instead of at the next poll; safe from any thread."""
+        loop, woken = self._loop, self._woken
+        if woken is not None:
+            loop.call_soon_threadsafe(woken.set)
+
+    async def _sleep(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._woken.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._woken.clear()
+
+    def _push_transport(self, deadline: float, tag: int, kind: str, position: int = 0) -> None:
+        self.sender.push(deadline, tag | self.TRANSPORT | self.TRANSPORT_KINDS.index(kind) << 40 | position)
+
+    def _stop_transport(self, run_id: int) -> int:
+        """Drops ticks queued for the timeline being left and queues a stop; returns the new run id."""
+        if not self.transport or self._run_id != run_id:
+            return run_id
+        run_id = self._run_id = (run_id + 1) & 0xFFFF
+        self._push_transport(time.perf_counter(), run_id << 48, "stop")
+        return run_id
+
+    async def _run(self, run_id: int) -> None:
+        self._loop, self._woken = asyncio.get_running_loop(), asyncio.Event()
+        clock = time.perf_counter
+        free = (clock(), 0.0, 4.0)  # free-running grid: anchor time, anchor beat, beats per bar
+        epoch = None
+        locking = False  # a start/continue is due before the next tick
+        last, last_deadline = -1e-3, free[0]  # the last tick scheduled
+        while self._run_id == run_id:
+            bpm = max(1.0, float(self.bpm()))
+            line = self.timeline()
+            if line is None:
+                if epoch is not None:
+                    # Playback stopped or paused: free-run on from the last tick.
+                    epoch = None
+                    free = (last_deadline, last, per_bar)
+                    run_id = self._stop_transport(run_id)
+                if not self.free_run:
+                    await self._sleep(self.LOCK_POLL)
+                    continue
+                anchor_time, anchor_beat, per_bar = free
+            else:
+                line_epoch, anchor_time, anchor_beat, per_bar = line
+                if line_epoch != epoch:
+                    if epoch is not None:
+                        run_id = self._stop_transport(run_id)
+                    # Locked onto a new file (or back from a pause): continue from the music's beat,
+                    # including a grid point passed since the last poll.
+                    epoch = line_epoch
+                    locking = True
+                    poll = self.POLL if self.free_run else self.LOCK_POLL
+                    last = anchor_beat + (clock() - poll - anchor_time) * bpm / 60.0
+            div = self.DIVISIONS.get(self.division, 1)
+            tick = max(0, math.floor(last * div + 1e-6) + 1)
+            if locking and tick:
+                # Resuming mid-song: start on a sixteenth so the position can be given exactly.
+                per_sixteenth = max(1, div // 4)
+                tick = -(-tick // per_sixteenth) * per_sixteenth
+            beat = tick / div
+            deadline = anchor_time + (beat - anchor_beat) * 60.0 / bpm
+            now = clock()
+            if deadline - now > self.LOOKAHEAD:
+                await self._sleep(min(deadline - now - self.LOOKAHEAD, self.POLL))
+                continue
+            if now - deadline > self.MAX_LAG:
+                last = anchor_beat + (now - anchor_time) * bpm / 60.0 - 1e-3
+                continue
+            tag = run_id << 48
+            if locking:
+                locking = False
+                if self.transport:
+                    self._push_transport(deadline, tag, "continue" if tick else "start", round(beat * 4))
+            whole, sub = divmod(tick, div)
+            bar = math.floor(whole / per_bar)
+            in_bar = math.floor(whole - bar * per_bar)
+            self.sender.push(deadline, tag | (bar + 1) << 16 | (in_bar + 1) << 8 | (sub + 1))
+            last, last_deadline = beat, deadline
+            if epoch is None:
+                free = (deadline, beat, per_bar)
+
+    def _send(self, deadline: float, word: int) -> None:
+        if word >> 48 != self._run_id:
+            return
+        if word & self.TRANSPORT:
+            self.transport(self.TRANSPORT_KINDS[(word >> 40) & 0x3], word & 0xFFFFFFFF)
+        else:
+            self.emit(round(self.bpm()), (word >> 16) & 0xFFFFFFFF, (word >> 8) & 0xFF, word & 0xFF)
+
+# --------------------- Tempo Follower --------------------- #
+class TempoFollower:
+    """Follows the tempo and beat phase of an external pulse with a second-order PLL.
+
+    feed(t) takes the perf_counter time of each pulse (a /bpm tap, or a 24 ppqn
+    MIDI Clock). The loop predicts the next pulse and corrects its phase by
+    alpha and its period by beta times the timing error, which smooths jitter
+    without the lag of a moving average. Intervals outside tolerance of the
+    current period are rejected: whole multiples count as missed pulses, short
+    ones as doubles. RELOCK consistent outliers in a row mean the tempo really
+    changed, and the loop re-locks onto them; so do RELOCK missed pulses in a
+    row, which are a clock slowed to a multiple of the period. Keep tolerance
+    tight (0.1-0.2), or a slower clock passes for one with missed pulses.
+    """
+    MIN_BPM, MAX_BPM = 20.0, 420.0
+    RELOCK = 3
+    TIMEOUT_PULSES = 4  # a gap this many periods long starts a fresh measurement
+
+    def __init__(self, pulses_per_beat: int, alpha: float, beta: float, tolerance: float, acquire: int):
+        self.pulses_per_beat = pulses_per_beat
+        self.alpha = alpha
+        self.beta = beta
+        self.tolerance = tolerance
+        self.acquire = acquire  # accepted intervals before a tempo is reported
+        self.rejected = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.period = None  # seconds per pulse
+        self.phase_time = None  # filtered time of pulse number `count`
+        self.last = None  # raw time of the last pulse
+        self.counted = None  # raw time of pulse number `count`
+        self.count = 0
+        self.accepted = 0
+        self._outliers = deque(maxlen=self.RELOCK)
+        self._short = 0.0
+        self._first, self._first_count = 0.0, 0  # where acquisition started
+
+    @property
+    def bpm(self):
+        if self.period is None or self.accepted < self.acquire:
+            return None
+        return 60.0 / (self.period * self.pulses_per_beat)
+
+    def beat_at(self, t: float) -> float:
+        """Position of the followed pulse at time t, in beats counted from count 0."""
+        return (self.count + (t - self.phase_time) / self.period) / self.pulses_per_beat
+
+    def set_position(self, beat: float) -> None:
+        """The next pulse falls on this beat (MIDI Start is 0, Song Position is sixteenths / 4)."""
+        self.count = round(beat * self.pulses_per_beat) - 1
+
+    def _in_range(self, period: float) -> bool:
+        bpm = 60.0 / (period * self.pulses_per_beat)
+        return self.MIN_BPM <= bpm <= self.MAX_BPM
+
+    def feed(self, t: float):
+        """Takes one pulse; returns the tempo in BPM once locked, or None while acquiring or rejecting."""
+        last, self.last = self.last, t
+        if last is None or t - last > max(2.0, self.TIMEOUT_PULSES * (self.period or 0.0)):
+            count = self.count + 1
+            self.reset()
+            self.last, self.phase_time, self.counted, self.count = t, t, t, count
+            return None
+        interval = t - last
+        if self.period is None:
+            if self._in_range(interval):
+                self.period, self.phase_time, self.counted = interval, t, t
+                self._first, self._first_count = last, self.count
+                self.count += 1
+                self.accepted = 1
+            return self.bpm
+        if self._short:
+            # The pulse before was early; if the two together make one period it was a double.
+            merged, self._short = interval + self._short, 0.0
+            if abs(merged / self.period - 1.0) <= self.tolerance / 2:
+                interval = merged
+        ratio = interval / self.period
+        missed = round(ratio)
+        # Whole multiples of the period are dropped pulses: still a good pulse, just later.
+        if abs(ratio - missed) > self.tolerance or (missed < 2 and abs(ratio - 1.0) > self.tolerance):
+            self.rejected += 1
+            return self._outlier(t, interval, ratio)
+        if missed < 2:
+            self._outliers.clear()
+        else:
+            self._outliers.append((interval, self.count, self.counted))
+            if self._relock(t):
+                return self.bpm
+        # The loop coasts over pulses it didn't accept, so predict from the last one it did.
+        # Counting from the raw time keeps a lagging phase from slipping a pulse.
+        n = max(1, round((t - self.counted) / self.period))
+        self.count += n
+        self.counted = t
+        self.accepted += 1
+        if self.accepted <= self.acquire:
+            # Acquiring: the mean interval since the first pulse is a better start than the loop.
+            self.period = (t - self._first) / (self.count - self._first_count)
+            self.phase_time = t
+            return self.bpm
+        predicted = self.phase_time + n * self.period
+        error = t - predicted
+        self.phase_time = predicted + self.alpha * error
+        period = self.period + self.beta * error / n
+        if self._in_range(period):
+            self.period = period
+        return self.bpm
+
+    def _outlier(self, t: float, interval: float, ratio: float):
+        self._outliers.append((interval, self.count, self.counted))
+        if self._relock(t):
+            return self.bpm
+        if ratio < 1.0 and len(self._outliers) < self.RELOCK:
+            self._short = interval
+        return None
+
+    def _relock(self, t: float) -> bool:
+        """Re-locks onto the last RELOCK intervals if they agree with each other; True if it did."""
+        if len(self._outliers) < self.RELOCK:
+            return False
+        intervals = sorted(interval for interval, _, _ in self._outliers)
+        period = intervals[self.RELOCK // 2]
+        if intervals[-1] > intervals[0] * (1 + self.tolerance) or not self._in_range(period):
+            return False
+        # Undo the run's missed pulses, then count it all at the new period.
+        _, count, counted = self._outliers[0]
+        self.count = count + max(1, round((t - counted) / period))
+        self.period, self.phase_time, self.counted = period, t, t
+        self._outliers.clear()
+        return True
+
+# --------------------- LAN Sync --------------------- #
+class ClockOffset:
+    """Estimates another machine's perf_counter minus ours from ping/pong timestamps.
+
+    Each exchange gives NTP's four timestamps: t0 ping sent and t3 pong received
+    (local clock), t1 ping received and t2 pong sent (remote clock). The
+    exchange with the smallest round trip in the recent WINDOW has the least
+    room for asymmetric delay, so its offset is the one used.
+    """
+    WINDOW = 16
+
+    def __init__(self):
+        self.samples = deque(maxlen=self.WINDOW)
+        self.offset = None
+        self.rtt = None
+
+    def add(self, t0: float, t1: float, t2: float, t3: float) -> None:
+        rtt = (t3 - t0) - (t2 - t1)
+        self.samples.append((rtt, ((t1 - t0) + (t2 - t3)) / 2.0))
+        self.rtt, self.offset = min(self.samples)
+
+    def reset(self) -> None:
+        self.samples.clear()
+        self.offset = self.rtt = None
+
+
+# Transport of the leader's player, with times already on the follower's clock.
+LeaderState = namedtuple("LeaderState", ["playing", "paused", "track", "bpm", "anchor_time", "anchor_beat",
+                                         "beats_per_bar"])
+
+
+class LanSync(asyncio.DatagramProtocol):
+    """Leader/follower playback sync between instances on the local network (UDP, no other services).
+
+    The leader answers pings and sends its transport and timeline to every
+    follower heard from recently, at least every STATE_INTERVAL and as soon as
+    it changes. A follower pings the leader (the broadcast address until one
+    answers) to track the offset between the two perf_counter clocks, and
+    hands each state on as a LeaderState on its own clock. Once a leader has
+    answered, pongs and states from any other address are ignored, so a
+    second leader or a stray packet can't take over. Messages are OSC, with
+    times as 64-bit floats.
+
+    Callbacks, on the engine loop:
+      state()         leader: (playing, paused, track, bpm, timeline) of the local player
+      follow(state)   follower: a LeaderState to follow
+      log(text, level)
+    """
+    ROLES = ("off", "leader", "follower")
+    PORT = 9800
+    PING, PONG, STATE = "/pwsync/ping", "/pwsync/pong", "/pwsync/state"
+    PING_INTERVAL = 0.5
+    PING_BURST = 8  # quick pings at start so the offset settles within a second
+    STATE_INTERVAL = 0.25
+    POLL = 0.02  # how often the leader checks its transport for changes
+    FOLLOWER_TIMEOUT = 5.0
+    LEADER_TIMEOUT = 3.0
+
+    def __init__(self, state, follow, log, submit):
+        self.state = state
+        self.follow = follow
+        self.log = log
+        self.submit = submit
+        self.role = "off"
+        self.leader = None  # address the follower sends pings to
+        self.leader_found = False  # leader is the address that answered, not a broadcast or name
+        self.offset = ClockOffset()
+        self.followers = {}  # address -> time last heard (leader)
+        self.heard_at = 0.0  # last pong (follower)
+        self._transport = None
+        self._future = None
+
+    def describe(self) -> str:
+        if self.role == "leader":
+            return f"LAN leader: {len(self.followers)} follower(s)"
+        if self.role == "follower":
+            if self.offset.offset is None or time.perf_counter() - self.heard_at > self.LEADER_TIMEOUT:
+                return "LAN follower: looking for leader"
+            return (f"LAN follower of {self.leader[0]}: round trip {self.offset.rtt * 1000:.1f} ms, "
+                    f"offset {self.offset.offset * 1000:+.1f} ms")
+        return ""
+
+    def start(self, role: str, leader_host: str = "", port: int = None) -> None:
+        """Starts (or restarts) as "leader" or "follower"; a follower without leader_host broadcasts to find one."""
+        self.stop()
+        if role not in self.ROLES:
+            raise ValueError(f"LAN sync role must be one of {', '.join(self.ROLES)}")
+        self.role = role
+        if role == "off":
+            return
+        port = port or self.PORT
+        self.leader = (leader_host or "255.255.255.255", port)
+        self.leader_found = False
+        self.offset.reset()
+        self.followers.clear()
+        self._future = self.submit(self._serve(port if role == "leader" else 0))
+
+    def stop(self) -> None:
+        self.role = "off"
+        if self._future:
+            self._future.cancel()
+            self._future = None
+
+    async def _serve(self, local_port: int) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: self, local_addr=("0.0.0.0", local_port), allow_broadcast=True)
+        except OSError as e:
+            self.log(f"LAN sync: cannot bind UDP port {local_port}: {e}", logging.ERROR)
+            return
+        self._transport = transport
+        try:
+            if self.role == "follower" and self.leader[0] != "255.255.255.255":
+                # Resolve a host name so pongs can be matched against the leader's address.
+                try:
+                    info = await loop.getaddrinfo(*self.leader, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+                    self.leader = info[0][4][:2]
+                except OSError as e:
+                    self.log(f"LAN sync: cannot resolve leader {self.leader[0]}: {e}", logging.ERROR)
+                    return
+            if self.role == "leader":
+                self.log(f"LAN sync leader on UDP port {local_port}.", logging.INFO)
+                await self._lead()
+            else:
+                self.log(f"LAN sync following {self.leader[0]}:{self.leader[1]}.", logging.INFO)
+                await self._ping()
+        finally:
+            transport.close()
+            self._transport = None
+
+    async def _lead(self) -> None:
+        clock = time.perf_counter
+        last_key, sent_at = None, 0.0
+        while True:
+            await asyncio.sleep(self.POLL)
+            now = clock()
+            for addr, heard in list(self.followers.items()):
+                if now - heard > self.FOLLOWER_TIMEOUT:
+                    del self.followers[addr]
+                    self.log(f"LAN sync: follower {addr[0]} gone.", logging.INFO)
+            if not self.followers:
+                continue
+            playing, paused, track, bpm, line = self.state()
+            gen, anchor_time, anchor_beat, beats_per_bar = line or (0, 0.0, 0.0, 4.0)
+            key = (playing, paused, track, bpm, gen, line is None)
+            if key == last_key and now - sent_at < self.STATE_INTERVAL:
+                continue
+            packet = self._packet(self.STATE, int(playing), int(paused), track, float(bpm),
+                                  float(anchor_time), float(anchor_beat), float(beats_per_bar))
+            for addr in self.followers:
+                self._transport.sendto(packet, addr)
+            last_key, sent_at = key, now
+
+    async def _ping(self) -> None:
+        clock = time.perf_counter
+        sent = 0
+        lost = True
+        while True:
+            self._transport.sendto(self._packet(self.PING, clock()), self.leader)
+            sent += 1
+            await asyncio.sleep(self.PING_INTERVAL / 10 if sent < self.PING_BURST else self.PING_INTERVAL)
+            silent = clock() - self.heard_at > self.LEADER_TIMEOUT
+            if silent and not lost and sent > self.PING_BURST:
+                self.log("LAN sync: leader not answering; playing on freely.", logging.WARNING)
+            lost = silent
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        now = time.perf_counter()
+        try:
+            msg = osc_message.OscMessage(data)
+            address, args = msg.address, msg.params
+        except Exception:
+            return
+        if self.role == "leader" and address == self.PING and args:
+            if addr not in self.followers:
+                self.log(f"LAN sync: follower {addr[0]} joined.", logging.INFO)
+            self.followers[addr] = now
+            self._transport.sendto(self._packet(self.PONG, float(args[0]), now, time.perf_counter()), addr)
+        elif self.role == "follower" and address == self.PONG and len(args) == 3:
+            if not self.leader_found:
+                if self.leader[0] != "255.255.255.255" and addr[0] != self.leader[0]:
+                    return
+                self.log(f"LAN sync: leader found at {addr[0]}.", logging.INFO)
+                self.leader, self.leader_found = addr, True  # stop broadcasting once a leader has answered
+            elif addr != self.leader:
+                return
+            self.offset.add(args[0], args[1], args[2], now)
+            self.heard_at = now
+        elif (self.role == "follower" and address == self.STATE and len(args) == 7 and self.leader_found
+              and addr == self.leader and self.offset.offset is not None):
+            playing, paused, track, bpm, anchor_time, anchor_beat, beats_per_bar = args
+            local = anchor_time - self.offset.offset if anchor_time else None
+            self.follow(LeaderState(bool(playing), bool(paused), track, bpm, local, anchor_beat, beats_per_bar))
+
+    @staticmethod
+    def _packet(address: str, *args) -> bytes:
+        builder = osc_message_builder.OscMessageBuilder(address)
+        for arg in args:
+            builder.add_arg(arg, builder.ARG_TYPE_DOUBLE if isinstance(arg, float) else builder.ARG_TYPE_INT)
+        return builder.build().dgram
+
+# --------------------- Cue Lists --------------------- #
+class CueList:
+    """A named sequence of (offset seconds, address, args) OSC messages, sorted by offset."""
+    __slots__ = ("name", "messages", "offsets")
+
+    def __init__(self, name: str, messages):
+        self.name = name
+        self.messages = sorted(((float(m[0]), str(m[1]), list(m[2:])) for m in messages), key=lambda m: m[0])
+        self.offsets = [m[0] for m in self.messages]
+
+    @property
+    def duration(self) -> float:
+        return self.offsets[-1] if self.offsets else 0.0
+
+
+class CuePlayer:
+    """Plays cue lists through a PrecisionSender, the scheduler playback uses.
+
+    A feeder coroutine on the engine loop queues each message LOOKAHEAD before
+    its perf_counter deadline (the cue start plus its offset), so a cue of
+    thousands of messages never floods the ring and nothing waits on the UI.
+    Records carry the run id, and starting, jumping or stopping bumps it, so
+    messages already queued for the previous cue are dropped.
+    send(address, args) runs on the sender thread.
+    """
+    LOOKAHEAD = 0.05
+    POLL = 0.1  # longest sleep, so stop and jump are noticed promptly by the feeder
+    START_DELAY = 0.002  # gives the first message of a cue time to reach the sender
+
+    def __init__(self, send, submit, name: str = "CueSender"):
+        self.send = send
+        self.submit = submit
+        self.cues = []
+        self.current = -1  # index of the running (or last run) cue
+        self.sender = PrecisionSender(self._send, name)
+        self._active = (0, [])  # run id and messages, swapped together for the sender thread
+        self._future = None
+
+    @property
+    def running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def describe(self) -> str:
+        if not self.cues:
+            return "No cues"
+        if self.current < 0:
+            return f"{len(self.cues)} cues ready"
+        state = "running" if self.running else "done"
+        return f"Cue {self.current + 1}/{len(self.cues)} {self.cues[self.current].name} ({state})"
+
+    # ---------------- Cue Files ----------------
+    def load_file(self, path: str) -> int:
+        """Reads cues from JSON: a list of {"name", "messages": [[offset, address, args...], ...]}
+        objects, or an object mapping names to message lists. Returns the number of cues."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [{"name": name, "messages": messages} for name, messages in data.items()]
+        cues = [CueList(str(c.get("name", i + 1)), c["messages"]) for i, c in enumerate(data)]
+        self.stop()
+        self.cues = cues
+        self.current = -1
+        return len(cues)
+
+    def find(self, target) -> int:
+        """Index of a cue given by name or 1-based number, or -1."""
+        for i, cue in enumerate(self.cues):
+            if cue.name == str(target):
+                return i
+        try:
+            index = int(target) - 1
+        except (TypeError, ValueError):
+            return -1
+        return index if 0 <= index < len(self.cues) else -1
+
+    # ---------------- Transport (engine loop) ----------------
+    def trigger(self, index: int, offset: float = 0.0) -> bool:
+        """Starts cue index from offset seconds in, replacing whatever cue is running."""
+        if not 0 <= index < len(self.cues):
+            return False
+        cue = self.cues[index]
+        run_id = self._restart()
+        self._active = (run_id, cue.messages)
+        self.current = index
+        self.sender.start()
+        start = time.perf_counter() + self.START_DELAY - max(0.0, offset)
+        first = bisect.bisect_left(cue.offsets, max(0.0, offset))
+        self._future = self.submit(self._feed(run_id, cue.messages, start, first))
+        return True
+
+    def stop(self) -> None:
+        self._active = (self._restart(), [])
+
+    def close(self) -> None:
+        self.stop()
+        self.sender.stop()
+
+    def _restart(self) -> int:
+        if self._future:
+            self._future.cancel()
+        return (self._active[0] + 1) & 0xFFFF
+
+    async def _feed(self, run_id: int, messages, start: float, index: int) -> None:
+        clock = time.perf_counter
+        while index < len(messages) and self._active[0] == run_id:
+            deadline = start + messages[index][0]
+            wait = deadline - clock() - self.LOOKAHEAD
+            if wait > 0:
+                await asyncio.sleep(min(wait, self.POLL))
+                continue
+            if not self.sender.push(deadline, run_id << 32 | index):
+                await asyncio.sleep(0.001)  # ring full: a dense burst, let the sender catch up
+                continue
+            index += 1
+        # Finish once the last message has gone out, so running covers the whole cue.
+        remaining = start + messages[-1][0] - clock() if messages else 0
+        if remaining > 0 and self._active[0] == run_id:
+            await asyncio.sleep(remaining)
+
+    def _send(self, deadline: float, word: int) -> None:
+        run_id, messages = self._active
+        if word >> 32 != run_id:
+            return
+        _, address, args = messages[word & 0xFFFFFFFF]
+        self.send(address, args)
+
+# --------------------- Alarm Scheduler --------------------- #
+def parse_osc_args(args):
+    """Turns text arguments into ints or floats where they parse as such."""
+    parsed = []
+    for a in args:
+        try:
+            parsed.append(int(a))
+        except ValueError:
+            try:
+                parsed.append(float(a))
+            except ValueError:
+                parsed.append(a)
+    return parsed
+
+
+class Alarm:
+    """One scheduled OSC message; every is the repeat interval in minutes (0 = once, 1440 = daily)."""
+    __slots__ = ("id", "when", "address", "args", "every", "cancelled")
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, alarm_id: int, when: datetime, address: str, args, every: int = 0):
+        self.id = alarm_id
+        self.when = when
+        self.address = address
+        self.args = list(args)
+        self.every = every
+        self.cancelled = False
+
+    def next_after(self, now: datetime):
+        """The first repeat after now, or None for a one-off alarm."""
+        if not self.every:
+            return None
+        step = timedelta(minutes=self.every)
+        missed = max(0, (now - self.when) // step)
+        when = self.when + step * missed
+        while when <= now:
+            when += step
+        return when
+
+    @staticmethod
+    def parse_repeat(text) -> int:
+        """"" or "once" -> 0, "daily" -> 1440, otherwise a whole number of minutes."""
+        text = str(text or "").strip().lower()
+        if text in ("", "once", "0"):
+            return 0
+        if text == "daily":
+            return 1440
+        minutes = int(text.rstrip("m"))
+        if minutes <= 0:
+            raise ValueError(f"Bad repeat interval: {text}")
+        return minutes
+
+    def describe_repeat(self) -> str:
+        if not self.every:
+            return ""
+        return " (daily)" if self.every == 1440 else f" (every {self.every} min)"
+
+    def to_dict(self) -> dict:
+        return {"when": self.when.strftime(self.TIME_FORMAT), "address": self.address,
+                "args": self.args, "every": self.every}
+
+    def describe(self) -> str:
+        return f"{self.when.strftime(self.TIME_FORMAT)} -> {self.address} {' '.join(self.args)}{self.describe_repeat()}"
+
+
+class AlarmScheduler:
+    """Fires Alarms from a min-heap on a dedicated timer thread, and keeps them in a JSON file.
+
+    The thread sleeps until just before the earliest alarm (never longer than
+    MAX_WAIT, so wall-clock changes are noticed), then spins for the last SPIN
+    seconds, so alarms fire within a millisecond rather than on a polling tick.
+    Removal only marks an alarm cancelled; the heap drops it when it surfaces.
+    fire(alarm) runs on the timer thread. Changes only mark the file dirty: the
+    timer thread writes it once SAVE_DELAY has passed since the first unsaved
+    change, so a burst of adds and removes costs one write, and only when the
+    next alarm is further away than SAVE_MARGIN and twice the last write took.
+    """
+    SPIN = 0.002
+    MAX_WAIT = 1.0
+    SAVE_DELAY = 0.25
+    SAVE_MARGIN = 0.1
+
+    def __init__(self, fire, path: str):
+        self.fire = fire
+        self.path = path
+        self.version = 0  # bumped on every change, for the UI
+        self._alarms = {}
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._dirty_at = None  # time.monotonic() of the first change not yet saved
+        self._save_seconds = 0.0  # how long the last save took
+        self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._alarms)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="AlarmTimer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the timer thread once it has saved any unsaved changes."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def alarms(self):
+        """Pending alarms, earliest first."""
+        with self._cond:
+            return sorted(self._alarms.values(), key=lambda a: a.when)
+
+    def add(self, when: datetime, address: str, args=(), every: int = 0) -> Alarm:
+        return self.add_many([(when, address, args, every)])[0]
+
+    def add_many(self, entries, save: bool = True):
+        """Adds (when, address, args, every) entries with one heap rebuild; save=False when loading the file."""
+        now = datetime.now()
+        added = []
+        with self._cond:
+            for when, address, args, every in entries:
+                alarm = Alarm(next(self._ids), when, address, args, every)
+                if alarm.when <= now:
+                    alarm.when = alarm.next_after(now)
+                    if alarm.when is None:
+                        continue
+                self._alarms[alarm.id] = alarm
+                added.append(alarm)
+            if len(added) > len(self._heap):
+                self._heap.extend((a.when.timestamp(), a.id, a) for a in added)
+                heapq.heapify(self._heap)
+            else:
+                for a in added:
+                    heapq.heappush(self._heap, (a.when.timestamp(), a.id, a))
+            self.version += 1
+            if save:
+                self._changed()
+            self._cond.notify()
+        return added
+
+    def remove(self, alarm_id: int):
+        with self._cond:
+            alarm = self._alarms.pop(alarm_id, None)
+            if alarm is None:
+                return None
+            alarm.cancelled = True
+            self.version += 1
+            self._changed()
+            self._cond.notify()
+        return alarm
+
+    def clear(self) -> None:
+        with self._cond:
+            for alarm in self._alarms.values():
+                alarm.cancelled = True
+            self._alarms.clear()
+            self._heap.clear()
+            self.version += 1
+            self._changed()
+            self._cond.notify()
+
+    # ---------------- Persistence ----------------
+    def load(self) -> int:
+        """Reads the alarm file; one-off alarms that passed while closed are dropped. Returns how many remain."""
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        return len(self.add_many((self.entry_from_dict(e) for e in entries), save=False))
+
+    def _changed(self) -> None:
+        """Marks the file out of date; called with the lock held."""
+        if self._dirty_at is None:
+            self._dirty_at = time.monotonic()
+
+    def save(self) -> None:
+        """Writes the alarm file now (atomically); the timer thread calls this for changes."""
+        started = time.perf_counter()
+        with self._cond:
+            self._dirty_at = None
+            alarms = list(self._alarms.values())
+        alarms.sort(key=lambda a: a.when)
+        data = [a.to_dict() for a in alarms]
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.error(f"Could not save alarms to {self.path}: {e}")
+        self._save_seconds = time.perf_counter() - started
+
+    @staticmethod
+    def entry_from_dict(entry: dict):
+        return (datetime.strptime(entry["when"], Alarm.TIME_FORMAT), entry["address"],
+                [str(a) for a in entry.get("args", [])], Alarm.parse_repeat(entry.get("every", 0)))
+
+    def import_file(self, path: str) -> int:
+        """Bulk-adds alarms from a JSON list (the alarm file format) or a CSV with
+        when,address,repeat,args... rows. Returns how many were scheduled."""
+        with open(path, "r", newline="") as f:
+            if path.lower().endswith(".json"):
+                entries = [self.entry_from_dict(e) for e in json.load(f)]
+            else:
+                import csv
+                entries = []
+                for row in csv.reader(f):
+                    if not row or row[0].strip().lower() in ("", "when") or row[0].lstrip().startswith("#"):
+                        continue
+                    when = datetime.strptime(row[0].strip(), Alarm.TIME_FORMAT)
+                    repeat = Alarm.parse_repeat(row[2]) if len(row) > 2 else 0
+                    entries.append((when, row[1].strip(), [a.strip() for a in row[3:]], repeat))
+        return len(self.add_many(entries))
+
+    # ---------------- Timer Thread ----------------
+    def _run(self) -> None:
+        heap = self._heap
+        while True:
+            save = False
+            with self._cond:
+                while heap and heap[0][2].cancelled:
+                    heapq.heappop(heap)
+                if self._stopped:
+                    save = self._dirty_at is not None
+                    break
+                remaining = heap[0][0] - time.time() if heap else None
+                save_in = None if self._dirty_at is None else self._dirty_at + self.SAVE_DELAY - time.monotonic()
+                margin = max(self.SAVE_MARGIN, 2 * self._save_seconds)
+                if save_in is not None and save_in <= 0 and (remaining is None or remaining > margin):
+                    save = True
+                elif remaining is None and save_in is None:
+                    self._cond.wait()
+                    continue
+                elif remaining is None or remaining > self.SPIN:
+                    wait = self.MAX_WAIT if remaining is None else min(remaining - self.SPIN, self.MAX_WAIT)
+                    if save_in is not None and save_in > 0:
+                        wait = min(wait, save_in)
+                    self._cond.wait(wait)
+                    continue
+                else:
+                    due, _, alarm = heapq.heappop(heap)
+            if save:
+                self.save()
+                continue
+            end = time.perf_counter() + (due - time.time())
+            while time.perf_counter() < end:
+                time.sleep(0)
+            try:
+                self.fire(alarm)
+            except Exception as e:
+                logging.error(f"Alarm error: {e}")
+            self._reschedule(alarm)
+        if save:
+            self.save()
+
+    def _reschedule(self, alarm: Alarm) -> None:
+        with self._cond:
+            if alarm.cancelled:
+                return
+            when = alarm.next_after(datetime.now())
+            if when is None:
+                del self._alarms[alarm.id]
+            else:
+                alarm.when = when
+                heapq.heappush(self._heap, (when.timestamp(), alarm.id, alarm))
+            self.version += 1
+            self._changed()
+
+# --------------------- Session Recorder --------------------- #
+class SessionRecorder:
+    """Append-only binary journal of a session's OSC and MIDI traffic.
+
+    record() only stamps the item with time.perf_counter() and appends it to a
+    deque, which is safe from any thread and costs the bridge handlers well
+    under a microsecond; a background thread packs and writes whatever has
+    accumulated every FLUSH_INTERVAL. The file is MAGIC, the wall-clock start
+    time as a double, then one RECORD header (seconds since the start, kind,
+    payload length) per item followed by its payload: the OSC datagram for the
+    osc kinds, the MIDI bytes for the midi ones.
+    """
+    MAGIC = b"PWJ1"
+    START = struct.Struct("<d")
+    RECORD = struct.Struct("<dBI")
+    OSC_IN, OSC_OUT, MIDI_IN, MIDI_OUT = range(4)
+    KINDS = ("osc_in", "osc_out", "midi_in", "midi_out")
+    FLUSH_INTERVAL = 0.1
+
+    def __init__(self):
+        self.path = ""
+        self.active = False
+        self.records = 0
+        self._items = deque()
+        self._file = None
+        self._origin = 0.0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self, path: str) -> None:
+        """Starts a new journal at path (replacing any file there); stops the current one first."""
+        self.stop()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(self.MAGIC + self.START.pack(time.time()))
+        self.path, self.records = path, 0
+        self._origin = time.perf_counter()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="SessionRecorder", daemon=True)
+        self._thread.start()
+        self.active = True
+
+    def stop(self) -> None:
+        """Stops recording once everything recorded so far is on disk."""
+        if not self.active:
+            return
+        self.active = False
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+    def record(self, kind: int, data: bytes, t: float = None) -> None:
+        """Journals data; t is its time.perf_counter() if taken earlier (e.g. in the playback process)."""
+        if self.active:
+            self._items.append((time.perf_counter() if t is None else t, kind, data))
+
+    def describe(self) -> str:
+        if not self.active:
+            return ""
+        return f"Recording {os.path.basename(self.path)}: {self.records + len(self._items)} events"
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped.wait(self.FLUSH_INTERVAL):
+                self._write()
+            self._write()
+        except OSError as e:
+            self.active = False
+            logging.error(f"Session recording stopped: {e}")
+        finally:
+            self._file.close()
+            self._items.clear()
+
+    def _write(self) -> None:
+        items, pack, origin = self._items, self.RECORD.pack, self._origin
+        chunk = bytearray()
+        count = 0
+        while items:
+            t, kind, data = items.popleft()
+            chunk += pack(t - origin, kind, len(data))
+            chunk.extend(data)
+            count += 1
+        if chunk:
+            self._file.write(chunk)
+            self._file.flush()
+            self.records += count
+
+
+def read_journal(path: str):
+    """Yields (seconds, kind, payload) from a session journal; a record cut short by a crash ends it."""
+    header = len(SessionRecorder.MAGIC) + SessionRecorder.START.size
+    record = SessionRecorder.RECORD
+    with open(path, "rb") as f:
+        start = f.read(header)
+        if len(start) < header or not start.startswith(SessionRecorder.MAGIC):
+            raise ValueError("not a session journal")
+        while True:
+            head = f.read(record.size)
+            if len(head) < record.size:
+                return
+            t, kind, length = record.unpack(head)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            yield t, kind, data
+
+
+def export_journal_midi(path: str, out_path: str, kinds=(SessionRecorder.MIDI_OUT,), bpm: float = 120.0,
+                        ticks_per_beat: int = 480) -> int:
+    """Writes the MIDI records of a journal as a type 0 Standard MIDI File; returns the events written.
+
+    Timing starts at the first exported event. Clock and other system real-time
+    messages are left out, and notes still held at the end are released there.
+    """
+    tempo = mido.bpm2tempo(bpm)
+    track = mido.MidiTrack([mido.MetaMessage("set_tempo", tempo=tempo, time=0)])
+    state = ChannelState()
+    first = None
+    last_tick = count = 0
+    for t, kind, data in read_journal(path):
+        if kind not in kinds:
+            continue
+        try:
+            msg = mido.Message.from_bytes(data)
+        except ValueError:
+            continue
+        if not hasattr(msg, "channel") and msg.type != "sysex":
+            continue
+        if first is None:
+            first = t
+        tick = max(last_tick, round(mido.second2tick(t - first, ticks_per_beat, tempo)))
+        track.append(msg.copy(time=tick - last_tick))
+        state.update(msg)
+        last_tick = tick
+        count += 1
+    for msg in state.release():
+        track.append(msg)
+    track.append(mido.MetaMessage("end_of_track", time=0))
+    mid = MidiFile(type=0, ticks_per_beat=ticks_per_beat)
+    mid.tracks.append(track)
+    mid.save(out_path)
+    return count
+
+
+class RecordingUDPClient(udp_client.SimpleUDPClient):
+    """SimpleUDPClient that also puts every datagram it sends in the session journal."""
+    def __init__(self, address: str, port: int, recorder: SessionRecorder):
+        super().__init__(address, port)
+        self.recorder = recorder
+
+    def send(self, content) -> None:
+        super().send(content)
+        if self.recorder.active:
+            self.recorder.record(SessionRecorder.OSC_OUT, content.dgram)
+
+# --------------------- Load Generator --------------------- #
+def parse_flood_mix(text: str) -> dict:
+    """"note=6,cc=3,generic=1" (or "/noteN=6,...") -> {"note": 6.0, ...}; a kind without a weight counts 1."""
+    mix = {}
+    for part in str(text).split(","):
+        kind, _, weight = part.strip().partition("=")
+        kind = kind.strip().lstrip("/").lower()
+        if kind.endswith("n") and kind[:-1] in LoadGenerator.FLOOD_KINDS:
+            kind = kind[:-1]
+        if not kind:
+            continue
+        if kind not in LoadGenerator.FLOOD_KINDS:
+            raise ValueError(f"unknown flood address {kind!r}; use {', '.join(LoadGenerator.FLOOD_KINDS)}")
+        mix[kind] = float(weight) if weight.strip() else 1.0
+        if mix[kind] < 0:
+            raise ValueError(f"negative weight for {kind}")
+    if not mix or not sum(mix.values()):
+        raise ValueError("empty flood mix")
+    return mix
+
+
+class LoadGenerator:
+    """Drives a running bridge over UDP and measures how well it keeps up.
+
+    Traffic is either a session journal replayed at 1x or N x speed, or a
+    synthetic flood at a fixed rate with a weighted mix of /noteN, /ccN and
+    /generic. Every PROBE_INTERVAL a /ping goes out in the same stream; the
+    bridge answers each with /pong and its count of datagrams received, so
+    round trips show how far its handlers lag behind, and the count after
+    the run shows how many datagrams were dropped on the way in.
+    """
+    FLOOD_KINDS = ("note", "cc", "generic")
+    POOL_SIZE = 4096  # prebuilt flood datagrams, cycled so building them costs nothing while sending
+    PROBE_INTERVAL = 0.01
+    SPIN = 0.002
+    SETTLE = 2.0  # how long to wait for the final /pong
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5550, ping: str = "/ping"):
+        self.target = (host, port)
+        self.ping = ping
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("", 0))
+        self.sock.settimeout(0.2)
+        self._probes = {}  # seq -> perf_counter send time, until answered
+        self._answers = {}  # seq -> (round trip seconds, datagrams the bridge had received)
+        self._seq = itertools.count()
+        self._listening = False
+
+    def close(self) -> None:
+        self._listening = False
+        self.sock.close()
+
+    def flood(self, rate: float, duration: float, mix=None, channels: int = 16, seed: int = None) -> dict:
+        """Sends rate messages per second for duration seconds, drawn from mix ({kind: weight})."""
+        if rate <= 0 or duration <= 0:
+            raise ValueError("rate and duration must be positive")
+        pool = self.flood_pool(mix or {"note": 6, "cc": 3, "generic": 1}, channels, random.Random(seed))
+        count = int(rate * duration)
+        return self._drive((i / rate, pool[i % len(pool)]) for i in range(count))
+
+    def flood_pool(self, mix: dict, channels: int, rng) -> list:
+        kinds = [k for k in mix if mix[k] > 0]
+        weights = [mix[k] for k in kinds]
+        pool = []
+        for kind in rng.choices(kinds, weights, k=self.POOL_SIZE):
+            channel = rng.randint(1, channels)
+            if kind == "note":
+                address, args = f"/note{channel}", [rng.randint(36, 96), rng.randint(1, 127)]
+            elif kind == "cc":
+                address, args = f"/cc{channel}", [rng.randint(0, 119), rng.randint(0, 127)]
+            else:
+                address, args = "/generic", ["control_change", rng.randint(0, 119), rng.randint(0, 127)]
+            builder = osc_message_builder.OscMessageBuilder(address)
+            for arg in args:
+                builder.add_arg(arg)
+            pool.append(builder.build().dgram)
+        return pool
+
+    def replay(self, path: str, speed: float = 1.0, midi_out=None) -> dict:
+        """Replays a journal's incoming OSC (and, given an open MIDI port, its incoming MIDI) at speed x."""
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        # Probes recorded from an earlier load test are left out; their numbers would clash with ours.
+        probe = self.ping.encode() + b"\0"
+        records = [(t, kind, data) for t, kind, data in read_journal(path)
+                   if (kind == SessionRecorder.OSC_IN and not data.startswith(probe))
+                   or (kind == SessionRecorder.MIDI_IN and midi_out)]
+        if not records:
+            raise ValueError("nothing to replay")
+        first = records[0][0]
+        items = (((t - first) / speed, data if kind == SessionRecorder.OSC_IN else mido.Message.from_bytes(data))
+                 for t, kind, data in records)
+        return self._drive(items, midi_out)
+
+    def _drive(self, items, midi_out=None) -> dict:
+        sock, target = self.sock, self.target
+        self._probes.clear()
+        self._answers.clear()
+        self._listening = True
+        listener = threading.Thread(target=self._listen, name="LoadProbeListener", daemon=True)
+        listener.start()
+        baseline = self._sync_probe()
+        sent = midi_sent = errors = 0
+        probes = []
+        start = next_probe = time.perf_counter()
+        for offset, payload in items:
+            due = start + offset
+            while True:
+                now = time.perf_counter()
+                if now >= next_probe:
+                    probes.append(self._send_probe())
+                    next_probe = max(next_probe + self.PROBE_INTERVAL, now)
+                if now >= due:
+                    break
+                wait = min(due, next_probe) - now
+                if wait > self.SPIN:
+                    time.sleep(wait - self.SPIN)
+            try:
+                if isinstance(payload, bytes):
+                    sock.sendto(payload, target)
+                    sent += 1
+                else:
+                    midi_out.send(payload)
+                    midi_sent += 1
+            except OSError:
+                errors += 1
+        elapsed = time.perf_counter() - start
+        final = self._sync_probe()
+        self._listening = False
+        listener.join()
+        answers = self._answers
+        lat = sorted(answers[seq][0] for seq in probes if seq in answers)
+        report = {
+            "sent": sent, "midi_sent": midi_sent, "send_errors": errors, "seconds": elapsed,
+            "rate": sent / elapsed if elapsed else 0.0, "probes": len(probes),
+            "probes_lost": len(probes) - len(lat), "received": None, "dropped": None,
+        }
+        if baseline and final:
+            # Datagrams after the baseline probe up to the answered final one: traffic plus every probe.
+            report["received"] = final[1] - baseline[1]
+            report["dropped"] = max(0, sent + final[0] - baseline[0] - report["received"])
+        if lat:
+            pick = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1000
+            report.update(latency_p50=pick(0.5), latency_p95=pick(0.95), latency_p99=pick(0.99),
+                          latency_max=lat[-1] * 1000)
+        return report
+
+    def _send_probe(self) -> int:
+        seq = next(self._seq)
+        self._probes[seq] = time.perf_counter()
+        builder = osc_message_builder.OscMessageBuilder(self.ping)
+        builder.add_arg(seq)
+        try:
+            self.sock.sendto(builder.build().dgram, self.target)
+        except OSError:
+            pass
+        return seq
+
+    def _sync_probe(self):
+        """Pings until the bridge answers, which it does after everything sent before; (seq, count) or None."""
+        deadline = time.perf_counter() + self.SETTLE
+        while time.perf_counter() < deadline:
+            seq = self._send_probe()
+            answer = time.perf_counter() + 0.1
+            while time.perf_counter() < answer:
+                if seq in self._answers:
+                    return seq, self._answers[seq][1]
+                time.sleep(0.001)
+        return None
+
+    def _listen(self) -> None:
+        while self._listening:
+            try:
+                data, _ = self.sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            now = time.perf_counter()
+            try:
+                message = osc_message.OscMessage(data)
+            except osc_message.ParseError:
+                continue
+            params = message.params
+            if message.address != "/pong" or len(params) < 2:
+                continue
+            sent_at = self._probes.pop(params[0], None)
+            if sent_at is not None:
+                self._answers[params[0]] = (now - sent_at, params[-1])
+
+    @staticmethod
+    def describe(report: dict) -> str:
+        lines = [f"Sent {report['sent']} OSC messages in {report['seconds']:.2f} s "
+                 f"({report['rate']:.0f} msg/s), {report['send_errors']} send errors"]
+        if report["midi_sent"]:
+            lines.append(f"Sent {report['midi_sent']} MIDI messages")
+        if report["received"] is None:
+            lines.append("No /pong from the bridge: received and dropped counts unknown")
+        else:
+            lines.append(f"Bridge received {report['received']}, dropped {report['dropped']}")
+        lines.append(f"Probes: {report['probes']} sent, {report['probes_lost']} unanswered")
+        if "latency_p50" in report:
+            lines.append("Round trip ms: p50 {latency_p50:.2f}, p95 {latency_p95:.2f}, "
+                         "p99 {latency_p99:.2f}, max {latency_max:.2f}".format(**report))
+        return "\n".join(lines)
+
+# ----------------------- OSCMIDIBridge Class ---------------------------- #
+# What a UI needs to draw, read in one go by OSCMIDIBridge.snapshot().
+EngineState = namedtuple("EngineState", [
+    "transport", "track", "tracks", "track_name", "bpm", "bpm_locked", "position",
+    "events_sent", "late_events", "max_late_ms", "status", "connection", "note_off_delay",
+    "ignore_bpm", "playlist_version", "alarms_version", "cue", "decks", "bundles", "lan_sync",
+    "recording", "local_ips", "midi_inputs", "midi_outputs",
+])
+
+
+class OSCMIDIBridge:
+    """The OSC <-> MIDI bridge and playlist player, with no UI.
+
+    OSCMIDIApp puts the Tk window on top of it. Headless, it is configured from
+    config.json and command-line overrides and driven by the incoming OSC
+    addresses. Engine threads only record state (set_status,
+    set_connection_status, update_playlist_view); a UI polls snapshot() and
+    never receives calls from those threads, apart from alert().
+    """
+    CONFIG_FILE = "config.json"
+    SESSION_CACHE_FILE = "session_cache.json"
+    ALARMS_FILE = "alarms.json"
+    STARTUP_TARGET_MS = 500
+    MAX_PENDING_MIDI_OUT = 256
+    MIDI_OUT_RING_CAPACITY = 1024
+    LONG_MIDI_MARKER = 0  # ring word standing for the next message in long_midi_out (pack_midi never makes 0)
+    MIDI_CLOCK = mido.Message("clock")
+    CLOCK_MESSAGES = ("clock", "start", "stop", "continue", "songpos")
+    PHASE_GAIN = 0.1  # tempo correction per beat of phase error when following
+    PHASE_PULL = 0.02  # largest correction, so following never bends the pitch of the groove audibly
+    LAN_START_LEAD = 0.3  # a LAN sync leader starts this far ahead so followers can start on the same beat
+    LAN_PHASE_GAIN = 0.5  # followers know the leader's exact beat, so they can pull in harder than a tapped tempo
+    LAN_SEEK_BEATS = 0.25  # phase error beyond which a LAN follower seeks instead of bending its tempo
+    LAN_TRACK_GRACE = 0.5  # seconds a follower may be on another track (e.g. at a file change) before skipping
+    PORT_POLL_INTERVAL = 2.0
+    FEEDBACK_WINDOW = 0.5  # seconds an emitted message is remembered for echo detection
+    FEEDBACK_WARN_INTERVAL = 2.0
+
+    def __init__(self, config_file: str = None, overrides: dict = None) -> None:
+        self.config_file = config_file or self.CONFIG_FILE
+
+        # Default MIDI channel (1-indexed)
+        self.default_midi_channel = 1
+
+        # Playlist in load order; the player holds the (possibly shuffled) play order.
+        # The player is created in load_config (in-process or playback process).
+        self.original_playlist = []
+        self.player = None
+        self.playlist_version = 0
+        self.status_text = "No file loaded"
+
+        # BPM / Tempo
+        self.alpha = 0.2
+        self.smoothed_bpm = 120.0
+        self.ignore_bpm = True
+        # External tempo: /bpm taps and (optionally) MIDI Clock on the MIDI input
+        self.tap_follower = TempoFollower(1, alpha=0.5, beta=0.15, tolerance=0.3, acquire=2)
+        self.clock_follower = TempoFollower(24, alpha=0.1, beta=0.005, tolerance=0.15, acquire=24)
+        self.follow_midi_clock = False
+
+        # Sync BPM
+        self.sync_enabled = False
+        self.sync_clock = None  # created once the engine exists
+
+        # Logging: records below log_level are dropped before any formatting
+        self.log_level = logging.getLogger().getEffectiveLevel()
+
+        # MIDI/OSC
+        self.midi_out = None
+        self.midi_in = None
+        self.osc_client = None
+        self.connection_status = "red"
+
+        # MIDI hot-plug: configured port names, and output held while the port is offline
+        self.midi_in_name = ""
+        self.midi_out_name = ""
+        self.pending_midi_out = deque(maxlen=self.MAX_PENDING_MIDI_OUT)
+        self.feedback_guard = FeedbackGuard(self.FEEDBACK_WINDOW)
+        # What each destination has been sent, for stuck-note cleanup and resync
+        self.osc_state = ChannelState()
+        self.midi_state = ChannelState()
+        # Transpose/remap/velocity/filter rules per direction, compiled to lookup tables (None = pass through)
+        self.transform_file = ""
+        self.transform_rules = {}
+        self.midi_to_osc_transform = None
+        self.osc_to_midi_transform = None
+        self.feedback_warned_at = 0.0
+        # OSC handlers (loop thread) -> MIDI output writer thread
+        # Session journal of OSC and MIDI in both directions, started with Record / --record / /record
+        self.recorder = SessionRecorder()
+        self.recordings_dir = os.path.join(os.path.dirname(os.path.abspath(self.config_file)), "recordings")
+        self.long_midi_out = deque()  # SysEx waiting its turn in the MidiOutWriter ring
+        self.midi_out_writer = RingConsumer(
+            SPSCRing("osc->midi", self.MIDI_OUT_RING_CAPACITY), self._write_buffered_midi_out, "MidiOutWriter")
+        self.port_watcher = MidiPortWatcher(
+            self._on_midi_ports_changed, self._reconnect_midi_ports, self.PORT_POLL_INTERVAL)
+
+        # Interfaces and MIDI ports from the previous session, shown until the background scans finish
+        self.session_cache_file = os.path.join(os.path.dirname(os.path.abspath(self.config_file)),
+                                               self.SESSION_CACHE_FILE)
+        self._cache_lock = threading.Lock()
+        cache = self.load_session_cache()
+        self.local_ips = [tuple(entry) for entry in cache.get("local_ips", [])]
+        self.port_watcher.input_ports = list(cache.get("midi_inputs", []))
+        self.port_watcher.output_ports = list(cache.get("midi_outputs", []))
+
+        # Event loop for OSC, MIDI input, playback, note-offs, sync and alarms
+        self.engine = AsyncEngine()
+        self.sync_clock = SyncClock(lambda: self.player.timeline, lambda: self.player.user_bpm,
+                                    self._emit_sync, self.engine.submit)
+        # MIDI Clock out follows the same timeline but only runs while a file plays.
+        self.midi_clock_enabled = False
+        self.midi_clock = SyncClock(lambda: self.player.timeline, lambda: self.player.user_bpm,
+                                    self._emit_midi_clock, self.engine.submit, "24ppqn", free_run=False,
+                                    transport=self._emit_midi_transport, name="MidiClockSender")
+
+        # Timetagged OSC bundles are held until their time; late ones are played ("play") or dropped ("drop")
+        self.late_bundle_policy = "play"
+        # With the jitter buffer on, timetags only set each source's relative timing (no clock sync needed)
+        self.jitter_buffer = False
+        self.osc_dispatcher = None
+        # Raw MIDI: every MIDI message (SysEx included) travels as its bytes on one address
+        self.raw_midi = False
+
+        # LAN sync: one instance leads, others follow its transport and beat
+        self.lan_sync_role = "off"
+        self.lan_leader = ""  # leader address for followers; empty finds it by broadcast
+        self.lan_port = LanSync.PORT
+        self.lan_sync = LanSync(self._lan_state, self._follow_leader,
+                                lambda text, level: self.log_message(text, level=level), self.engine.submit)
+        self._lan_track_since = None
+
+        # Cue lists play through their own precision sender
+        self.cue_file = ""
+        self.cue_player = CuePlayer(self._send_cue, self.engine.submit)
+
+        # Decks: extra files layered over the playlist, merged by one scheduler
+        self.deck_mixer = DeckMixer(lambda msg: self.handle_midi_message(msg, source="deck"),
+                                    lambda: self.player.timeline, lambda: self.player.user_bpm,
+                                    self.engine.call_soon, self.engine.submit)
+
+        # Alarms fire from their own timer thread and persist next to the config file
+        self.alarm_scheduler = AlarmScheduler(
+            self._fire_alarm, os.path.join(os.path.dirname(os.path.abspath(self.config_file)), self.ALARMS_FILE))
+
+        # Static OSC Addresses (editable)
+        self.osc_addresses_in = {
+            "pause": "/pause",
+            "play": "/play",
+            "stop": "/stop",
+            "skip": "/skip",
+            "back": "/back",
+            "previous": "/previous",
+            "bpm": "/bpm",
+            "bpm1": "/bpm1",
+            "resetbpm": "/resetbpm",
+            "generic": "/generic",
+            "loglevel": "/loglevel",
+            "cue": "/cue",
+            "cuego": "/cuego",
+            "cueback": "/cueback",
+            "cuestop": "/cuestop",
+            "seek": "/seek",
+            "seekbar": "/seekbar",
+            "resync": "/resync",
+            "decks": "/decks",
+            "deckmute": "/deckmute",
+            "transforms": "/reloadtransforms",
+            "midi": "/midi",
+            "record": "/record",
+            "ping": "/ping",
+        }
+        # Only “sync” remains for static outgoing. We removed “aftertouch.”
+        self.osc_addresses_out = {
+            "sync": "/sync",
+            "midi": "/midi",
+        }
+        # Dynamic addresses template for incoming:
+        self.osc_addresses_in["noteX"] = "/noteX"
+        self.osc_addresses_in["noteoffX"] = "/noteoffX"
+        self.osc_addresses_in["ccX"] = "/ccX"
+        self.osc_addresses_in["pitchX"] = "/pitchX"  # For pitch bend
+        self.osc_addresses_in["afterX"] = "/afterX"  # For aftertouch
+        self.default_osc_addresses_in = dict(self.osc_addresses_in)
+        self.default_osc_addresses_out = dict(self.osc_addresses_out)
+
+        # Note Off Delay default
+        self.note_off_delay = 0.5  # seconds
+        self.note_off_delay_address = "/delay"
+
+        self.load_config(overrides)
+        self.engine.start()
+
+    def start(self) -> None:
+        """Starts port watching, the interface scan and the alarm timer; call once the UI (if any) is built."""
+        self.port_watcher.start()
+        threading.Thread(target=self._scan_local_ips, name="InterfaceScan", daemon=True).start()
+        restored = self.alarm_scheduler.load()
+        if restored:
+            self.log_message("Restored %d alarm(s) from %s", restored, self.alarm_scheduler.path)
+        self.alarm_scheduler.start()
+        if self.lan_sync_role != "off":
+            self.set_lan_sync(self.lan_sync_role, self.lan_leader)
+        if self.transform_file:
+            self.load_transforms(self.transform_file)
+        if self.raw_midi:
+            self.player.set_raw_midi(self.raw_midi_address())
+        if self.cue_file:
+            self.load_cues(self.cue_file)
+        if self.midi_clock_enabled:
+            self.midi_clock.start()
+        self.display_osc_addresses()
+
+    # ---------------- Config, IP ----------------
+    def load_config(self, overrides: dict = None) -> None:
+        """Reads config_file; overrides (same keys, e.g. from the command line) win over it but aren't saved."""
+        config = {}
+        if os.path.exists(self.config_file):
+            with open(self.config_file, "r") as f:
+                config = json.load(f)
+        self.file_config = dict(config)
+        config.update(overrides or {})
+        self.saved_port = config.get("osc_in_port", "5550")
+        self.saved_midi_port = config.get("midi_input_port", "")
+        self.saved_midi_out_port = config.get("midi_output_port", "")
+        # Without a saved destination, default to this machine once the interface scan is done.
+        self.out_ip_configured = "osc_out_ip" in config
+        self.saved_out_ip = config.get("osc_out_ip", self.get_local_ip())
+        self.saved_out_port = config.get("osc_out_port", "3330")
+        # Update addresses from config, if present
+        self.osc_addresses_in.update(config.get("osc_addresses_in", {}))
+        self.osc_addresses_out.update(config.get("osc_addresses_out", {}))
+        self.note_off_delay_address = config.get("note_off_delay_address", self.note_off_delay_address)
+        self.use_playback_process = config.get("playback_process", False)
+        self.player = self.create_player(self.use_playback_process)
+        if "log_level" in config:
+            self.set_log_level(parse_log_level(config["log_level"]))
+        self.sync_clock.division = config.get("sync_division", self.sync_clock.division)
+        self.midi_clock_enabled = config.get("midi_clock", False)
+        self.follow_midi_clock = config.get("follow_midi_clock", False)
+        self.cue_file = config.get("cue_file", "")
+        self.late_bundle_policy = config.get("late_bundle_policy", self.late_bundle_policy)
+        self.jitter_buffer = config.get("jitter_buffer", False)
+        self.lan_sync_role = config.get("lan_sync", self.lan_sync_role)
+        self.lan_leader = config.get("lan_leader", self.lan_leader)
+        self.lan_port = int(config.get("lan_port", self.lan_port))
+        self.transform_file = config.get("transform_file", "")
+        self.raw_midi = config.get("raw_midi", False)
+        # What each override set, so save_config can tell it from a later change made in the app.
+        current = self.config_values()
+        self.overridden = {key: current.get(key) for key in overrides or {}}
+
+    def save_config(self) -> None:
+        """Writes the settings to config_file; a command-line override still in effect keeps the file's value."""
+        config = self.config_values()
+        for key, value in self.overridden.items():
+            if str(config.get(key)) != str(value):
+                continue  # changed in the app since startup: save the new value
+            if key in self.file_config:
+                config[key] = self.file_config[key]
+            else:
+                config.pop(key, None)
+        with open(self.config_file, "w") as f:
+            json.dump(config, f, indent=4)
+
+    def config_values(self) -> dict:
+        return {
+            "osc_in_port": self.saved_port,
+            "midi_input_port": self.saved_midi_port,
+            "midi_output_port": self.saved_midi_out_port,
+            "osc_out_ip": self.saved_out_ip,
+            "osc_out_port": self.saved_out_port,
+            "osc_addresses_in": self.osc_addresses_in,
+            "osc_addresses_out": self.osc_addresses_out,
+            "playback_process": self.use_playback_process,
+            "note_off_delay_address": self.note_off_delay_address,
+            "log_level": self.log_level,
+            "sync_division": self.sync_clock.division,
+            "midi_clock": self.midi_clock_enabled,
+            "follow_midi_clock": self.follow_midi_clock,
+            "cue_file": self.cue_file,
+            "late_bundle_policy": self.late_bundle_policy,
+            "jitter_buffer": self.jitter_buffer,
+            "lan_sync": self.lan_sync_role,
+            "lan_leader": self.lan_leader,
+            "lan_port": self.lan_port,
+            "transform_file": self.transform_file,
+            "raw_midi": self.raw_midi,
+        }
+
+    def get_local_ip(self) -> str:
+        """Primary local IPv4 address; the previous session's until the interface scan finishes."""
+        return primary_ip(self.local_ips)
+
+    def _scan_local_ips(self) -> None:
+        ips = list_local_ips()
+        self.local_ips = ips
+        if ips:
+            self.log_message("Local interfaces: " + ", ".join(f"{name} {ip}" for name, ip in ips))
+        else:
+            self.log_message("No local IPv4 interfaces found.", level=logging.WARNING)
+        if not self.out_ip_configured:
+            self.saved_out_ip = self.get_local_ip()
+        self.save_session_cache()
+
+    # ---------------- Session Cache ----------------
+    def load_session_cache(self) -> dict:
+        try:
+            with open(self.session_cache_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_session_cache(self) -> None:
+        cache = {
+            "local_ips": self.local_ips,
+            "midi_inputs": self.port_watcher.input_ports,
+            "midi_outputs": self.port_watcher.output_ports,
+        }
+        with self._cache_lock:
+            try:
+                with open(self.session_cache_file, "w") as f:
+                    json.dump(cache, f, indent=4)
+            except OSError as e:
+                logging.debug(f"Session cache write error: {e}")
+
+    def report_startup_time(self, what: str) -> None:
+        elapsed_ms = (time.perf_counter() - STARTUP_T0) * 1000.0
+        level = logging.INFO if elapsed_ms <= self.STARTUP_TARGET_MS else logging.WARNING
+        self.log_message(f"{what} {elapsed_ms:.0f} ms after launch (target {self.STARTUP_TARGET_MS} ms).", level=level)
+
+    # ---------------- UI State ----------------
+    def set_status(self, text: str) -> None:
+        """One-line player status; the window shows it in the info label."""
+        self.status_text = text
+
+    def update_playlist_view(self) -> None:
+        """Marks the playlist contents or order as changed."""
+        self.playlist_version += 1
+
+    def snapshot(self) -> EngineState:
+        """Current transport, tempo, position and counters, safe to call from any thread."""
+        p = self.player
+        playlist = p.playlist
+        index = p.current_index
+        if not p.playing:
+            transport = "stopped"
+        else:
+            transport = "paused" if p.paused else "playing"
+        return EngineState(
+            transport=transport,
+            track=index + 1 if p.playing else 0,
+            tracks=len(playlist),
+            track_name=os.path.basename(playlist[index]) if p.playing and 0 <= index < len(playlist) else "",
+            bpm=p.user_bpm,
+            bpm_locked=p.bpm_locked,
+            position=p.position if p.playing else 0.0,
+            events_sent=p.events_sent,
+            late_events=p.late_events,
+            max_late_ms=p.max_late_ms,
+            status=self.status_text,
+            connection=self.connection_status,
+            note_off_delay=self.note_off_delay,
+            ignore_bpm=self.ignore_bpm,
+            playlist_version=self.playlist_version,
+            alarms_version=self.alarm_scheduler.version,
+            cue=self.cue_player.describe(),
+            lan_sync=self.lan_sync.describe(),
+            decks=self.deck_mixer.describe(),
+            recording=self.recorder.describe(),
+            bundles=self.osc_dispatcher.describe() if self.osc_dispatcher and self.osc_dispatcher.seen else "",
+            local_ips=tuple(self.local_ips),
+            midi_inputs=tuple(self.port_watcher.input_ports),
+            midi_outputs=tuple(self.port_watcher.output_ports),
+        )
+
+    def alert(self, title: str, text: str, level: int = logging.WARNING) -> None:
+        """Reports a problem the user has to act on; the window also shows a dialog."""
+        self.log_message(f"{title}: {text}", level=level)
+
+    def set_connection_status(self, color: str) -> None:
+        if color not in ["red", "green", "orange"]:
+            color = "red"
+        self.connection_status = color
+
+    # ---------------- MIDI Port Hot-Plug ----------------
+    def get_midi_ports(self):
+        return list(self.port_watcher.input_ports)
+
+    def get_midi_output_ports(self):
+        return list(self.port_watcher.output_ports)
+
+    def _on_midi_ports_changed(self, inputs, outputs) -> None:
+        """Called from the port watcher thread whenever the port lists change."""
+        self.save_session_cache()
+
+    def _reconnect_midi_ports(self, inputs, outputs) -> None:
+        """Called after every poll: drops vanished ports and reopens configured ones that are back."""
+        if self.midi_out_name:
+            if self.midi_out_name not in outputs and self.midi_out:
+                self.log_message(f"MIDI output '{self.midi_out_name}' disconnected; queueing output.",
+                                 level=logging.WARNING)
+                self.disconnect_midi_output()
+            elif self.midi_out_name in outputs and not self.midi_out:
+                self.connect_midi_output(self.midi_out_name)
+        if self.midi_in_name:
+            if self.midi_in_name not in inputs and self.midi_in:
+                self.log_message(f"MIDI input '{self.midi_in_name}' disconnected.", level=logging.WARNING)
+                self.disconnect_midi_input()
+            elif self.midi_in_name in inputs and not self.midi_in:
+                self.connect_midi_input(self.midi_in_name)
+
+    def connect_midi_input(self, name: str):
+        """Opens the named MIDI input, delivering to the engine loop. Returns the error, if any."""
+        self.midi_in_name = name
+        try:
+            self.midi_in = self.engine.open_midi_input(name, self.on_midi_input)
+        except Exception as e:
+            self.log_message(f"Cannot open MIDI input '{name}': {e}", level=logging.WARNING)
+            return e
+        self.log_message(f"MIDI input '{name}' connected.")
+        return None
+
+    def disconnect_midi_input(self) -> None:
+        midi_in, self.midi_in = self.midi_in, None
+        if midi_in:
+            try:
+                midi_in.close()
+            except Exception as e:
+                logging.debug(f"Error closing MIDI input: {e}")
+
+    def connect_midi_output(self, name: str):
+        """Opens the named MIDI output and replays anything queued while it was offline."""
+        self.midi_out_name = name
+        try:
+            midi_out = mido.open_output(name)
+        except Exception as e:
+            self.log_message(f"Cannot open MIDI output '{name}': {e}", level=logging.WARNING)
+            return e
+        # A reconnected device may have lost its settings: restore controllers, program and bend first.
+        restored = self.midi_state.messages(notes=False)
+        try:
+            for msg in restored:
+                midi_out.send(msg)
+                if self.recorder.active:
+                    self.recorder.record(SessionRecorder.MIDI_OUT, msg.bytes())
+        except Exception as e:
+            self.log_message(f"MIDI Output error while restoring state: {e}", level=logging.ERROR)
+        replayed = self._flush_pending_midi_out(midi_out)
+        self.midi_out = midi_out
+        # Catch anything queued while the backlog above was being replayed.
+        replayed += self._flush_pending_midi_out(midi_out)
+        if restored:
+            self.log_message(f"MIDI output '{name}': restored {len(restored)} controller/program/bend values.")
+        if replayed:
+            self.log_message(f"MIDI output '{name}' connected; replayed {replayed} queued messages.")
+        else:
+            self.log_message(f"MIDI output '{name}' connected.")
+        return None
+
+    def disconnect_midi_output(self) -> None:
+        midi_out, self.midi_out = self.midi_out, None
+        if midi_out:
+            try:
+                midi_out.close()
+            except Exception as e:
+                logging.debug(f"Error closing MIDI output: {e}")
+
+    def _flush_pending_midi_out(self, midi_out) -> int:
+        sent = 0
+        while self.pending_midi_out:
+            msg = self.pending_midi_out.popleft()
+            try:
+                midi_out.send(msg)
+                self.midi_state.update(msg)
+                if self.recorder.active:
+                    self.recorder.record(SessionRecorder.MIDI_OUT, msg.bytes())
+                sent += 1
+            except Exception as e:
+                self.pending_midi_out.appendleft(msg)
+                self.log_message(f"MIDI Output error while replaying queue: {e}", level=logging.ERROR)
+                break
+        return sent
+
+    def send_midi_out(self, msg, context: str) -> bool:
+        """Sends msg to the MIDI output, queueing it while the configured port is offline.
+
+        On the loop thread, messages are handed to the MidiOutWriter ring so OSC
+        handling never waits on the MIDI driver (SysEx waits in long_midi_out behind
+        a marker record, keeping its place in line); other callers write directly.
+        """
+        if self.osc_to_midi_transform:
+            msg = self.osc_to_midi_transform.apply(msg)
+            if msg is None:
+                self.log_message("Transform dropped %s.", context, level=logging.DEBUG)
+                return False
+        if not self.midi_out:
+            if self.midi_out_name:
+                self.pending_midi_out.append(msg)
+                self.log_message("MIDI Output offline; queued %s.", context, level=logging.DEBUG)
+            else:
+                self.log_message(f"MIDI Output not set for {context}.", level=logging.ERROR)
+            return False
+        self.feedback_guard.record("osc->midi", FeedbackGuard.midi_key(msg))
+        if not self.engine.in_loop():
+            return self._write_midi_out(msg, context)
+        word = pack_midi(msg.bytes())
+        if word < 0:
+            self.long_midi_out.append(msg)
+            word = self.LONG_MIDI_MARKER
+        if not self.midi_out_writer.push(time.perf_counter(), word):
+            if word == self.LONG_MIDI_MARKER:
+                self.long_midi_out.pop()
+            self.log_message("MIDI Output buffer full; dropped %s.", context, level=logging.DEBUG)
+            return False
+        return True
+
+    def _write_buffered_midi_out(self, queued_at: float, word: int) -> None:
+        if word == self.LONG_MIDI_MARKER:
+            self._write_midi_out(self.long_midi_out.popleft(), "buffered MIDI")
+            return
+        self._write_midi_out(mido.Message.from_bytes(unpack_midi(word)), "buffered MIDI")
+
+    def _write_midi_out(self, msg, context: str) -> bool:
+        midi_out = self.midi_out
+        if not midi_out:
+            # Went offline while the message was buffered.
+            if self.midi_out_name:
+                self.pending_midi_out.append(msg)
+            return False
+        try:
+            midi_out.send(msg)
+            self.midi_state.update(msg)
+            if self.recorder.active:
+                self.recorder.record(SessionRecorder.MIDI_OUT, msg.bytes())
+            return True
+        except Exception as e:
+            self.log_message(f"MIDI Output error in {context}: {e}", level=logging.ERROR)
+            if self.midi_out_name:
+                self.pending_midi_out.append(msg)
+                self.disconnect_midi_output()
+            return False
+
+    # ---------------- Log Handling ----------------
+    def log_message(self, message: str, *args, level: int = logging.INFO) -> None:
+        """Logs message; args are %-formatted lazily, only if a handler emits it."""
+        logging.log(level, message, *args)
+
+    def set_log_level(self, level: int) -> None:
+        """Changes verbosity for the log backend and the UI log at runtime."""
+        self.log_level = level
+        logging.getLogger().setLevel(level)
+
+    # ---------------- Playlist Management ----------------
+    def add_to_playlist(self, paths) -> int:
+        """Appends MIDI files, or every MIDI file in a folder, to the playlist. Returns how many were added."""
+        added = 0
+        for path in paths:
+            if os.path.isdir(path):
+                files = [os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(('.mid', '.midi'))]
+            else:
+                files = [path]
+            for f in files:
+                self.player.playlist.append(f)
+                self.original_playlist.append(f)
+                added += 1
+        if added:
+            self.player.playlist_updated()
+            self.update_playlist_view()
+        return added
+
+    def clear_playlist(self) -> bool:
+        if self.player.playing:
+            self.alert("Stop Playback", "Stop playback before unloading playlist.")
+            return False
+        self.player.playlist.clear()
+        self.player.playlist_updated()
+        self.original_playlist.clear()
+        self.update_playlist_view()
+        self.set_status("Playlist unloaded.")
+        self.log_message("Playlist unloaded.")
+        return True
+
+    # ---------------- Playback Controls ----------------
+    def play(self) -> None:
+        if not self.player.playlist:
+            self.set_status("No MIDI files loaded.")
+            self.log_message("No MIDI files to play.")
+            return
+        if not self.player.playing:
+            if self.lan_sync_role == "leader":
+                # Followers get the start time first, so everyone starts on the same beat.
+                self.player.play(start_at=time.perf_counter() + self.LAN_START_LEAD)
+            else:
+                self.player.play()
+            self.log_message("Playback started.")
+        else:
+            self.log_message("Playback already running.")
+
+    def stop(self) -> None:
+        if self.player.playing:
+            self.player.stop()
+            self.set_status("Playback stopped.")
+            self.log_message("Playback stopped.")
+        else:
+            self.log_message("Stop requested, but nothing is playing.")
+
+    def skip(self) -> None:
+        if self.player.playing:
+            self.player.skip()
+            self.log_message("Skip requested.")
+        else:
+            self.log_message("Skip requested, but no playback active.")
+
+    def back(self) -> None:
+        if self.player.playing:
+            self.player.back()
+            self.log_message("Restart requested.")
+        else:
+            self.log_message("Back requested, but nothing is playing.")
+
+    def previous(self) -> None:
+        if self.player.playing:
+            if self.player.current_index > 0:
+                self.player.previous()
+                self.log_message("Previous track requested.")
+            else:
+                self.log_message("Already at first track.")
+        else:
+            self.log_message("Previous requested, but nothing is playing.")
+
+    def skip_to_number(self, num: int) -> None:
+        if not self.player.playing:
+            self.log_message(f"Skip to {num} requested but no playback active.")
+            return
+        if 1 <= num <= len(self.player.playlist):
+            self.player.skip_to(num - 1)
+            self.log_message(f"Skip to track #{num}.")
+        else:
+            self.log_message(f"Invalid track number: {num}.")
+
+    def seek(self, kind: str, value: float) -> None:
+        """Seeks within the playing track to value seconds ("time") or to bar value ("bar")."""
+        if not self.player.playing:
+            self.log_message("Seek requested but no playback active.")
+            return
+        self.player.seek(kind, value)
+        self.log_message(f"Seek to {'bar ' if kind == 'bar' else ''}{value:g}{' s' if kind == 'time' else ''}.")
+
+    @staticmethod
+    def parse_seek(text) -> tuple:
+        """"2:30" or "150" (seconds) -> ("time", 150.0); "bar 17" or "b17" -> ("bar", 17.0)."""
+        text = str(text).strip().lower()
+        m = re.match(r'^(?:bar|b)\s*(\d+(?:\.\d+)?)$', text)
+        if m:
+            return "bar", max(1.0, float(m.group(1)))
+        seconds = 0.0
+        for part in text.split(":"):
+            seconds = seconds * 60.0 + float(part)
+        return "time", max(0.0, seconds)
+
+    def set_looping(self, looping: bool) -> None:
+        self.player.looping = looping
+        self.log_message(f"Looping {'enabled' if self.player.looping else 'disabled'}.")
+
+    def set_randomize(self, randomize: bool) -> None:
+        """Shuffles the playlist, or restores load order when randomize is False."""
+        self.player.randomize = randomize
+        if self.player.randomize:
+            if len(self.player.playlist) > 1:
+                random.shuffle(self.player.playlist)
+                self.player.playlist_updated()
+                self.update_playlist_view()
+                self.player.current_index = 0
+                self.log_message("Playlist randomized.")
+            else:
+                self.log_message("Not enough files to randomize.")
+        else:
+            self.player.playlist = self.original_playlist.copy()
+            self.update_playlist_view()
+            self.player.current_index = 0
+            self.log_message("Playlist restored to original order.")
+
+    # ---------------- Playback Engine ----------------
+    def create_player(self, separate_process: bool):
+        """Builds the in-process PlaybackEngine, or a PlaybackProcess driving a child process."""
+        if separate_process:
+            try:
+                player = PlaybackProcess(self.on_player_event)
+                self.feedback_guard.follow(player.echo)
+                return player
+            except Exception as e:
+                self.log_message(f"Cannot start playback process, playing in-process: {e}", level=logging.ERROR)
+                self.use_playback_process = False
+        self.feedback_guard.follow(None)
+        return PlaybackEngine(lambda msg: self.handle_midi_message(msg, source="playback"),
+                              self.on_player_event, self.engine.submit)
+
+    def set_playback_process(self, separate_process: bool) -> bool:
+        """Swaps between in-process and separate-process playback, keeping settings and playlist."""
+        if self.player.playing:
+            self.alert("Stop Playback", "Stop playback before switching the playback engine.")
+            return False
+        old = self.player
+        self.use_playback_process = separate_process
+        self.player = self.create_player(self.use_playback_process)
+        self.player.user_bpm, self.player.default_bpm = old.user_bpm, old.default_bpm
+        self.player.looping, self.player.randomize, self.player.bpm_locked = old.looping, old.randomize, old.bpm_locked
+        self.player.playlist = list(old.playlist)
+        self.player.set_transforms(self.transform_rules.get("midi_to_osc"))
+        self.player.set_raw_midi(self.raw_midi_address())
+        self.player.set_journal(self.recorder.active)
+        if self.osc_client:
+            self.player.set_osc_target(self.saved_out_ip, int(self.saved_out_port))
+        old.close()
+        self.save_config()
+        self.log_message(f"Playback engine: {'separate process' if self.use_playback_process else 'in-process'}.")
+        return True
+
+    def on_player_event(self, kind: str, value) -> None:
+        """Playback notifications, from the engine loop or the playback-process reader thread."""
+        if kind == "status":
+            self.set_status(value)
+        elif kind == "log":
+            text, level = value
+            self.log_message(text, level=level)
+        elif kind == "bpm":
+            self.smoothed_bpm = float(value)
+            # A new file brought its own tempo; while an external clock is being followed, keep to it.
+            follower = self.clock_follower
+            if self.follow_midi_clock and follower.bpm and time.perf_counter() - follower.last < 1.0:
+                self.player.user_bpm = self.smoothed_bpm = follower.bpm
+        elif kind == "playlist":
+            self.player.playlist[:] = value
+            self.update_playlist_view()
+        elif kind == "timeline":
+            self.sync_clock.wake()
+            self.midi_clock.wake()
+        elif kind == "osc_out":
+            t, dgram = value
+            self.recorder.record(SessionRecorder.OSC_OUT, dgram, t)
+
+    # ---------------- MIDI Message Handling ----------------
+    def handle_midi_message(self, msg, source="input") -> None:
+        """Handles MIDI -> OSC (outgoing)"""
+        if self.midi_to_osc_transform:
+            msg = self.midi_to_osc_transform.apply(msg)
+            if msg is None:
+                return
+        if self.raw_midi:
+            if self.osc_client:
+                self.send_raw_midi(msg)
+            return
+        if not hasattr(msg, "channel"):
+            self.log_message("Ignored MIDI message without channel: %s", msg, level=logging.DEBUG)
+            return
+        out = midi_to_osc(msg)
+        if out is None:
+            self.log_message("Ignored MIDI message: %s", msg.type, level=logging.DEBUG)
+            return
+        if self.osc_client:
+            addr, args = out
+            self.send_osc(addr, args)
+            self.osc_state.update(msg)
+            self.log_message("Sent OSC -> %s %s", addr, args, level=logging.DEBUG)
+
+    def resync_osc(self) -> None:
+        """Sends the OSC destination everything it should currently hold, as one bundle.
+
+        For a receiver that joins late or a destination that changed; playback in
+        a separate process sends its own part.
+        """
+        if not self.osc_client:
+            return
+        bundle, sent = midi_to_osc_bundle(self.osc_state.messages(), self.raw_midi_address())
+        if sent:
+            self.osc_client.send(bundle)
+            for addr, args in sent:
+                self.feedback_guard.record("midi->osc", FeedbackGuard.osc_key(addr, args))
+        self.player.resync()
+        if sent:
+            self.log_message("Resynced OSC destination: %d state messages.", len(sent))
+
+    def send_osc(self, addr: str, args) -> None:
+        """Sends a bridged MIDI->OSC message and remembers it for echo detection."""
+        self.osc_client.send_message(addr, args)
+        self.feedback_guard.record("midi->osc", FeedbackGuard.osc_key(addr, args))
+
+    def send_raw_midi(self, msg) -> None:
+        """Sends msg's bytes unchanged on the raw MIDI address and remembers it for echo detection."""
+        addr = self.osc_addresses_out["midi"]
+        message = raw_midi_message(addr, msg.bytes())
+        self.osc_client.send(message)
+        self.feedback_guard.record("midi->osc", FeedbackGuard.osc_key(addr, message.params))
+        if hasattr(msg, "channel"):
+            self.osc_state.update(msg)
+        self.log_message("Sent OSC -> %s %s", addr, msg, level=logging.DEBUG)
+
+    def raw_midi_address(self) -> str:
+        """The raw MIDI output address while raw MIDI is on, else ""."""
+        return self.osc_addresses_out["midi"] if self.raw_midi else ""
+
+    def set_raw_midi(self, enabled: bool) -> None:
+        """Switches MIDI->OSC between per-type addresses and raw bytes on the "midi" address.
+
+        Incoming raw MIDI is always accepted; this only changes what is sent.
+        """
+        self.raw_midi = enabled
+        self.player.set_raw_midi(self.raw_midi_address())
+        self.log_message("Raw MIDI output %s.", "on" if enabled else "off")
+
+    # ---------------- Feedback Loop Guard ----------------
+    def _guard_osc(self, handler):
+        """Wraps a dispatcher handler so OSC echoes of our own MIDI->OSC output are dropped."""
+        def guarded(address, *args):
+            if self.feedback_guard.is_echo("midi->osc", FeedbackGuard.osc_key(address, args)):
+                self._report_feedback("midi->osc", f"OSC {address}")
+                return
+            handler(address, *args)
+        return guarded
+
+    def _report_feedback(self, direction: str, what: str) -> None:
+        """Logs a throttled warning and flags the connection indicator while echoes are being dropped."""
+        now = time.monotonic()
+        if now - self.feedback_warned_at < self.FEEDBACK_WARN_INTERVAL:
+            return
+        self.feedback_warned_at = now
+        self.log_message(
+            f"Feedback loop detected ({direction}): dropped echoed {what}; "
+            f"{self.feedback_guard.dropped[direction]} echoes dropped so far. "
+            f"Check that the MIDI output isn't routed back into the MIDI input.",
+            level=logging.WARNING,
+        )
+        self.set_connection_status("orange")
+        self.engine.call_later(self.FEEDBACK_WARN_INTERVAL, self._clear_feedback_status)
+
+    def _clear_feedback_status(self) -> None:
+        if time.monotonic() - self.feedback_warned_at >= self.FEEDBACK_WARN_INTERVAL and self.osc_client:
+            self.set_connection_status("green")
+
+    # ---------------- Dynamic OSC Handlers (Incoming) ----------------
+    def handle_osc_note_dynamic(self, address, *args):
+        m = re.match(r'/note(\d+)$', address)
+        if not m:
+            self.log_message(f"Invalid dynamic note address: {address}", level=logging.ERROR)
+            return
+        try:
+            ch = int(m.group(1))
+        except Exception as e:
+            self.log_message(f"Error parsing dynamic note channel: {e}", level=logging.ERROR)
+            return
+        if len(args) < 2:
+            self.log_message("Dynamic /note received with insufficient args.", level=logging.ERROR)
+            return
+        try:
+            note = int(args[0])
+            raw_vel = float(args[1])
+        except Exception as e:
+            self.log_message(f"Error parsing dynamic /note args: {e}", level=logging.ERROR)
+            return
+
+        # Convert 0–1 to 0–127, clamp
+        if raw_vel <= 1.0:
+            vel = int(max(0, min(127, raw_vel * 127)))
+        else:
+            vel = int(max(0, min(127, raw_vel)))  # clamp
+
+        msg = mido.Message("note_on", channel=ch-1, note=note, velocity=vel)
+        if self.send_midi_out(msg, "dynamic /note"):
+            self.log_message("OSC->MIDI: note_on (chan %d) note=%d, velocity=%d", ch, note, vel, level=logging.DEBUG)
+
+        # Use the user-defined slider delay:
+        delay = self.note_off_delay
+        self.engine.call_later(delay, self.send_note_off_dynamic, note, ch)
+
+    def send_note_off_dynamic(self, note, ch):
+        msg = mido.Message("note_off", channel=ch-1, note=note, velocity=0)
+        if self.send_midi_out(msg, "dynamic note_off"):
+            self.log_message("OSC->MIDI: note_off (chan %d) note=%d, velocity=0", ch, note, level=logging.DEBUG)
+
+    def handle_osc_noteoff_dynamic(self, address, *args):
+        m = re.match(r'/noteoff(\d+)$', address)
+        if not m:
+            self.log_message(f"Invalid dynamic noteoff address: {address}", level=logging.ERROR)
+            return
+        try:
+            ch = int(m.group(1))
+        except Exception as e:
+            self.log_message(f"Error parsing dynamic noteoff channel: {e}", level=logging.ERROR)
+            return
+        if len(args) < 2:
+            self.log_message("Dynamic /noteoff received with insufficient args.", level=logging.ERROR)
+            return
+        try:
+            note = int(args[0])
+        except Exception as e:
+            self.log_message(f"Error parsing dynamic /noteoff args: {e}", level=logging.ERROR)
+            return
+        msg = mido.Message("note_off", channel=ch-1, note=note, velocity=0)
+        if self.send_midi_out(msg, "dynamic noteoff"):
+            self.log_message("OSC->MIDI: note_off (chan %d) note=%d, velocity=0", ch, note, level=logging.DEBUG)
+
+    def handle_osc_cc_dynamic(self, address, *args):
+        m = re.match(r'/cc(\d+)$', address)
+        if not m:
+            self.log_message(f"Invalid dynamic cc address: {address}", level=logging.ERROR)
+            return
+        try:
+            ch = int(m.group(1))
+        except Exception as e:
+            self.log_message(f"Error parsing dynamic cc channel: {e}", level=logging.ERROR)
+            return
+        if len(args) < 2:
+            self.log_message("Dynamic /cc received with insufficient args.", level=logging.ERROR)
+            return
+        try:
+            cc_num = int(args[0])
+            raw_val = float(args[1])
+            if raw_val <= 1.0:
+                cc_val = int(max(0, min(127, raw_val * 127)))
+            else:
+                cc_val = int(max(0, min(127, raw_val)))
+        except Exception as e:
+            self.log_message(f"Error parsing dynamic /cc args: {e}", level=logging.ERROR)
+            return
+        msg = mido.Message("control_change", channel=ch-1, control=cc_num, value=cc_val)
+        if self.send_midi_out(msg, "dynamic cc"):
+            self.log_message("OSC->MIDI: cc (chan %d) cc=%d, value=%d", ch, cc_num, cc_val, level=logging.DEBUG)
+
+    def handle_osc_pitch_dynamic(self, address, *args):
+        m = re.match(r'/pitch(\d+)$', address)
+        if not m:
+            self.log_message(f"Invalid dynamic pitch address: {address}", level=logging.ERROR)
+            return
+        try:
+            ch = int(m.group(1))
+        except Exception as e:
+            self.log_message(f"Error parsing dynamic pitch channel: {e}", level=logging.ERROR)
+            return
+        if len(args) < 1:
+            self.log_message("Dynamic /pitch received with insufficient args.", level=logging.ERROR)
+            return
+        try:
+            pitch = int(args[0])
+        except Exception as e:
+            self.log_message(f"Error parsing dynamic /pitch args: {e}", level=logging.ERROR)
+            return
+        msg = mido.Message("pitchwheel", channel=ch-1, pitch=pitch)
+        if self.send_midi_out(msg, "dynamic pitch"):
+            self.log_message("OSC->MIDI: pitchwheel (chan %d) pitch=%d", ch, pitch, level=logging.DEBUG)
+
+    def handle_osc_after_dynamic(self, address, *args):
+        m = re.match(r'/after(\d+)$', address)
+        if not m:
+            self.log_message(f"Invalid dynamic aftertouch address: {address}", level=logging.ERROR)
+            return
+        try:
+            ch = int(m.group(1))
+        except Exception as e:
+            self.log_message(f"Error parsing dynamic aftertouch channel: {e}", level=logging.ERROR)
+            return
+        if len(args) < 1:
+            self.log_message("Dynamic /after received with insufficient args.", level=logging.ERROR)
+            return
+        try:
+            val = int(float(args[0]))
+        except Exception as e:
+            self.log_message(f"Error parsing dynamic /after args: {e}", level=logging.ERROR)
+            return
+        msg = mido.Message("aftertouch", channel=ch-1, value=val)
+        if self.send_midi_out(msg, "dynamic aftertouch"):
+            self.log_message("OSC->MIDI: aftertouch (chan %d) value=%d", ch, val, level=logging.DEBUG)
+
+    def handle_osc_generic(self, address, *args):
+        if len(args) < 1:
+            self.log_message("Generic OSC received with insufficient args.", level=logging.ERROR)
+            return
+        try:
+            midi_type = str(args[0]).lower()
+            params = list(args[1:])
+        except Exception as e:
+            self.log_message(f"Error parsing generic OSC args: {e}", level=logging.ERROR)
+            return
+
+        # Default expectations: note_on/note_off expect 2 parameters, etc.
+        expected = {"note_on": 2, "note_off": 2, "control_change": 2, "pitchwheel": 1, "aftertouch": 1}
+        exp = expected.get(midi_type, None)
+        if exp is not None:
+            if len(params) < exp:
+                params.extend([0] * (exp - len(params)))
+        extra = params[exp:] if (exp is not None and len(params) > exp) else []
+        try:
+            kwargs = {"channel": self.default_midi_channel - 1}
+            if midi_type in ["note_on", "note_off"]:
+                if len(params) < 2:
+                    raise ValueError("Not enough parameters for note message.")
+                kwargs["note"] = int(params[0])
+                raw_vel = float(params[1])
+                # clamp velocity
+                vel = int(max(0, min(127, raw_vel*127))) if raw_vel <= 1 else int(max(0, min(127, raw_vel)))
+                kwargs["velocity"] = vel
+            elif midi_type == "control_change":
+                if len(params) < 2:
+                    raise ValueError("Not enough parameters for control_change.")
+                kwargs["control"] = int(params[0])
+                raw_val = float(params[1])
+                cc_val = int(max(0, min(127, raw_val*127))) if raw_val <= 1 else int(max(0, min(127, raw_val)))
+                kwargs["value"] = cc_val
+            elif midi_type == "pitchwheel":
+                if len(params) < 1:
+                    raise ValueError("Not enough parameters for pitchwheel.")
+                kwargs["pitch"] = int(params[0])
+            elif midi_type == "aftertouch":
+                if len(params) < 1:
+                    raise ValueError("Not enough parameters for aftertouch.")
+                kwargs["value"] = int(params[0])
+            else:
+                kwargs["data"] = params
+            if extra:
+                kwargs["data"] = extra
+            msg = mido.Message(midi_type, **kwargs)
+        except Exception as e:
+            self.log_message(f"Error building generic MIDI message: {e}", level=logging.ERROR)
+            return
+        if self.send_midi_out(msg, "generic OSC"):
+            self.log_message("Generic OSC -> Sent MIDI: %s", msg, level=logging.DEBUG)
+
+    def handle_osc_raw_midi(self, address, *args):
+        """Raw MIDI: each 'm' or blob argument is one message's bytes, sent to the MIDI output as-is."""
+        for arg in args:
+            data = raw_midi_bytes(arg)
+            if data is None:
+                self.log_message("Raw MIDI OSC argument is not 'm' or a blob: %r", arg, level=logging.WARNING)
+                continue
+            try:
+                msg = mido.Message.from_bytes(data)
+            except ValueError as e:
+                self.log_message("Invalid raw MIDI %s: %s", data.hex(" "), e, level=logging.WARNING)
+                continue
+            if self.send_midi_out(msg, "raw MIDI"):
+                self.log_message("Raw OSC -> Sent MIDI: %s", msg, level=logging.DEBUG)
+
+    # ---------------- Alarm Clock ----------------
+    def _fire_alarm(self, alarm: Alarm) -> None:
+        """Runs on the alarm timer thread, right at the alarm's time."""
+        if self.osc_client:
+            self.osc_client.send_message(alarm.address, parse_osc_args(alarm.args))
+        self.log_message("Alarm triggered -> sent OSC to %s with args %s", alarm.address, alarm.args)
+
+    def schedule_alarms(self, path: str) -> int:
+        """Bulk-imports alarms from a CSV or JSON file; returns how many were scheduled."""
+        count = self.alarm_scheduler.import_file(path)
+        self.log_message("Imported %d alarm(s) from %s", count, path)
+        return count
+
+    # ---------------- OBS and Bi-Directional Server Functions ----------------
+    def start_server(self, mode: str, osc_in_port: int, osc_out_ip: str, osc_out_port: int,
+                     midi_in_name: str = "", midi_out_name: str = "") -> bool:
+        """Opens the MIDI ports, targets OSC output and binds the OSC input.
+
+        mode is "bidirectional" or "obs"; both bridge the same way today.
+        """
+        if self.is_port_in_use(osc_in_port):
+            self.alert("Error", f"Port {osc_in_port} is in use.", level=logging.ERROR)
+            return False
+        self.open_configured_midi_ports(midi_in_name, midi_out_name)
+        self.osc_client = RecordingUDPClient(osc_out_ip, osc_out_port, self.recorder)
+        self.player.set_osc_target(osc_out_ip, osc_out_port)
+        self.saved_out_ip = osc_out_ip
+        self.saved_out_port = osc_out_port
+        self.saved_port = osc_in_port
+        self.saved_midi_port = midi_in_name
+        self.saved_midi_out_port = midi_out_name
+        if not self.start_osc_server(osc_in_port):
+            return False
+        self.log_message(f"{'OBS' if mode == 'obs' else 'Bi-Directional'} OSC Server started.")
+        # A new destination starts out knowing nothing of what is already playing.
+        self.resync_osc()
+        return True
+
+    def open_configured_midi_ports(self, midi_in_name: str, midi_out_name: str) -> None:
+        """Opens the selected MIDI ports; missing ports are reconnected when they reappear."""
+        if midi_in_name:
+            err = self.connect_midi_input(midi_in_name)
+            if err:
+                self.alert("MIDI Input Error", f"Cannot open MIDI input: {err}\nIt will reconnect when the port reappears.")
+        if midi_out_name:
+            err = self.connect_midi_output(midi_out_name)
+            if err:
+                self.alert("MIDI Output Error", f"Cannot open MIDI output: {err}\nOutput is queued until the port reappears.")
+
+    # ---------------- OSC Server Functions ----------------
+    def is_port_in_use(self, port: int) -> bool:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            try:
+                s.bind(("0.0.0.0", port))
+                return False
+            except OSError:
+                return True
+
+    def build_dispatcher(self) -> dispatcher.Dispatcher:
+        if self.osc_dispatcher:
+            self.osc_dispatcher.close()
+        disp = self.osc_dispatcher = TimedDispatcher(self.late_bundle_policy, self.jitter_buffer)
+        disp.recorder = self.recorder
+        # Map static incoming addresses
+        disp.map(self.osc_addresses_in["pause"], self.handle_pause)
+        disp.map(self.osc_addresses_in["play"], self.handle_play)
+        disp.map(self.osc_addresses_in["stop"], self.handle_stop)
+        disp.map(self.osc_addresses_in["skip"], self.handle_skip)
+        disp.map(self.osc_addresses_in["back"], self.handle_back)
+        disp.map(self.osc_addresses_in["previous"], self.handle_previous)
+        disp.map(self.osc_addresses_in["bpm"], self.handle_bpm)
+        disp.map(self.osc_addresses_in["bpm1"], self.handle_bpm1_toggle)
+        disp.map(self.osc_addresses_in["resetbpm"], self.handle_resetbpm)
+        disp.map(self.osc_addresses_in["generic"], self.handle_osc_generic)
+        disp.map(self.osc_addresses_in["loglevel"], self.handle_log_level)
+        disp.map(self.osc_addresses_in["resync"], self.handle_resync)
+        disp.map(self.osc_addresses_in["seek"], self.handle_seek)
+        disp.map(self.osc_addresses_in["seekbar"], self.handle_seek_bar)
+        disp.map(self.osc_addresses_in["cue"], self.handle_cue)
+        disp.map(self.osc_addresses_in["cuego"], self.handle_cue_go)
+        disp.map(self.osc_addresses_in["cueback"], self.handle_cue_back)
+        disp.map(self.osc_addresses_in["cuestop"], self.handle_cue_stop)
+        disp.map(self.osc_addresses_in["decks"], self.handle_decks)
+        disp.map(self.osc_addresses_in["deckmute"], self.handle_deck_mute)
+        disp.map(self.osc_addresses_in["transforms"], self.handle_reload_transforms)
+        disp.map(self.osc_addresses_in["midi"], self._guard_osc(self.handle_osc_raw_midi))
+        disp.map(self.osc_addresses_in["record"], self.handle_record)
+        disp.map(self.osc_addresses_in["ping"], self.handle_ping)
+        # Map dynamic incoming addresses: note, noteoff, cc, pitch, after.
+        # These mirror what handle_midi_message sends, so they go through the feedback guard.
+        for ch in range(1, 17):
+            disp.map(f"/note{ch}", self._guard_osc(self.handle_osc_note_dynamic))
+            disp.map(f"/noteoff{ch}", self._guard_osc(self.handle_osc_noteoff_dynamic))
+            disp.map(f"/cc{ch}", self._guard_osc(self.handle_osc_cc_dynamic))
+            disp.map(f"/pitch{ch}", self._guard_osc(self.handle_osc_pitch_dynamic))
+            disp.map(f"/after{ch}", self._guard_osc(self.handle_osc_after_dynamic))
+        # Map numeric addresses for track skipping
+        for i in range(1, 51):
+            disp.map(f"/{i}", self.handle_numeric_skip)
+
+        # Map the Note Off Delay address (default "/delay")
+        disp.map(self.note_off_delay_address, self.handle_set_note_off_delay)
+        return disp
+
+    def start_osc_server(self, port: int) -> bool:
+        """Binds the OSC receive endpoint on the engine loop."""
+        try:
+            self.engine.serve_osc(port, self.build_dispatcher())
+        except Exception as e:
+            self.alert("Binding Error", f"Could not bind to port {port}: {e}", level=logging.ERROR)
+            self.set_connection_status("red")
+            return False
+        self.log_message(f"OSC Server bound to port {port}.")
+        self.set_connection_status("green")
+        return True
+
+    def handle_numeric_skip(self, address, *args):
+        m = re.match(r'^/(\d+)$', address)
+        if m:
+            num = int(m.group(1))
+            self.skip_to_number(num)
+        else:
+            self.log_message(f"Unhandled numeric OSC address: {address}")
+
+    # ---------------- Handler for setting Note Off Delay via OSC ----------------
+    def handle_set_note_off_delay(self, address, *args):
+        """Allows changing the Note Off Delay via an OSC message."""
+        if len(args) < 1:
+            return
+        try:
+            val = float(args[0])
+        except ValueError:
+            return
+        val = max(0, min(5, val))  # clamp to [0..5]
+        self.note_off_delay = val
+        self.log_message(f"Note Off Delay set via OSC to {val} sec")
+
+    def handle_log_level(self, address, *args):
+        """Sets log verbosity via OSC: debug/info/warning/error/off or a numeric level."""
+        if len(args) < 1:
+            return
+        try:
+            level = parse_log_level(args[0])
+        except ValueError:
+            self.log_message("Unknown log level: %s", args[0], level=logging.WARNING)
+            return
+        self.set_log_level(level)
+        # Logged as a warning so the change is recorded at any level short of "off".
+        self.log_message("Log level set via OSC to %s", logging.getLevelName(level), level=logging.WARNING)
+
+    # ---------------- Cue List Handlers ----------------
+    def handle_cue(self, address, *args):
+        """Jumps to a cue by name or number, optionally seconds into it; no argument goes to the next cue."""
+        if not args:
+            self.next_cue()
+            return
+        index = self.cue_player.find(args[0])
+        if index < 0:
+            self.log_message("Unknown cue: %s", args[0], level=logging.WARNING)
+            return
+        try:
+            offset = float(args[1]) if len(args) > 1 else 0.0
+        except (TypeError, ValueError):
+            offset = 0.0
+        self.run_cue(index, offset)
+
+    def handle_cue_go(self, address, *args):
+        self.next_cue()
+
+    def handle_cue_back(self, address, *args):
+        self.run_cue(max(0, self.cue_player.current - 1))
+
+    def handle_cue_stop(self, address, *args):
+        self.stop_cue()
+
+    # ---------------- Deck Handlers ----------------
+    def handle_decks(self, address, *args):
+        """Starts (1) or stops (0) all decks; no argument toggles."""
+        start = not self.deck_mixer.playing if not args else bool(args[0])
+        if start:
+            self.play_decks()
+        else:
+            self.stop_decks()
+
+    def handle_deck_mute(self, address, *args):
+        """Mutes (1) or unmutes (0) deck N; with only N it toggles."""
+        if not args:
+            return
+        try:
+            index = int(args[0]) - 1
+        except (TypeError, ValueError):
+            self.log_message("Invalid deck number: %s", args[0], level=logging.WARNING)
+            return
+        self.set_deck_muted(index, bool(args[1]) if len(args) > 1 else None)
+
+    # ---------------- Static OSC Handlers ----------------
+    def handle_bpm1_toggle(self, address, *args):
+        self.ignore_bpm = not self.ignore_bpm
+        self.log_message(f"'{self.osc_addresses_in.get('bpm1')}' toggled -> ignoring /bpm = {self.ignore_bpm}")
+
+    def handle_resetbpm(self, address, *args):
+        if not self.player.playing:
+            self.log_message("Received /resetbpm but no playback active.")
+            return
+        self.player.user_bpm = max(1, round(self.player.default_bpm))
+        self.smoothed_bpm = float(self.player.user_bpm)
+        self.log_message("BPM reset to default from MIDI file.")
+
+    def handle_pause(self, address, *args):
+        if self.player.playing and not self.player.paused:
+            self.player.pause()
+            self.set_status("Playback paused.")
+            self.log_message("Playback paused (OSC).")
+
+    def handle_play(self, address, *args):
+        if self.player.playing and self.player.paused:
+            self.player.resume()
+            self.set_status("Playback resumed.")
+            self.log_message("Playback resumed (OSC).")
+        elif not self.player.playing:
+            self.play()
+
+    def handle_stop(self, address, *args):
+        self.stop()
+
+    def handle_skip(self, address, *args):
+        if self.player.playing:
+            self.player.skip()
+            self.log_message("Skip requested (OSC).")
+        else:
+            self.log_message("Skip requested but no playback active.")
+
+    def handle_back(self, address, *args):
+        if self.player.playing:
+            self.player.back()
+            self.log_message("Back requested (OSC).")
+        else:
+            self.log_message("Back requested but no playback active.")
+
+    def handle_record(self, address, *args):
+        """1 (or a journal file name, kept in recordings_dir) starts recording, 0 stops it; no argument toggles."""
+        if not args:
+            start = not self.recorder.active
+        else:
+            start = args[0] not in (0, 0.0, False, "0", "off", "stop")
+        if not start:
+            self.stop_recording()
+        elif not self.recorder.active:
+            path = None
+            if args and isinstance(args[0], str) and args[0] not in ("1", "on", "start"):
+                # Anyone on the network can send this, so only a bare name inside recordings_dir.
+                name = args[0]
+                if name.startswith(".") or any(c in name for c in "/\\:\0") or os.path.basename(name) != name:
+                    self.log_message("Ignored /record to %r: only a file name is accepted over OSC.", name,
+                                     level=logging.WARNING)
+                    return
+                path = os.path.join(self.recordings_dir, name)
+            self.start_recording(path)
+
+    def handle_ping(self, address, *args):
+        """Answers the sender with /pong, its arguments and the datagrams received so far (see LoadGenerator)."""
+        return ("/pong", *args, self.osc_dispatcher.received)
+
+    def handle_reload_transforms(self, address, *args):
+        """Reloads the transform file, or loads the one named in the argument."""
+        self.load_transforms(str(args[0]) if args else None)
+
+    def handle_resync(self, address, *args):
+        """A receiver that joined late asks for the current notes and controller state."""
+        self.resync_osc()
+
+    def handle_seek(self, address, *args):
+        """Seeks to a time given in seconds or as "m:ss"."""
+        if not args:
+            return
+        try:
+            self.seek(*self.parse_seek(args[0]))
+        except ValueError:
+            self.log_message("Invalid seek time: %s", args[0], level=logging.WARNING)
+
+    def handle_seek_bar(self, address, *args):
+        if not args:
+            return
+        try:
+            self.seek("bar", max(1.0, float(args[0])))
+        except (TypeError, ValueError):
+            self.log_message("Invalid seek bar: %s", args[0], level=logging.WARNING)
+
+    def handle_bpm(self, address, *args):
+        if self.player.bpm_locked or self.ignore_bpm:
+            self.log_message(f"Received {address} but BPM updates are locked/ignored.")
+            return
+        now = time.perf_counter()
+        if self.tap_follower.feed(now) is not None:
+            self.follow_tempo(self.tap_follower, now)
+            self.log_message("%s -> %.1f BPM", address, self.player.user_bpm)
+
+    def handle_previous(self, *args):
+        self.previous()
+
+    # ---------------- BPM & Tempo ----------------
+    def reset_bpm(self) -> None:
+        self.player.user_bpm = max(1, round(self.player.default_bpm))
+        self.smoothed_bpm = float(self.player.user_bpm)
+        self.log_message(f"Tempo reset to {self.player.user_bpm} BPM")
+
+    def set_bpm_locked(self, locked: bool) -> None:
+        self.player.bpm_locked = locked
+        self.log_message(f"BPM {'locked' if locked else 'unlocked'}.")
+
+    def follow_tempo(self, follower: TempoFollower, t: float) -> None:
+        """Sets the playback tempo from follower, nudged by at most PHASE_PULL to pull the beats into phase."""
+        bpm = follower.bpm
+        if bpm is None or self.player.bpm_locked:
+            return
+        line = self.player.timeline
+        if line is not None:
+            _, anchor_time, anchor_beat, _ = line
+            error = follower.beat_at(t) - (anchor_beat + (t - anchor_time) * self.player.user_bpm / 60.0)
+            error -= round(error)  # nearest beat; bars aren't known from taps or clock
+            bpm *= 1.0 + max(-self.PHASE_PULL, min(self.PHASE_PULL, error * self.PHASE_GAIN))
+        self.player.user_bpm = bpm
+        self.smoothed_bpm = bpm
+
+    def set_follow_midi_clock(self, enabled: bool) -> None:
+        self.follow_midi_clock = enabled
+        self.clock_follower.reset()
+        self.log_message("Following MIDI Clock %s.", "on" if enabled else "off")
+
+    def on_midi_clock(self, msg) -> None:
+        """MIDI Clock and transport from the input (engine loop); playback follows its tempo and beat."""
+        follower = self.clock_follower
+        if msg.type == "clock":
+            t = msg.time or time.perf_counter()
+            if follower.feed(t) is not None and follower.count % follower.pulses_per_beat == 0:
+                self.follow_tempo(follower, t)
+        elif msg.type == "start":
+            follower.set_position(0)
+        elif msg.type == "songpos":
+            follower.set_position(msg.pos / 4.0)
+
+    # ---------------- BPM Sync ----------------
+    def set_sync(self, enabled: bool) -> None:
+        self.sync_enabled = enabled
+        if enabled:
+            if not self.sync_clock.running:
+                self.sync_clock.start()
+                self.log_message("Sync BPM started (%s).", self.sync_clock.division)
+        elif self.sync_clock.running:
+            self.sync_clock.stop()
+            self.log_message("Sync BPM stopped.")
+
+    def set_sync_division(self, division: str) -> None:
+        if division not in SyncClock.DIVISIONS:
+            self.log_message("Unknown sync division: %s", division, level=logging.WARNING)
+            return
+        self.sync_clock.division = division
+        self.log_message("Sync division set to %s.", division)
+
+    def set_late_bundle_policy(self, policy: str) -> None:
+        if policy not in TimedDispatcher.LATE_POLICIES:
+            self.log_message("Unknown late bundle policy: %s", policy, level=logging.WARNING)
+            return
+        self.late_bundle_policy = policy
+        if self.osc_dispatcher:
+            self.osc_dispatcher.late_policy = policy
+        self.log_message("Late OSC bundles will be %s.", "played now" if policy == "play" else "dropped")
+
+    def set_jitter_buffer(self, enabled: bool) -> None:
+        """Switches timetagged bundles between absolute scheduling and per-source jitter buffering."""
+        self.jitter_buffer = enabled
+        if self.osc_dispatcher:
+            self.osc_dispatcher.jitter_buffer = enabled
+        self.log_message("OSC jitter buffer %s.", "on" if enabled else "off")
+
+    def set_midi_clock(self, enabled: bool) -> None:
+        """Turns MIDI Clock, Start/Stop/Continue and Song Position output on the MIDI output on or off."""
+        self.midi_clock_enabled = enabled
+        if enabled:
+            self.midi_clock.start()
+            self.log_message("MIDI Clock output on.")
+        else:
+            self.midi_clock.stop()
+            if self.player.playing:
+                self._write_midi_clock(mido.Message("stop"))
+            self.log_message("MIDI Clock output off.")
+
+    def _emit_midi_clock(self, bpm: int, bar: int, beat: int, sub: int) -> None:
+        self._write_midi_clock(self.MIDI_CLOCK)
+
+    def _emit_midi_transport(self, kind: str, position: int) -> None:
+        if kind == "continue":
+            self._write_midi_clock(mido.Message("songpos", pos=min(position, 16383)))
+        self._write_midi_clock(mido.Message(kind))
+        self.log_message("MIDI Clock %s at sixteenth %d", kind, position, level=logging.DEBUG)
+
+    def _write_midi_clock(self, msg) -> None:
+        """Clock and transport go straight to the port (sender thread) and are never queued while offline.
+
+        Like other MIDI output they go through the feedback guard, so a device
+        echoing them back isn't followed as an external clock.
+        """
+        midi_out = self.midi_out
+        if midi_out:
+            try:
+                self.feedback_guard.record("osc->midi", FeedbackGuard.midi_key(msg))
+                midi_out.send(msg)
+                if self.recorder.active:
+                    self.recorder.record(SessionRecorder.MIDI_OUT, msg.bytes())
+            except Exception as e:
+                self.log_message("MIDI Clock send error: %s", e, level=logging.DEBUG)
+
+    def _emit_sync(self, bpm: int, bar: int, beat: int, sub: int) -> None:
+        """SyncClock tick (sender thread): sync address with bpm, bar, beat and subdivision."""
+        if self.osc_client:
+            address = self.osc_addresses_out.get("sync", "/sync")
+            self.osc_client.send_message(address, [bpm, bar, beat, sub])
+            self.log_message("Sent OSC -> %s %s at BPM %s", address, (bar, beat, sub), bpm, level=logging.DEBUG)
+
+    # ---------------- MIDI Transforms ----------------
+    def load_transforms(self, path: str = None) -> bool:
+        """Loads a transform file, or with no path reloads the current one, and swaps its tables in."""
+        path = path or self.transform_file
+        if not path:
+            self.log_message("No transform file to reload.", level=logging.WARNING)
+            return False
+        try:
+            rules = read_transform_file(path)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            self.alert("Transform File Error", f"{os.path.basename(path)}: {e}")
+            return False
+        # Notes started under the old rules are released through them before the switch.
+        for msg in self.osc_state.release():
+            if self.osc_client:
+                if self.raw_midi:
+                    self.send_raw_midi(msg)
+                else:
+                    self.send_osc(*midi_to_osc(msg))
+        for msg in self.midi_state.release():
+            self._write_midi_out(msg, "note release")
+        self.midi_to_osc_transform = TransformTable(rules["midi_to_osc"]) if rules.get("midi_to_osc") else None
+        self.osc_to_midi_transform = TransformTable(rules["osc_to_midi"]) if rules.get("osc_to_midi") else None
+        self.transform_rules = rules
+        self.transform_file = path
+        self.player.set_transforms(rules.get("midi_to_osc"))
+        directions = [d for d in TRANSFORM_DIRECTIONS if rules.get(d)]
+        self.log_message("Transforms loaded from %s: %s", path, ", ".join(directions) or "none")
+        return True
+
+    # ---------------- Session Recording ----------------
+    def start_recording(self, path: str = None) -> str:
+        """Journals all OSC and MIDI traffic to path (default: a new file in recordings_dir); returns the path."""
+        if not path:
+            path = os.path.join(self.recordings_dir, f"session-{datetime.now():%Y%m%d-%H%M%S}.pwj")
+        try:
+            self.recorder.start(path)
+        except OSError as e:
+            self.alert("Recording Failed", f"{path}: {e}")
+            return ""
+        self.player.set_journal(True)
+        self.log_message("Recording session to %s", path)
+        return path
+
+    def stop_recording(self) -> None:
+        if not self.recorder.active:
+            return
+        self.player.set_journal(False)
+        self.recorder.stop()
+        self.log_message("Recording stopped: %s events in %s", self.recorder.records, self.recorder.path)
+
+    def export_recording(self, path: str, out_path: str) -> int:
+        """Writes the MIDI output of a session journal to a .mid file; returns the events written."""
+        try:
+            count = export_journal_midi(path, out_path, bpm=self.player.user_bpm)
+        except (OSError, ValueError) as e:
+            self.alert("Export Failed", f"{os.path.basename(path)}: {e}")
+            return 0
+        self.log_message("Exported %s MIDI events from %s to %s", count, os.path.basename(path), out_path)
+        return count
+
+    # ---------------- LAN Sync ----------------
+    def set_lan_sync(self, role: str, leader: str = "", port: int = None) -> bool:
+        """Makes this instance a LAN sync "leader" or "follower" (of leader, or whoever answers a broadcast), or "off"."""
+        try:
+            self.lan_sync.start(role, leader.strip(), port or self.lan_port)
+        except ValueError as e:
+            self.log_message(str(e), level=logging.WARNING)
+            return False
+        self.lan_sync_role, self.lan_leader = role, leader.strip()
+        self.lan_port = port or self.lan_port
+        if role == "off":
+            self.log_message("LAN sync off.")
+        return True
+
+    def _lan_state(self):
+        """Leader side: what followers need of the local player (engine loop)."""
+        p = self.player
+        return p.playing, p.paused, p.current_index, p.user_bpm, p.timeline
+
+    def _follow_leader(self, state: LeaderState) -> None:
+        """Follower side: keeps the player on the leader's track, transport and beat (engine loop).
+
+        Small phase errors are pulled in by bending the tempo at most PHASE_PULL,
+        as when following MIDI Clock; larger ones (joining mid-file) seek.
+        """
+        p = self.player
+        if not state.playing:
+            if p.playing:
+                self.stop()
+            return
+        if state.paused:
+            if p.playing and not p.paused:
+                p.pause()
+                self.log_message("Paused by LAN sync leader.")
+            return
+        if state.anchor_time is None:
+            return  # the leader is between files
+        now = time.perf_counter()
+        leader_beat = state.anchor_beat + (now - state.anchor_time) * state.bpm / 60.0
+        if not p.playing:
+            if not 0 <= state.track < len(p.playlist):
+                return
+            p.user_bpm = state.bpm
+            # The leader's beat 0; still ahead when we hear of it early enough to start with it.
+            start_at = now - leader_beat * 60.0 / state.bpm
+            p.play(state.track, start_at if start_at > now else None)
+            self.log_message("Playback started by LAN sync leader (track %d).", state.track + 1)
+            return
+        if p.paused:
+            p.resume()
+        if p.current_index != state.track:
+            if self._lan_track_since is None:
+                self._lan_track_since = now
+            elif now - self._lan_track_since > self.LAN_TRACK_GRACE and 0 <= state.track < len(p.playlist):
+                self._lan_track_since = None
+                p.skip_to(state.track)
+            return
+        self._lan_track_since = None
+        line = p.timeline
+        if line is None:
+            return
+        _, anchor_time, anchor_beat, beats_per_bar = line
+        error = leader_beat - (anchor_beat + (now - anchor_time) * p.user_bpm / 60.0)
+        if abs(error) > self.LAN_SEEK_BEATS:
+            p.seek("bar", leader_beat / beats_per_bar + 1)
+            self.log_message("LAN sync: %.2f beats out; seeking to the leader.", error)
+            return
+        p.user_bpm = state.bpm * (1.0 + max(-self.PHASE_PULL, min(self.PHASE_PULL, error * self.LAN_PHASE_GAIN)))
+
+    # ---------------- Cue Lists ----------------
+    def load_cues(self, path: str) -> bool:
+        try:
+            count = self.cue_player.load_file(path)
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            self.alert("Cue File Error", f"{os.path.basename(path)}: {e}")
+            return False
+        self.cue_file = path
+        self.log_message("Loaded %d cue(s) from %s", count, path)
+        return True
+
+    def run_cue(self, index: int, offset: float = 0.0) -> None:
+        if self.cue_player.trigger(index, offset):
+            cue = self.cue_player.cues[index]
+            self.log_message("Cue %d %s: %d messages over %.3f s", index + 1, cue.name,
+                             len(cue.messages), cue.duration)
+        else:
+            self.log_message("No cue %d to run.", index + 1, level=logging.WARNING)
+
+    def next_cue(self) -> None:
+        self.run_cue(self.cue_player.current + 1)
+
+    def stop_cue(self) -> None:
+        self.cue_player.stop()
+        self.log_message("Cue stopped.")
+
+    # ---------------- Decks ----------------
+    def add_deck(self, path: str, remap: str = "", tempo: str = "lock", loop: bool = True) -> bool:
+        try:
+            deck = self.deck_mixer.add(path, remap, tempo, loop)
+        except (OSError, ValueError, EOFError) as e:
+            self.alert("Deck Error", f"{os.path.basename(path)}: {e}")
+            return False
+        self.log_message("Deck %d: %s (%d events, %s tempo)", deck.id, os.path.basename(path), len(deck.msgs), tempo)
+        return True
+
+    def _deck(self, index: int):
+        decks = self.deck_mixer.decks
+        if 0 <= index < len(decks):
+            return decks[index]
+        self.log_message("No deck %d.", index + 1, level=logging.WARNING)
+        return None
+
+    def remove_deck(self, index: int) -> None:
+        deck = self._deck(index)
+        if deck:
+            self.deck_mixer.remove(deck)
+            self.log_message("Removed deck %s.", os.path.basename(deck.path))
+
+    def play_decks(self, index: int = None) -> None:
+        """Starts every deck, or just deck index, in step with the playlist while it plays."""
+        if index is None:
+            decks = None
+        else:
+            deck = self._deck(index)
+            if not deck:
+                return
+            decks = [deck]
+        if not self.deck_mixer.decks:
+            self.log_message("No decks loaded.")
+            return
+        self.deck_mixer.start(decks)
+        self.log_message("Decks started.")
+
+    def stop_decks(self, index: int = None) -> None:
+        if index is None:
+            self.deck_mixer.stop()
+        else:
+            deck = self._deck(index)
+            if deck:
+                self.deck_mixer.stop([deck])
+        self.log_message("Decks stopped.")
+
+    def set_deck_muted(self, index: int, muted: bool = None) -> None:
+        """Mutes or unmutes a deck (None toggles); a muted deck keeps its place and releases its notes."""
+        deck = self._deck(index)
+        if deck:
+            muted = not deck.muted if muted is None else muted
+            self.deck_mixer.set_muted(deck, muted)
+            self.log_message("Deck %d %s.", deck.id, "muted" if muted else "unmuted")
+
+    def set_deck_remap(self, index: int, text: str) -> bool:
+        deck = self._deck(index)
+        if not deck:
+            return False
+        try:
+            self.deck_mixer.set_remap(deck, text)
+        except ValueError as e:
+            self.alert("Invalid Channel Remap", f"{text}: {e}")
+            return False
+        self.log_message("Deck %d channels: %s", deck.id, text.strip() or "unchanged")
+        return True
+
+    def set_deck_tempo(self, index: int, mode: str) -> None:
+        deck = self._deck(index)
+        if deck:
+            self.deck_mixer.set_tempo(deck, mode)
+            self.log_message("Deck %d tempo: %s", deck.id, mode)
+
+    def _send_cue(self, address: str, args) -> None:
+        """CuePlayer message (sender thread)."""
+        if self.osc_client:
+            self.osc_client.send_message(address, args)
+            self.log_message("Cue OSC -> %s %s", address, args, level=logging.DEBUG)
+
+    # ---------------- MIDI Input ----------------
+    def on_midi_input(self, msg) -> None:
+        """Called on the engine loop for every message from the MIDI input."""
+        if self.recorder.active:
+            self.recorder.record(SessionRecorder.MIDI_IN, msg.bytes())
+        if self.feedback_guard.is_echo("osc->midi", FeedbackGuard.midi_key(msg)):
+            self._report_feedback("osc->midi", f"MIDI {msg.type}")
+            return
+        if msg.type in self.CLOCK_MESSAGES:
+            if self.follow_midi_clock:
+                self.on_midi_clock(msg)
+            return
+        self.handle_midi_message(msg, source="input")
+
+    # ---------------- Connection / Cleanup ----------------
+    def _rings(self):
+        """The buffers between I/O stages; playback's lives in the child in process mode."""
+        rings = [self.engine.midi_in_ring, self.midi_out_writer.ring]
+        if isinstance(self.player, PlaybackEngine):
+            rings.append(self.player.sender.ring)
+        return rings
+
+    def log_ring_stats(self, level: int = logging.INFO) -> None:
+        for ring in self._rings():
+            self.log_message(f"Buffer {ring.describe()}", level=level)
+        if self.osc_dispatcher:
+            self.log_message("OSC %s", self.osc_dispatcher.describe(), level=level)
+
+    def shutdown(self) -> None:
+        """Stops playback, closes MIDI ports and the OSC server, and stops the engine."""
+        self.log_ring_stats(logging.DEBUG)
+        try:
+            self.port_watcher.stop()
+            self.midi_clock.close()
+            if self.midi_clock_enabled and self.player.playing:
+                self._write_midi_clock(mido.Message("stop"))
+            for msg in self.midi_state.release():
+                self._write_midi_out(msg, "note release")
+            self.disconnect_midi_input()
+            self.disconnect_midi_output()
+        except Exception as e:
+            logging.debug(f"Error closing MIDI ports: {e}")
+        finally:
+            self.player.stop()
+            self.player.close()
+            self.sync_clock.close()
+            self.cue_player.close()
+            self.lan_sync.stop()
+            self.deck_mixer.stop()  # the sender stays up to send the decks' note releases
+            if self.osc_dispatcher:
+                self.osc_dispatcher.close()
+            self.alarm_scheduler.stop()
+            if self.engine.serving:
+                self.set_connection_status("red")
+                self.log_message("OSC Server stopped.")
+            self.engine.stop()
+            self.midi_out_writer.stop()
+            self.stop_recording()
+
+    # ---------------- Display OSC Addresses ----------------
+    def display_osc_addresses(self) -> None:
+        self.log_message("------ OSC Addresses ------")
+        self.log_message("Static Incoming:")
+        for k, v in self.osc_addresses_in.items():
+            if not k.endswith("X"):
+                self.log_message(f"  {k}: {v}")
+        self.log_message("Static Outgoing:")
+        for k, v in self.osc_addresses_out.items():
+            self.log_message(f"  {k}: {v}")
+        self.log_message("Dynamic Incoming (Template):")
+        self.log_message("  /noteX         (for note_on messages)")
+        self.log_message("  /noteoffX      (for note_off messages)")
+        self.log_message("  /ccX           (for control change messages)")
+        self.log_message("  /pitchX        (for pitchbend messages)")
+        self.log_message("  /afterX        (for aftertouch messages)")
+        self.log_message("------------------------------")
+
+# ----------------------- OSCMIDIApp Class ---------------------------- #
+class OSCMIDIApp(OSCMIDIBridge):
+    UI_FRAME_MS = 33  # state is redrawn at ~30 Hz
+    LOG_POLL_MS = 100
+    LOG_RING_SIZE = 4096  # unformatted records waiting for the next render
+    LOG_LINES_PER_TICK = 200  # oldest pending lines beyond this are dropped
+    MAX_LOG_MESSAGES = 500  # lines kept in the log widget
+    ALARM_LIST_LIMIT = 1000  # alarms listed in the Alarm Clock panel
+
+    def __init__(self, master: "tk.Tk", config_file: str = None, overrides: dict = None) -> None:
+        self.master = master
+        self.master.title("OSC2MIDI - Live Edition (Dark)")
+        self.setup_theme()
+
+        # Logging: any thread appends raw records, the Tk thread formats
+        # and renders them in batches.
+        self.log_ring = deque(maxlen=self.LOG_RING_SIZE)
+        self.log_seq = itertools.count()
+        self.log_next_seq = 0
+        self.log_dropped = 0
+        self.rendered_state = None
+
+        # UI Visibility Flags
+        self.content_visible = False
+        self.alarm_frame_visible = False
+        self.cc_frame_visible = False
+
+        self.load_icon()
+        super().__init__(config_file, overrides)
+        self.ignore_bpm_var = tk.BooleanVar(value=self.ignore_bpm)
+        self.sync_var = tk.BooleanVar(value=self.sync_enabled)
+        self.setup_ui()
+        self.start()
+        self.update_clock()
+        self.master.after(self.LOG_POLL_MS, self.poll_log_queue)
+        self.render_state()
+        self.master.protocol("WM_DELETE_WINDOW", self.quit_app)
+        self.master.bind("<Map>", self._on_first_map, add="+")
+
+    def _on_first_map(self, event) -> None:
+        if event.widget is self.master:
+            self.master.unbind("<Map>")
+            self.report_startup_time("Window shown")
+
+    # ---------------- Theming ----------------
+    def setup_theme(self) -> None:
+        style = ttk.Style(self.master)
+        style.theme_use("clam")
+        style.configure(".", background="#2B2B2B", foreground="#FFFFFF", bordercolor="#2B2B2B")
+        style.configure("TFrame", background="#2B2B2B")
+        style.configure("TLabel", background="#2B2B2B", foreground="#FFFFFF")
+        style.configure("TButton", background="#3A3A3A", foreground="#FFFFFF")
+        style.map("TButton", background=[("active", "#4D4D4D")], foreground=[("active", "#FFFFFF")])
+        style.configure("TEntry", foreground="#FFFFFF", background="#3A3A3A",
+                        fieldbackground="#3A3A3A", insertcolor="#FFFFFF")
+        style.configure("TCombobox", foreground="#FFFFFF", fieldbackground="#3A3A3A", background="#2B2B2B")
+        self.master.configure(bg="#2B2B2B")
+
+    # ---------------- Icon ----------------
+    def load_icon(self) -> None:
+        try:
+            icon_path = os.path.join(os.path.dirname(__file__), "icon.png")
+            self.master.iconphoto(False, tk.PhotoImage(file=icon_path))
+        except Exception as e:
+            logging.warning(f"Icon load error: {e}")
+
+    # ---------------- UI Setup ----------------
+    def setup_ui(self) -> None:
+        self.master.geometry("500x420")
+
+        # Menu Bar – Static OSC Addresses
+        menu_bar = tk.Menu(self.master, bg="#2B2B2B", fg="#FFFFFF")
+        self.master.config(menu=menu_bar)
+        help_menu = tk.Menu(menu_bar, tearoff=0, bg="#2B2B2B", fg="#FFFFFF")
+        menu_bar.add_cascade(label="Help", menu=help_menu)
+        help_menu.add_command(label="OSC Commands", command=self.show_help)
+        addr_menu = tk.Menu(menu_bar, tearoff=0, bg="#2B2B2B", fg="#FFFFFF")
+        menu_bar.add_cascade(label="Static OSC Addresses", menu=addr_menu)
+        addr_menu.add_command(label="Edit Static OSC Addresses", command=self.open_addresses_editor)
+
+        # Settings Frame
+        settings = ttk.Frame(self.master)
+        settings.pack(padx=10, pady=10, fill=tk.X)
+        ttk.Label(settings, text="IP for OSC In:").grid(row=0, column=0, sticky=tk.W, pady=2)
+        self.ip_entry = ttk.Entry(settings)
+        self.ip_entry.insert(0, self.get_local_ip())
+        self.ip_entry.config(state="readonly")
+        self.ip_entry.grid(row=0, column=1, sticky=tk.EW, pady=2)
+        self.ip_tooltip = Tooltip(self.ip_entry, "Local IP for OSC server.")
+        ttk.Label(settings, text="Port for OSC In:").grid(row=1, column=0, sticky=tk.W, pady=2)
+        self.port_entry = ttk.Entry(settings)
+        self.port_entry.insert(0, getattr(self, "saved_port", "5550"))
+        self.port_entry.grid(row=1, column=1, sticky=tk.EW, pady=2)
+        Tooltip(self.port_entry, "Port where OSC server listens.")
+        ttk.Label(settings, text="MIDI Input:").grid(row=2, column=0, sticky=tk.W, pady=2)
+        self.midi_input_combo = ttk.Combobox(settings, values=self.get_midi_ports())
+        self.midi_input_combo.set(getattr(self, "saved_midi_port", ""))
+        self.midi_input_combo.grid(row=2, column=1, sticky=tk.EW, pady=2)
+        Tooltip(self.midi_input_combo, "Select MIDI input (optional).")
+        ttk.Label(settings, text="MIDI Output:").grid(row=3, column=0, sticky=tk.W, pady=2)
+        self.midi_out_combo = ttk.Combobox(settings, values=self.get_midi_output_ports())
+        self.midi_out_combo.set(getattr(self, "saved_midi_out_port", ""))
+        self.midi_out_combo.grid(row=3, column=1, sticky=tk.EW, pady=2)
+        Tooltip(self.midi_out_combo, "Select MIDI output (optional).")
+        ttk.Label(settings, text="IP for OSC Out:").grid(row=4, column=0, sticky=tk.W, pady=2)
+        self.output_ip_entry = ttk.Entry(settings)
+        self.output_ip_entry.insert(0, self.saved_out_ip)
+        self.initial_out_ip = self.saved_out_ip
+        self.output_ip_entry.grid(row=4, column=1, sticky=tk.EW, pady=2)
+        Tooltip(self.output_ip_entry, "Destination IP for OSC messages.")
+        ttk.Label(settings, text="Port for OSC Out:").grid(row=5, column=0, sticky=tk.W, pady=2)
+        self.output_port_entry = ttk.Entry(settings)
+        self.output_port_entry.insert(0, getattr(self, "saved_out_port", "3330"))
+        self.output_port_entry.grid(row=5, column=1, sticky=tk.EW, pady=2)
+        Tooltip(self.output_port_entry, "Destination port for OSC messages.")
+        settings.columnconfigure(1, weight=1)
+
+        # Server Buttons
+        server_frame = ttk.Frame(self.master)
+        server_frame.pack(pady=5)
+        self.bi_dir_button = ttk.Button(server_frame, text="Bi-Directional Server", command=self.start_bi_dir_server)
+        self.bi_dir_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.bi_dir_button, "Send & Receive MIDI.")
+        self.obs_button = ttk.Button(server_frame, text="OBS Server", command=self.start_obs_server)
+        self.obs_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.obs_button, "Only MIDI --> Patch with OBS support.")
+        self.resync_button = ttk.Button(server_frame, text="Resync", command=self.resync_osc)
+        self.resync_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.resync_button, "Send held notes and controller state to the OSC destination (also /resync).")
+        self.transforms_button = ttk.Button(server_frame, text="Transforms...", command=self.load_transforms_from_ui)
+        self.transforms_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.transforms_button, "Load transpose, channel, velocity, note-range and CC rules (JSON).")
+        self.reload_transforms_button = ttk.Button(server_frame, text="Reload", command=self.load_transforms)
+        self.reload_transforms_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.reload_transforms_button, "Reload the transform file after editing it (also /reloadtransforms).")
+        
+        # Connection Indicator
+        conn_frame = ttk.Frame(self.master)
+        conn_frame.pack(pady=5)
+        self.connection_indicator = tk.Canvas(conn_frame, width=20, height=20, bg="#2B2B2B", highlightthickness=0)
+        self.connection_indicator.pack(side=tk.LEFT, padx=5)
+        self.indicator = self.connection_indicator.create_oval(5, 5, 15, 15, fill="red")
+        ttk.Label(conn_frame, text="Late Bundles:").pack(side=tk.LEFT, padx=5)
+        self.late_bundle_combo = ttk.Combobox(conn_frame, values=list(TimedDispatcher.LATE_POLICIES),
+                                              width=5, state="readonly")
+        self.late_bundle_combo.set(self.late_bundle_policy)
+        self.late_bundle_combo.bind("<<ComboboxSelected>>", self.change_late_bundle_policy)
+        self.late_bundle_combo.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.late_bundle_combo, "Timetagged OSC bundles arriving after their time: play them now, or drop them.")
+        self.jitter_buffer_var = tk.BooleanVar(value=self.jitter_buffer)
+        self.jitter_buffer_checkbox = ttk.Checkbutton(conn_frame, text="Jitter Buffer", variable=self.jitter_buffer_var,
+                                                      command=self.toggle_jitter_buffer)
+        self.jitter_buffer_checkbox.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.jitter_buffer_checkbox, "Delay each sender's timetagged bundles just enough to even out "
+                                             "Wi-Fi jitter; works without synchronised clocks.")
+        self.raw_midi_var = tk.BooleanVar(value=self.raw_midi)
+        self.raw_midi_checkbox = ttk.Checkbutton(conn_frame, text="Raw MIDI", variable=self.raw_midi_var,
+                                                 command=self.toggle_raw_midi)
+        self.raw_midi_checkbox.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.raw_midi_checkbox, "Send every MIDI message, SysEx included, as its raw bytes "
+                                        "('m' or blob) on the midi address instead of /noteX, /ccX...")
+        self.bundle_stats_label = tk.Label(self.master, text="", fg="#AAAAAA", bg="#2B2B2B")
+        self.bundle_stats_label.pack()
+        lan_frame = ttk.Frame(self.master)
+        lan_frame.pack(pady=2)
+        ttk.Label(lan_frame, text="LAN Sync:").pack(side=tk.LEFT, padx=5)
+        self.lan_sync_combo = ttk.Combobox(lan_frame, values=list(LanSync.ROLES), width=8, state="readonly")
+        self.lan_sync_combo.set(self.lan_sync_role)
+        self.lan_sync_combo.bind("<<ComboboxSelected>>", self.change_lan_sync)
+        self.lan_sync_combo.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.lan_sync_combo, "Keep instances on this network in step: one leader, the others followers.")
+        ttk.Label(lan_frame, text="Leader IP:").pack(side=tk.LEFT, padx=5)
+        self.lan_leader_entry = ttk.Entry(lan_frame, width=15)
+        self.lan_leader_entry.insert(0, self.lan_leader)
+        self.lan_leader_entry.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.lan_leader_entry, "Followers only; leave empty to find the leader by broadcast.")
+        self.lan_sync_label = tk.Label(self.master, text="", fg="#AAAAAA", bg="#2B2B2B")
+        self.lan_sync_label.pack()
+        record_frame = ttk.Frame(self.master)
+        record_frame.pack(pady=2)
+        self.record_button = ttk.Button(record_frame, text="Record", command=self.toggle_recording)
+        self.record_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.record_button, "Journal all OSC and MIDI traffic to the recordings folder (also /record).")
+        self.export_button = ttk.Button(record_frame, text="Export .mid...", command=self.export_recording_from_ui)
+        self.export_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.export_button, "Turn a recorded session's MIDI output into a MIDI file for the playlist.")
+        self.recording_label = tk.Label(record_frame, text="", fg="#AAAAAA", bg="#2B2B2B")
+        self.recording_label.pack(side=tk.LEFT, padx=5)
+
+        # Note Off Delay UI
+        note_off_frame = ttk.Frame(self.master)
+        note_off_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        ttk.Label(note_off_frame, text="Note Off Delay:").pack(side=tk.LEFT, padx=5)
+        self.note_off_delay_slider = tk.Scale(
+            note_off_frame, from_=0.0, to=5.0, resolution=0.01,
+            orient=tk.HORIZONTAL, length=120, command=self.update_note_off_delay,
+            bg="#2B2B2B", fg="#FFFFFF", troughcolor="#3A3A3A", activebackground="#4D4D4D"
+        )
+        self.note_off_delay_slider.set(self.note_off_delay)
+        self.note_off_delay_slider.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.note_off_delay_slider, "Time (secs) before auto note_off is sent after a /noteX message.")
+
+        ttk.Label(note_off_frame, text="OSC Address:").pack(side=tk.LEFT, padx=5)
+        self.note_off_delay_address_entry = ttk.Entry(note_off_frame, width=10)
+        # Changed default to "/delay"
+        self.note_off_delay_address_entry.insert(0, self.note_off_delay_address)
+        self.note_off_delay_address_entry.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.note_off_delay_address_entry, "OSC address that sets this delay slider value.")
+
+        # Burger Menus
+        burger = ttk.Frame(self.master)
+        burger.pack(pady=2)
+        self.menu_button = ttk.Button(burger, text="≡ Midi Player/Log", command=self.toggle_midi_menu, width=17)
+        self.menu_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.menu_button, "Toggle MIDI Player/Log UI.")
+        self.alarm_menu_button = ttk.Button(burger, text="≡ Alarm Clock", command=self.toggle_alarm_menu, width=17)
+        self.alarm_menu_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.alarm_menu_button, "Toggle Alarm Clock UI.")
+        self.cc_menu_button = ttk.Button(burger, text="≡ CC", command=self.toggle_cc_menu, width=17)
+        self.cc_menu_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.cc_menu_button, "Toggle CC controls UI.")
+
+        # Content Frames
+        self.content_frame = ttk.Frame(self.master)
+        self.setup_midi_ui()
+        self.alarm_frame = ttk.Frame(self.master)
+        self.setup_alarm_ui()
+        self.cc_frame = ttk.Frame(self.master)
+        self.setup_cc_ui()
+        self.load_bottom_logo()
+
+    def update_note_off_delay(self, val_str):
+        """Callback for the note_off delay slider (UI)."""
+        try:
+            val = float(val_str)
+            if val < 0:
+                val = 0
+            elif val > 5:
+                val = 5
+            self.note_off_delay = val
+            self.log_message(f"Note Off Delay set to {val} sec (via slider)")
+        except ValueError:
+            pass
+
+    def load_bottom_logo(self) -> None:
+        try:
+            path = os.path.join(os.path.dirname(__file__), "bottomlogo.png")
+            orig = tk.PhotoImage(file=path)
+            self.bottom_logo = orig.subsample(2, 2)
+            lbl = tk.Label(self.master, image=self.bottom_logo, bg="#2B2B2B")
+            lbl.pack(side=tk.BOTTOM, pady=5)
+        except Exception as e:
+            logging.debug(f"Bottom logo load error: {e}")
+
+    # ---------------- UI State Rendering ----------------
+    def render_state(self) -> None:
+        """Draws the latest snapshot() on the Tk thread, UI_FRAME_MS apart.
+
+        Engine threads never touch widgets; whatever changed between two frames
+        is coalesced into one update, and unchanged widgets aren't touched.
+        """
+        state = self.snapshot()
+        last = self.rendered_state
+        if last is None or state.status != last.status:
+            self.info_label.config(text=state.status)
+        transport = self.format_transport(state)
+        if transport != self.stats_label.cget("text"):
+            self.stats_label.config(text=transport)
+        if last is None or state.connection != last.connection:
+            self.connection_indicator.itemconfig(self.indicator, fill=state.connection)
+        # Sliders only follow engine-side changes, so a drag in progress isn't fought.
+        if last is None or state.bpm != last.bpm:
+            if self.bpm_slider.get() != round(state.bpm):
+                self.bpm_slider.set(state.bpm)
+        if last is None or state.note_off_delay != last.note_off_delay:
+            if self.note_off_delay_slider.get() != state.note_off_delay:
+                self.note_off_delay_slider.set(state.note_off_delay)
+        if last is None or state.ignore_bpm != last.ignore_bpm:
+            self.ignore_bpm_var.set(state.ignore_bpm)
+        if last is None or state.playlist_version != last.playlist_version:
+            self.update_playlist_box()
+        if last is None or state.alarms_version != last.alarms_version:
+            self.update_alarm_list()
+        if last is None or state.bundles != last.bundles:
+            self.bundle_stats_label.config(text=state.bundles)
+        if last is None or state.lan_sync != last.lan_sync:
+            self.lan_sync_label.config(text=state.lan_sync)
+        if last is None or state.cue != last.cue:
+            self.cue_label.config(text=state.cue)
+        if last is None or state.recording != last.recording:
+            self.recording_label.config(text=state.recording)
+            self.record_button.config(text="Stop Recording" if state.recording else "Record")
+        if last is None or state.decks != last.decks:
+            self.update_deck_box(state.decks)
+        if last is None or state.midi_inputs != last.midi_inputs:
+            self.midi_input_combo.config(values=list(state.midi_inputs))
+        if last is None or state.midi_outputs != last.midi_outputs:
+            self.midi_out_combo.config(values=list(state.midi_outputs))
+        if last is not None and state.local_ips != last.local_ips:
+            self.show_local_ips()
+        self.rendered_state = state
+        self.master.after(self.UI_FRAME_MS, self.render_state)
+
+    @staticmethod
+    def format_transport(state: EngineState) -> str:
+        if state.transport == "stopped":
+            text = f"Stopped - {state.tracks} tracks"
+        else:
+            minutes, seconds = divmod(int(state.position), 60)
+            text = (f"{state.transport.capitalize()} {state.track}/{state.tracks} {state.track_name} "
+                    f"{minutes}:{seconds:02d}")
+        text += f" | {state.bpm:.0f} BPM | {state.events_sent} events"
+        if state.late_events:
+            text += f", {state.late_events} late (max {state.max_late_ms:.1f} ms)"
+        return text
+
+    def show_local_ips(self) -> None:
+        ip = self.get_local_ip()
+        if self.ip_entry.get() != ip:
+            self.ip_entry.config(state="normal")
+            self.ip_entry.delete(0, tk.END)
+            self.ip_entry.insert(0, ip)
+            self.ip_entry.config(state="readonly")
+        if len(self.local_ips) > 1:
+            self.ip_tooltip.text = "Local IPs for OSC server:\n" + "\n".join(f"{n}: {a}" for n, a in self.local_ips)
+        # Follow the scan unless a destination was saved or typed in.
+        if not self.out_ip_configured and self.output_ip_entry.get() == self.initial_out_ip:
+            self.output_ip_entry.delete(0, tk.END)
+            self.output_ip_entry.insert(0, self.saved_out_ip)
+
+    def alert(self, title: str, text: str, level: int = logging.WARNING) -> None:
+        super().alert(title, text, level)
+        if level >= logging.ERROR:
+            messagebox.showerror(title, text)
+        else:
+            messagebox.showwarning(title, text)
+
+    # ---------------- MIDI/Log Frame ----------------
+    def setup_midi_ui(self) -> None:
+        ctrl_frame = ttk.Frame(self.content_frame)
+        ctrl_frame.pack(pady=5)
+        self.play_button = ttk.Button(ctrl_frame, text="Play", command=self.play)
+        self.play_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.play_button, "Start playback.")
+        self.stop_button = ttk.Button(ctrl_frame, text="Stop", command=self.stop)
+        self.stop_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.stop_button, "Stop playback.")
+        self.skip_button = ttk.Button(ctrl_frame, text="Skip", command=self.skip)
+        self.skip_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.skip_button, "Skip to next track.")
+        self.back_button = ttk.Button(ctrl_frame, text="Back", command=self.back)
+        self.back_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.back_button, "Restart current track.")
+        self.previous_button = ttk.Button(ctrl_frame, text="Previous", command=self.previous)
+        self.previous_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.previous_button, "Previous track.")
+
+        seek_frame = ttk.Frame(self.content_frame)
+        seek_frame.pack(pady=5)
+        self.seek_entry = ttk.Entry(seek_frame, width=10)
+        self.seek_entry.insert(0, "0:00")
+        self.seek_entry.bind("<Return>", self.seek_from_ui)
+        self.seek_entry.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.seek_entry, "Position to seek to: m:ss or seconds, or 'bar 17'.")
+        self.seek_button = ttk.Button(seek_frame, text="Seek", command=self.seek_from_ui)
+        self.seek_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.seek_button, "Jump within the current track, with controllers, program and pitch bend restored.")
+
+        file_frame = ttk.Frame(self.content_frame)
+        file_frame.pack(pady=5)
+        self.load_button = ttk.Button(file_frame, text="Load MIDI", command=self.load_file)
+        self.load_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.load_button, "Load a MIDI file.")
+        self.load_folder_button = ttk.Button(file_frame, text="Load Folder", command=self.load_folder)
+        self.load_folder_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.load_folder_button, "Load MIDI files from folder.")
+        self.unload_button = ttk.Button(file_frame, text="Unload Playlist", command=self.unload_playlist)
+        self.unload_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.unload_button, "Clear playlist.")
+
+        playb_frame = ttk.Frame(self.content_frame)
+        playb_frame.pack(pady=5)
+        self.looping_var = tk.BooleanVar(value=self.player.looping)
+        self.looping_checkbutton = ttk.Checkbutton(playb_frame, text="Loop Playlist", variable=self.looping_var, command=self.toggle_looping)
+        self.looping_checkbutton.pack(side=tk.LEFT, padx=5)
+        self.randomize_button = ttk.Button(playb_frame, text="Randomize Playlist", command=self.toggle_randomize_playlist)
+        self.randomize_button.pack(side=tk.LEFT, padx=5)
+        self.sync_checkbutton = ttk.Checkbutton(playb_frame, text="Sync BPM", variable=self.sync_var, command=self.toggle_sync)
+        self.sync_checkbutton.pack(side=tk.LEFT, padx=5)
+        self.sync_division_combo = ttk.Combobox(playb_frame, values=list(SyncClock.DIVISIONS), width=7, state="readonly")
+        self.sync_division_combo.set(self.sync_clock.division)
+        self.sync_division_combo.bind("<<ComboboxSelected>>", self.change_sync_division)
+        self.sync_division_combo.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.sync_division_combo, "Sync tick rate: quarter, eighth or sixteenth notes, or 24 per quarter.")
+        self.midi_clock_var = tk.BooleanVar(value=self.midi_clock_enabled)
+        self.midi_clock_checkbutton = ttk.Checkbutton(playb_frame, text="MIDI Clock", variable=self.midi_clock_var,
+                                                      command=self.toggle_midi_clock)
+        self.midi_clock_checkbutton.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.midi_clock_checkbutton, "Send MIDI Clock, Start/Stop/Continue and Song Position to the MIDI output.")
+        self.process_var = tk.BooleanVar(value=self.use_playback_process)
+        self.process_checkbutton = ttk.Checkbutton(playb_frame, text="Separate Process", variable=self.process_var,
+                                                   command=self.toggle_playback_process)
+        self.process_checkbutton.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.process_checkbutton, "Run playback in its own process so UI load can't affect note timing.")
+        self.info_label = tk.Label(self.content_frame, text="No file loaded", fg="#FFFFFF", bg="#2B2B2B")
+        self.info_label.pack(pady=5)
+        self.stats_label = tk.Label(self.content_frame, text="", fg="#AAAAAA", bg="#2B2B2B")
+        self.stats_label.pack()
+
+        bpm_frame = ttk.Frame(self.content_frame)
+        bpm_frame.pack(pady=5, fill=tk.X)
+        ttk.Label(bpm_frame, text="Tempo (BPM):").pack(side=tk.LEFT)
+        self.bpm_slider = tk.Scale(bpm_frame, from_=20, to=420, orient=tk.HORIZONTAL, command=self.update_bpm,
+                                   bg="#2B2B2B", fg="#FFFFFF", troughcolor="#3A3A3A", activebackground="#4D4D4D")
+        self.bpm_slider.set(self.player.user_bpm)
+        self.bpm_slider.pack(side=tk.LEFT, padx=5)
+        self.reset_bpm_button = ttk.Button(bpm_frame, text="Reset Tempo", command=self.reset_bpm)
+        self.reset_bpm_button.pack(side=tk.LEFT, padx=5)
+        self.lock_bpm_button = ttk.Button(bpm_frame, text="Lock Tempo", command=self.toggle_lock_bpm)
+        self.lock_bpm_button.pack(side=tk.LEFT, padx=5)
+        self.ignore_bpm_checkbox = ttk.Checkbutton(bpm_frame, text="Ignore /bpm", variable=self.ignore_bpm_var, command=self.toggle_ignore_bpm)
+        self.ignore_bpm_checkbox.pack(side=tk.LEFT, padx=5)
+        self.follow_clock_var = tk.BooleanVar(value=self.follow_midi_clock)
+        self.follow_clock_checkbox = ttk.Checkbutton(bpm_frame, text="Follow Clock", variable=self.follow_clock_var,
+                                                     command=self.toggle_follow_clock)
+        self.follow_clock_checkbox.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.follow_clock_checkbox, "Lock playback tempo and beat to MIDI Clock on the MIDI input.")
+
+        log_frame = ttk.Frame(self.content_frame)
+        log_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        tk.Label(self.content_frame, text="Log Messages:", bg="#2B2B2B", fg="#FFFFFF").pack()
+        self.log_text = tk.Text(log_frame, height=8, width=70, state="disabled", bg="#1E1E1E", fg="#FFFFFF", wrap="word")
+        self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        log_scroll = ttk.Scrollbar(log_frame, command=self.log_text.yview)
+        self.log_text.config(yscrollcommand=log_scroll.set)
+        log_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.log_dropped_label = tk.Label(self.content_frame, text="", bg="#2B2B2B", fg="#888888")
+        self.log_dropped_label.pack()
+
+        playlist_frame = ttk.Frame(self.content_frame)
+        playlist_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        tk.Label(self.content_frame, text="Playlist:", bg="#2B2B2B", fg="#FFFFFF").pack()
+        self.playlist_box = tk.Listbox(playlist_frame, selectmode=tk.SINGLE,
+                                       bg="#1E1E1E", fg="#FFFFFF", selectbackground="#3A3A3A", height=10)
+        self.playlist_box.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        play_scroll = ttk.Scrollbar(playlist_frame, command=self.playlist_box.yview)
+        self.playlist_box.config(yscrollcommand=play_scroll.set)
+        play_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Decks: files layered over the playlist, each with its own channels, mute and tempo mode
+        tk.Label(self.content_frame, text="Decks:", bg="#2B2B2B", fg="#FFFFFF").pack()
+        self.deck_box = tk.Listbox(self.content_frame, selectmode=tk.SINGLE, height=3,
+                                   bg="#1E1E1E", fg="#FFFFFF", selectbackground="#3A3A3A")
+        self.deck_box.pack(fill=tk.X, padx=10)
+        deck_frame = ttk.Frame(self.content_frame)
+        deck_frame.pack(pady=5)
+        self.add_deck_button = ttk.Button(deck_frame, text="Add Deck...", command=self.add_deck_from_ui)
+        self.add_deck_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.add_deck_button, "Load a MIDI file as a deck that plays alongside the playlist.")
+        self.remove_deck_button = ttk.Button(deck_frame, text="Remove", command=self.remove_selected_deck)
+        self.remove_deck_button.pack(side=tk.LEFT, padx=5)
+        self.mute_deck_button = ttk.Button(deck_frame, text="Mute", command=self.toggle_selected_deck_mute)
+        self.mute_deck_button.pack(side=tk.LEFT, padx=5)
+        ttk.Label(deck_frame, text="Channels:").pack(side=tk.LEFT)
+        self.deck_remap_entry = ttk.Entry(deck_frame, width=8)
+        self.deck_remap_entry.pack(side=tk.LEFT, padx=5)
+        self.deck_remap_entry.bind("<Return>", lambda e: self.remap_selected_deck())
+        Tooltip(self.deck_remap_entry, "Channel remap for the selected deck: '10' sends everything to 10, "
+                                       "'1:10, 2:11' maps single channels. Press Enter to apply.")
+        self.deck_tempo_combo = ttk.Combobox(deck_frame, values=list(Deck.TEMPO_MODES), width=5, state="readonly")
+        self.deck_tempo_combo.set(Deck.TEMPO_MODES[0])
+        self.deck_tempo_combo.bind("<<ComboboxSelected>>", lambda e: self.change_selected_deck_tempo())
+        self.deck_tempo_combo.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.deck_tempo_combo, "lock: follow the player's tempo and start on its bar; file: the deck's own tempo.")
+        self.play_decks_button = ttk.Button(deck_frame, text="Play Decks", command=self.toggle_decks)
+        self.play_decks_button.pack(side=tk.LEFT, padx=5)
+
+    # ---------------- Alarm Clock UI ----------------
+    def setup_alarm_ui(self) -> None:
+        # Header with centered current date/time
+        header = tk.Label(self.alarm_frame, text="", font=("Helvetica", 14, "bold"), bg="#2B2B2B", fg="#FFFFFF")
+        header.pack(fill=tk.X, pady=5)
+        self.clock_label = header  # update_clock will update this label
+
+        # Alarm controls arranged neatly
+        controls = ttk.Frame(self.alarm_frame)
+        controls.pack(pady=5)
+        ttk.Label(controls, text="Date (YYYY-MM-DD):").grid(row=0, column=0, padx=5, pady=5, sticky=tk.E)
+        self.alarm_date_entry = ttk.Entry(controls, width=12)
+        self.alarm_date_entry.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
+        ttk.Label(controls, text="Time (HH:MM:SS):").grid(row=1, column=0, padx=5, pady=5, sticky=tk.E)
+        self.alarm_time_entry = ttk.Entry(controls, width=10)
+        self.alarm_time_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
+        ttk.Label(controls, text="OSC Address:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.E)
+        self.alarm_address_entry = ttk.Entry(controls, width=20)
+        self.alarm_address_entry.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+        ttk.Label(controls, text="OSC Args (comma separated):").grid(row=3, column=0, padx=5, pady=5, sticky=tk.E)
+        self.alarm_args_entry = ttk.Entry(controls, width=20)
+        self.alarm_args_entry.grid(row=3, column=1, padx=5, pady=5, sticky=tk.W)
+        ttk.Label(controls, text="Repeat (daily / minutes):").grid(row=4, column=0, padx=5, pady=5, sticky=tk.E)
+        self.alarm_repeat_entry = ttk.Entry(controls, width=10)
+        self.alarm_repeat_entry.grid(row=4, column=1, padx=5, pady=5, sticky=tk.W)
+        Tooltip(self.alarm_repeat_entry, "Leave empty for a one-off alarm; 'daily' or a number of minutes repeats it.")
+        self.schedule_alarm_button = ttk.Button(controls, text="Schedule Alarm", command=self.schedule_alarm)
+        self.schedule_alarm_button.grid(row=5, column=0, pady=5)
+        self.import_alarms_button = ttk.Button(controls, text="Import Alarms...", command=self.import_alarms)
+        self.import_alarms_button.grid(row=5, column=1, pady=5)
+        Tooltip(self.import_alarms_button, "Load many alarms from a CSV (when,address,repeat,args...) or JSON file.")
+
+        # Set default values for alarm inputs:
+        now = datetime.now()
+        self.alarm_date_entry.insert(0, now.strftime("%Y-%m-%d"))
+        self.alarm_time_entry.insert(0, (now + timedelta(minutes=2)).strftime("%H:%M:%S"))
+        self.alarm_address_entry.insert(0, "/alarm")
+        self.alarm_args_entry.insert(0, "1")
+
+        # Alarm list label using tk.Label
+        tk.Label(self.alarm_frame, text="Scheduled Alarms:", bg="#2B2B2B", fg="#FFFFFF").pack(pady=5)
+        list_frame = ttk.Frame(self.alarm_frame)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.alarm_listbox = tk.Listbox(list_frame, selectmode=tk.SINGLE,
+                                        bg="#1E1E1E", fg="#FFFFFF", selectbackground="#3A3A3A", height=8)
+        self.alarm_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        al_scroll = ttk.Scrollbar(list_frame, command=self.alarm_listbox.yview)
+        self.alarm_listbox.config(yscrollcommand=al_scroll.set)
+        al_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.alarm_rows = []  # alarm id per listbox row
+        self.remove_alarm_button = ttk.Button(self.alarm_frame, text="Remove Selected Alarm", command=self.remove_selected_alarm)
+        self.remove_alarm_button.pack(pady=5)
+
+        # Cue lists: timed OSC sequences, also driven by /cue, /cuego, /cueback and /cuestop
+        cue_frame = ttk.Frame(self.alarm_frame)
+        cue_frame.pack(pady=5)
+        self.load_cues_button = ttk.Button(cue_frame, text="Load Cues...", command=self.load_cues_from_ui)
+        self.load_cues_button.pack(side=tk.LEFT, padx=5)
+        Tooltip(self.load_cues_button, "Load cue lists: JSON of named message lists, [offset seconds, address, args...].")
+        self.cue_go_button = ttk.Button(cue_frame, text="Go", width=5, command=self.next_cue)
+        self.cue_go_button.pack(side=tk.LEFT, padx=5)
+        self.cue_stop_button = ttk.Button(cue_frame, text="Stop", width=5, command=self.stop_cue)
+        self.cue_stop_button.pack(side=tk.LEFT, padx=5)
+        self.cue_label = tk.Label(self.alarm_frame, text="", bg="#2B2B2B", fg="#FFFFFF")
+        self.cue_label.pack(pady=5)
+
+    # ---------------- CC Controls ----------------
+    def setup_cc_ui(self) -> None:
+        self.cc_sliders = []
+        self.cc_address_entries = []
+        ttk.Label(self.cc_frame, text="CC Controls", foreground="#FFFFFF").pack(pady=5)
+        cc_frame = ttk.Frame(self.cc_frame)
+        cc_frame.pack(padx=10, pady=10, fill=tk.X)
+        for i in range(6):
+            row = ttk.Frame(cc_frame)
+            row.pack(fill=tk.X, pady=3)
+            ttk.Label(row, text=f"CC {i+1}:", width=10).pack(side=tk.LEFT, padx=5)
+            slider = tk.Scale(row, from_=0, to=127, orient=tk.HORIZONTAL, length=150,
+                              bg="#2B2B2B", fg="#FFFFFF", troughcolor="#3A3A3A", activebackground="#4D4D4D",
+                              command=lambda val, idx=i: self.send_cc_message(idx))
+            slider.set(0)
+            slider.pack(side=tk.LEFT, padx=5)
+            self.cc_sliders.append(slider)
+            entry = ttk.Entry(row, width=15)
+            entry.insert(0, f"/cc{i+1}")
+            entry.pack(side=tk.LEFT, padx=5)
+            self.cc_address_entries.append(entry)
+
+    # ---------------- Log Handling ----------------
+    def log_message(self, message: str, *args, level: int = logging.INFO) -> None:
+        super().log_message(message, *args, level=level)
+        if level >= self.log_level:
+            # deque.append is atomic, so this is safe from any thread; a full
+            # ring silently discards its oldest record (seen as a seq gap).
+            self.log_ring.append((next(self.log_seq), message, args))
+
+    @staticmethod
+    def format_log_record(message: str, args: tuple) -> str:
+        if not args:
+            return message
+        try:
+            return message % args
+        except (TypeError, ValueError):
+            return f"{message} {args}"
+
+    def poll_log_queue(self) -> None:
+        """Renders everything logged since the last tick with a single insert."""
+        ring = self.log_ring
+        records = [ring.popleft() for _ in range(len(ring))]
+        if records:
+            dropped = records[0][0] - self.log_next_seq
+            self.log_next_seq = records[-1][0] + 1
+            if len(records) > self.LOG_LINES_PER_TICK:
+                dropped += len(records) - self.LOG_LINES_PER_TICK
+                records = records[-self.LOG_LINES_PER_TICK:]
+            lines = [self.format_log_record(message, args) for _, message, args in records]
+            if dropped:
+                self.log_dropped += dropped
+                lines.insert(0, f"[... {dropped} log lines dropped ...]")
+                self.log_dropped_label.config(text=f"{self.log_dropped} log lines dropped")
+            self.log_text.config(state="normal")
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+            self.log_text.delete("1.0", f"end-{self.MAX_LOG_MESSAGES + 1}l")
+            self.log_text.see(tk.END)
+            self.log_text.config(state="disabled")
+        self.master.after(self.LOG_POLL_MS, self.poll_log_queue)
+
+    def clear_log(self):
+        self.log_ring.clear()
+        self.log_next_seq = next(self.log_seq) + 1
+        self.log_dropped = 0
+        self.log_dropped_label.config(text="")
+        self.log_text.config(state="normal")
+        self.log_text.delete("1.0", tk.END)
+        self.log_text.config(state="disabled")
+
+    # ---------------- Playlist Management ----------------
+    def load_file(self) -> None:
+        path = filedialog.askopenfilename(filetypes=[("MIDI Files", "*.mid *.midi")])
+        if path:
+            self.add_to_playlist([path])
+            self.set_status(f"Loaded: {path}")
+            self.log_message(f"Loaded MIDI file: {path}")
+        else:
+            self.set_status("No file selected.")
+            self.log_message("No file selected.")
+
+    def load_folder(self) -> None:
+        folder = filedialog.askdirectory()
+        if folder:
+            added = self.add_to_playlist([folder])
+            if added:
+                self.set_status(f"Loaded {added} MIDI files.")
+                self.log_message(f"Loaded {added} files from {folder}")
+            else:
+                messagebox.showinfo("No MIDI Files", "No MIDI files found.")
+                self.log_message("No MIDI files found in folder.")
+        else:
+            self.set_status("No folder selected.")
+            self.log_message("No folder selected.")
+
+    def unload_playlist(self) -> None:
+        self.clear_playlist()
+
+    def update_playlist_box(self) -> None:
+        self.playlist_box.delete(0, tk.END)
+        for i, f in enumerate(self.player.playlist, start=1):
+            self.playlist_box.insert(tk.END, f"{i}: {os.path.basename(f)}")
+
+    # ---------------- Playback Controls ----------------
+    def toggle_looping(self) -> None:
+        self.set_looping(self.looping_var.get())
+
+    def toggle_randomize_playlist(self) -> None:
+        self.set_randomize(not self.player.randomize)
+        self.randomize_button.config(text="Restore Order" if self.player.randomize else "Randomize Playlist")
+
+    def toggle_playback_process(self) -> None:
+        self.set_playback_process(self.process_var.get())
+        self.process_var.set(self.use_playback_process)
+
+    def toggle_midi_clock(self) -> None:
+        self.set_midi_clock(self.midi_clock_var.get())
+        self.save_config()
+
+    # ---------------- Alarm Clock ----------------
+    def update_clock(self) -> None:
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.clock_label.config(text=now_str)
+        self.master.after(1000, self.update_clock)
+
+    def update_alarm_list(self) -> None:
+        """Shows the soonest ALARM_LIST_LIMIT alarms; the rest are summarised in one row."""
+        alarms = self.alarm_scheduler.alarms()
+        shown = alarms[:self.ALARM_LIST_LIMIT]
+        self.alarm_rows = [a.id for a in shown]
+        rows = [a.describe() for a in shown]
+        if len(alarms) > len(shown):
+            rows.append(f"... and {len(alarms) - len(shown)} more")
+        self.alarm_listbox.delete(0, tk.END)
+        if rows:
+            self.alarm_listbox.insert(tk.END, *rows)
+
+    def schedule_alarm(self) -> None:
+        d_str = self.alarm_date_entry.get().strip()
+        t_str = self.alarm_time_entry.get().strip()
+        addr = self.alarm_address_entry.get().strip()
+        arg_str = self.alarm_args_entry.get().strip()
+        if not d_str or not t_str or not addr:
+            messagebox.showwarning("Incomplete Data", "Enter Date, Time, and OSC Address.")
+            return
+        try:
+            dt = datetime.strptime(f"{d_str} {t_str}", "%Y-%m-%d %H:%M:%S")
+            every = Alarm.parse_repeat(self.alarm_repeat_entry.get())
+        except ValueError:
+            messagebox.showwarning("Invalid Date/Time", "Use YYYY-MM-DD and HH:MM:SS (24-hour), "
+                                   "and 'daily' or a number of minutes to repeat.")
+            return
+        if dt <= datetime.now() and not every:
+            messagebox.showwarning("Invalid Time", "Alarm time must be in the future.")
+            return
+        # Split the argument string on commas and trim whitespace
+        args = [a.strip() for a in arg_str.split(",")] if arg_str else []
+        alarm = self.alarm_scheduler.add(dt, addr, args, every)
+        self.log_message(f"Scheduled alarm at {alarm.when} for {addr} with args {args}{alarm.describe_repeat()}")
+        # Reset the fields to defaults.
+        now = datetime.now()
+        self.alarm_date_entry.delete(0, tk.END)
+        self.alarm_date_entry.insert(0, now.strftime("%Y-%m-%d"))
+        self.alarm_time_entry.delete(0, tk.END)
+        self.alarm_time_entry.insert(0, (now + timedelta(minutes=2)).strftime("%H:%M:%S"))
+        self.alarm_address_entry.delete(0, tk.END)
+        self.alarm_address_entry.insert(0, "/alarm")
+        self.alarm_args_entry.delete(0, tk.END)
+        self.alarm_args_entry.insert(0, "1")
+        self.alarm_repeat_entry.delete(0, tk.END)
+
+    def import_alarms(self) -> None:
+        path = filedialog.askopenfilename(filetypes=[("Alarm Lists", "*.csv *.json"), ("All Files", "*.*")])
+        if not path:
+            return
+        try:
+            self.schedule_alarms(path)
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            self.alert("Alarm Import Failed", f"{os.path.basename(path)}: {e}")
+
+    def load_transforms_from_ui(self) -> None:
+        path = filedialog.askopenfilename(filetypes=[("Transform Rules", "*.json"), ("All Files", "*.*")])
+        if path and self.load_transforms(path):
+            self.save_config()
+
+    def toggle_recording(self) -> None:
+        if self.recorder.active:
+            self.stop_recording()
+        else:
+            self.start_recording()
+
+    def export_recording_from_ui(self) -> None:
+        path = filedialog.askopenfilename(initialdir=self.recordings_dir,
+                                          filetypes=[("Session Journals", "*.pwj"), ("All Files", "*.*")])
+        if not path:
+            return
+        out_path = filedialog.asksaveasfilename(defaultextension=".mid", filetypes=[("MIDI Files", "*.mid")],
+                                                initialfile=os.path.splitext(os.path.basename(path))[0] + ".mid")
+        if out_path and self.export_recording(path, out_path):
+            if messagebox.askyesno("Export Complete", "Add the exported file to the playlist?"):
+                self.add_to_playlist([out_path])
+
+    def load_cues_from_ui(self) -> None:
+        path = filedialog.askopenfilename(filetypes=[("Cue Lists", "*.json"), ("All Files", "*.*")])
+        if path and self.load_cues(path):
+            self.save_config()
+
+    def add_deck_from_ui(self) -> None:
+        path = filedialog.askopenfilename(filetypes=[("MIDI Files", "*.mid *.midi"), ("All Files", "*.*")])
+        if path:
+            self.add_deck(path, self.deck_remap_entry.get(), self.deck_tempo_combo.get())
+
+    def selected_deck(self):
+        sel = self.deck_box.curselection()
+        if not sel:
+            messagebox.showwarning("No Selection", "Select a deck first.")
+            return None
+        return sel[0]
+
+    def remove_selected_deck(self) -> None:
+        index = self.selected_deck()
+        if index is not None:
+            self.remove_deck(index)
+
+    def toggle_selected_deck_mute(self) -> None:
+        index = self.selected_deck()
+        if index is not None:
+            self.set_deck_muted(index)
+
+    def remap_selected_deck(self) -> None:
+        index = self.selected_deck()
+        if index is not None:
+            self.set_deck_remap(index, self.deck_remap_entry.get())
+
+    def change_selected_deck_tempo(self) -> None:
+        sel = self.deck_box.curselection()
+        if sel:
+            self.set_deck_tempo(sel[0], self.deck_tempo_combo.get())
+
+    def toggle_decks(self) -> None:
+        if self.deck_mixer.playing:
+            self.stop_decks()
+        else:
+            self.play_decks()
+
+    def update_deck_box(self, rows) -> None:
+        sel = self.deck_box.curselection()
+        self.deck_box.delete(0, tk.END)
+        for row in rows:
+            self.deck_box.insert(tk.END, row)
+        if sel and sel[0] < len(rows):
+            self.deck_box.selection_set(sel[0])
+        self.play_decks_button.config(text="Stop Decks" if self.deck_mixer.playing else "Play Decks")
+
+    def remove_selected_alarm(self) -> None:
+        sel = self.alarm_listbox.curselection()
+        if not sel or sel[0] >= len(self.alarm_rows):
+            messagebox.showwarning("No Selection", "Select an alarm to remove.")
+            return
+        rem = self.alarm_scheduler.remove(self.alarm_rows[sel[0]])
+        if rem:
+            self.log_message(f"Removed alarm: {rem.describe()}")
+
+    # ---------------- OBS and Bi-Directional Server Functions ----------------
+    def start_bi_dir_server(self) -> None:
+        if self.bi_dir_button["text"] == "Bi-Directional Server":
+            self.start_server_from_ui("bidirectional")
+        else:
+            self.quit_app()
+
+    def start_obs_server(self) -> None:
+        if self.obs_button["text"] == "OBS Server":
+            self.start_server_from_ui("obs")
+        else:
+            self.quit_app()
+
+    def start_server_from_ui(self, mode: str) -> None:
+        try:
+            osc_out_port = int(self.output_port_entry.get())
+            osc_in_port = int(self.port_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Invalid port number.")
+            return
+        self.note_off_delay_address = self.note_off_delay_address_entry.get().strip() or "/delay"
+        started = self.start_server(mode, osc_in_port, self.output_ip_entry.get(), osc_out_port,
+                                    self.midi_input_combo.get(), self.midi_out_combo.get())
+        self.save_config()
+        if started:
+            self.bi_dir_button.config(text="Stop and Close")
+            self.obs_button.config(text="Stop and Close")
+
+    # ---------------- CC Controls ----------------
+    def send_cc_message(self, idx: int) -> None:
+        addr = self.cc_address_entries[idx].get().strip()
+        val = self.cc_sliders[idx].get()
+        if not addr.startswith("/"):
+            messagebox.showerror("Invalid OSC Address", f"OSC address for CC {idx+1} must start with '/'.")
+            return
+        if self.osc_client:
+            try:
+                self.osc_client.send_message(addr, val)
+                self.log_message("Sent OSC -> %s with value %s", addr, val, level=logging.DEBUG)
+            except Exception as e:
+                self.log_message(f"Error sending OSC to {addr}: {e}", level=logging.ERROR)
+        else:
+            self.log_message("OSC Client not connected; CC not sent.", level=logging.ERROR)
+
+    # ---------------- BPM & Tempo ----------------
+    def update_bpm(self, new_bpm_str) -> None:
+        if self.player.bpm_locked:
+            return
+        try:
+            new_bpm = float(new_bpm_str)
+            if round(new_bpm) == round(self.player.user_bpm):
+                return  # the slider following the engine (e.g. a followed tempo), not a user change
+            self.smoothed_bpm = (self.alpha*new_bpm)+((1-self.alpha)*self.smoothed_bpm)
+            final_bpm = max(1, round(self.smoothed_bpm))
+            self.player.user_bpm = final_bpm
+            self.bpm_slider.set(final_bpm)
+            self.log_message(f"User BPM set to {final_bpm}")
+        except ValueError:
+            pass
+
+    def toggle_lock_bpm(self) -> None:
+        self.set_bpm_locked(not self.player.bpm_locked)
+        if self.player.bpm_locked:
+            self.bpm_slider.config(state="disabled")
+            self.lock_bpm_button.config(text="Unlock Tempo")
+        else:
+            self.bpm_slider.config(state="normal")
+            self.lock_bpm_button.config(text="Lock Tempo")
+
+    def toggle_follow_clock(self) -> None:
+        self.set_follow_midi_clock(self.follow_clock_var.get())
+        self.save_config()
+
+    def toggle_ignore_bpm(self) -> None:
+        self.ignore_bpm = self.ignore_bpm_var.get()
+        if self.ignore_bpm:
+            self.log_message("Ignoring incoming /bpm messages.")
+        else:
+            self.log_message("Processing incoming /bpm messages.")
+
+    # ---------------- BPM Sync ----------------
+    def toggle_sync(self) -> None:
+        self.set_sync(self.sync_var.get())
+
+    def seek_from_ui(self, event=None) -> None:
+        try:
+            self.seek(*self.parse_seek(self.seek_entry.get()))
+        except ValueError:
+            messagebox.showwarning("Invalid Position", "Use m:ss, seconds, or 'bar 17'.")
+
+    def toggle_jitter_buffer(self) -> None:
+        self.set_jitter_buffer(self.jitter_buffer_var.get())
+        self.save_config()
+
+    def toggle_raw_midi(self) -> None:
+        self.set_raw_midi(self.raw_midi_var.get())
+        self.save_config()
+
+    def change_lan_sync(self, event=None) -> None:
+        if self.set_lan_sync(self.lan_sync_combo.get(), self.lan_leader_entry.get()):
+            self.save_config()
+
+    def change_late_bundle_policy(self, event=None) -> None:
+        self.set_late_bundle_policy(self.late_bundle_combo.get())
+        self.save_config()
+
+    def change_sync_division(self, event=None) -> None:
+        self.set_sync_division(self.sync_division_combo.get())
+        self.save_config()
+
+    # ---------------- Addresses Editor ----------------
+    def open_addresses_editor(self) -> None:
+        # Create a new Toplevel window.
+        editor = tk.Toplevel(self.master)
+        editor.title("Edit OSC Addresses")
+        editor.geometry("600x400")
+        editor.resizable(True, True)
+        # Create a canvas with vertical scrollbar.
+        canvas = tk.Canvas(editor, bg="#2B2B2B")
+        scrollbar = ttk.Scrollbar(editor, orient="vertical", command=canvas.yview)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        canvas.pack(side="left", fill="both", expand=True)
+        # Create a frame inside the canvas.
+        frame = ttk.Frame(canvas)
+        frame.bind(
+            "<Configure>",
+            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        )
+        canvas.create_window((0, 0), window=frame, anchor="nw")
+        # At the very top-right, create a frame for Save and Reset buttons (stacked vertically).
+        top_btn_frame = ttk.Frame(frame)
+        top_btn_frame.grid(row=0, column=1, sticky="ne", padx=5, pady=5)
+        ttk.Button(top_btn_frame, text="Save Edit",
+                   command=lambda: self.save_addresses(editor, static_in_entries, static_out_entries, dynamic_entries)
+                   ).pack(pady=(0,5))
+        ttk.Button(top_btn_frame, text="Reset to Default",
+                   command=lambda: self.reset_addresses(static_in_entries, static_out_entries, dynamic_entries)
+                   ).pack()
+        # Now create the Notebook for the address fields.
+        nb = ttk.Notebook(frame)
+        nb.grid(row=1, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
+        static_in_frame = ttk.Frame(nb)
+        nb.add(static_in_frame, text="Static Incoming")
+        static_out_frame = ttk.Frame(nb)
+        nb.add(static_out_frame, text="Static Outgoing")
+        dynamic_frame = ttk.Frame(nb)
+        nb.add(dynamic_frame, text="Dynamic (Template)")
+
+        static_in_entries = {}
+        static_out_entries = {}
+        dynamic_templates = {
+            "Note": self.osc_addresses_in.get("noteX", "/noteX"),
+            "NoteOff": self.osc_addresses_in.get("noteoffX", "/noteoffX"),
+            "CC": self.osc_addresses_in.get("ccX", "/ccX"),
+            "Pitch": self.osc_addresses_in.get("pitchX", "/pitchX"),
+            "Aftertouch": self.osc_addresses_in.get("afterX", "/afterX")
+        }
+        dynamic_entries = {}
+
+        # For static_in, exclude the ones ending with X.
+        def create_fields(frm, data, entries):
+            for idx, (key, addr) in enumerate(data.items()):
+                ttk.Label(frm, text=f"{key}:").grid(row=idx, column=0, sticky=tk.W, padx=5, pady=5)
+                ent = ttk.Entry(frm, width=30)
+                ent.grid(row=idx, column=1, sticky=tk.W, padx=5, pady=5)
+                ent.insert(0, addr)
+                entries[key] = ent
+
+        # Filter out dynamic (X) from static_in
+        static_in = {k: v for k, v in self.osc_addresses_in.items()
+                     if not k.endswith("X") and k not in ["afterX", "pitchX"]}
+        create_fields(static_in_frame, static_in, static_in_entries)
+
+        # For static_out, we only have "sync"
+        create_fields(static_out_frame, self.osc_addresses_out, static_out_entries)
+
+        # Dynamic
+        create_fields(dynamic_frame, dynamic_templates, dynamic_entries)
+
+    def save_addresses(self, window, static_in, static_out, dynamic):
+        for k, ent in static_in.items():
+            addr = ent.get().strip()
+            if not addr.startswith("/"):
+                messagebox.showerror("Invalid Address", f"Address for {k} must start with '/'.")
+                return
+            self.osc_addresses_in[k] = addr
+        for k, ent in static_out.items():
+            addr = ent.get().strip()
+            if not addr.startswith("/"):
+                messagebox.showerror("Invalid Address", f"Address for {k} must start with '/'.")
+                return
+            self.osc_addresses_out[k] = addr
+        for k, ent in dynamic.items():
+            addr = ent.get().strip()
+            if not addr.startswith("/"):
+                messagebox.showerror("Invalid Address", f"Dynamic address for {k} must start with '/'.")
+                return
+            if k.lower() == "note":
+                self.osc_addresses_in["noteX"] = addr
+            elif k.lower() == "noteoff":
+                self.osc_addresses_in["noteoffX"] = addr
+            elif k.lower() == "cc":
+                self.osc_addresses_in["ccX"] = addr
+            elif k.lower() == "pitch":
+                self.osc_addresses_in["pitchX"] = addr
+            elif k.lower() == "aftertouch":
+                self.osc_addresses_in["afterX"] = addr
+        self.save_config()
+        self.log_message("OSC Addresses updated and saved.")
+        messagebox.showinfo("Success", "OSC Addresses updated.")
+        window.destroy()
+
+    def reset_addresses(self, static_in, static_out, dynamic):
+        for k, ent in static_in.items():
+            default = self.default_osc_addresses_in.get(k, "")
+            ent.delete(0, tk.END)
+            ent.insert(0, default)
+            self.osc_addresses_in[k] = default
+
+        for k, ent in static_out.items():
+            default = self.default_osc_addresses_out.get(k, "")
+            ent.delete(0, tk.END)
+            ent.insert(0, default)
+            self.osc_addresses_out[k] = default
+
+        defaults = {
+            "Note": "/noteX",
+            "NoteOff": "/noteoffX",
+            "CC": "/ccX",
+            "Pitch": "/pitchX",
+            "Aftertouch": "/afterX"
+        }
+        for k, ent in dynamic.items():
+            default = defaults.get(k, "")
+            ent.delete(0, tk.END)
+            ent.insert(0, default)
+            if k.lower() == "note":
+                self.osc_addresses_in["noteX"] = default
+            elif k.lower() == "noteoff":
+                self.osc_addresses_in["noteoffX"] = default
+            elif k.lower() == "cc":
+                self.osc_addresses_in["ccX"] = default
+            elif k.lower() == "pitch":
+                self.osc_addresses_in["pitchX"] = default
+            elif k.lower() == "aftertouch":
+                self.osc_addresses_in["afterX"] = default
+
+        self.save_config()
+        self.log_message("OSC Addresses reset to default.")
+        messagebox.showinfo("Reset", "OSC Addresses reset to default.")
+
+    # ---------------- Show Help ----------------
+    def show_help(self) -> None:
+        help_win = tk.Toplevel(self.master)
+        help_win.title("Help - OSC Commands")
+        help_win.geometry("500x700")
+        help_win.resizable(False, False)
+        help_win.transient(self.master)
+        help_win.grab_set()
+        text = tk.Text(help_win, wrap="word", bg="#2B2B2B", fg="#FFFFFF", font=("Courier", 10))
+        text.pack(expand=True, fill="both", padx=10, pady=10)
+        help_text = f"""
+------ OSC Addresses (Incoming) ------
+Static (editable):
+  pause: {self.osc_addresses_in.get("pause", "/pause")}
+  play: {self.osc_addresses_in.get("play", "/play")}
+  stop: {self.osc_addresses_in.get("stop", "/stop")}
+  skip: {self.osc_addresses_in.get("skip", "/skip")}
+  back: {self.osc_addresses_in.get("back", "/back")}
+  previous: {self.osc_addresses_in.get("previous", "/previous")}
+  bpm: {self.osc_addresses_in.get("bpm", "/bpm")}
+  bpm1: {self.osc_addresses_in.get("bpm1", "/bpm1")}
+  resetbpm: {self.osc_addresses_in.get("resetbpm", "/resetbpm")}
+  generic: {self.osc_addresses_in.get("generic", "/generic")}
+
+Dynamic Incoming (Template):
+  /noteX         (for note_on messages)
+  /noteoffX      (for note_off messages)
+  /ccX           (for control change messages)
+  /pitchX        (for pitchbend messages)
+  /afterX        (for aftertouch messages)
+
+------ OSC Addresses (Outgoing) ------
+Static (editable):
+  sync: {self.osc_addresses_out.get("sync", "/sync")}  (bpm, bar, beat, subdivision)
+  midi: {self.osc_addresses_out.get("midi", "/midi")}  (raw MIDI bytes, with Raw MIDI on)
+
+Dynamic Outgoing (automatic by channel):
+  note_on  --> /noteX
+  note_off --> /noteoffX
+  cc       --> /ccX
+  pitchwheel --> /pitchX
+  aftertouch --> /afterX
+
+Example OSC Commands:
+  /note5 60 0.8         --> MIDI note_on on channel 5, velocity ~102, auto note_off after slider delay.
+  /noteoff5 60 0        --> MIDI note_off on channel 5.
+  /cc3 10 0.5           --> MIDI control_change on channel 3, cc=10, value=~63.
+  /pitch2 4096          --> MIDI pitchbend on channel 2.
+  /after2 64            --> MIDI aftertouch on channel 2.
+  /generic "note_on" 60 0.8  --> Converts OSC to MIDI note_on (default channel).
+  /delay 1.2            --> Sets the Note Off Delay to 1.2s via OSC.
+"""
+        text.insert("1.0", help_text)
+        text.config(state="disabled")
+
+    # ---------------- UI Toggles ----------------
+    def toggle_midi_menu(self) -> None:
+        if self.alarm_frame_visible:
+            self.alarm_frame.pack_forget()
+            self.alarm_frame_visible = False
+            self.alarm_menu_button.config(text="≡ Alarm Clock")
+        if self.cc_frame_visible:
+            self.cc_frame.pack_forget()
+            self.cc_frame_visible = False
+            self.cc_menu_button.config(text="≡ CC")
+        if self.content_visible:
+            self.content_frame.pack_forget()
+            self.content_visible = False
+            self.menu_button.config(text="≡ Midi Player/Log")
+            self.log_message("MIDI Player/Log UI hidden.")
+        else:
+            self.content_frame.pack(fill=tk.BOTH, expand=True)
+            self.content_visible = True
+            self.menu_button.config(text="≡ Hide Midi Player/Log")
+            self.log_message("MIDI Player/Log UI shown.")
+        self.master.update_idletasks()
+        self.master.geometry("")
+
+    def toggle_alarm_menu(self) -> None:
+        if self.content_visible:
+            self.content_frame.pack_forget()
+            self.content_visible = False
+            self.menu_button.config(text="≡ Midi Player/Log")
+        if self.cc_frame_visible:
+            self.cc_frame.pack_forget()
+            self.cc_frame_visible = False
+            self.cc_menu_button.config(text="≡ CC")
+        if self.alarm_frame_visible:
+            self.alarm_frame.pack_forget()
+            self.alarm_frame_visible = False
+            self.alarm_menu_button.config(text="≡ Alarm Clock")
+            self.log_message("Alarm Clock UI hidden.")
+        else:
+            self.alarm_frame.pack(fill=tk.BOTH, expand=True)
+            self.alarm_frame_visible = True
+            self.alarm_menu_button.config(text="≡ Hide Alarm Clock")
+            self.log_message("Alarm Clock UI shown.")
+        self.master.update_idletasks()
+        self.master.geometry("")
+
+    def toggle_cc_menu(self) -> None:
+        if self.content_visible:
+            self.content_frame.pack_forget()
+            self.content_visible = False
+            self.menu_button.config(text="≡ Midi Player/Log")
+        if self.alarm_frame_visible:
+            self.alarm_frame.pack_forget()
+            self.alarm_frame_visible = False
+            self.alarm_menu_button.config(text="≡ Alarm Clock")
+        if self.cc_frame_visible:
+            self.cc_frame.pack_forget()
+            self.cc_frame_visible = False
+            self.cc_menu_button.config(text="≡ CC")
+            self.log_message("CC UI hidden.")
+        else:
+            self.cc_frame.pack(fill=tk.BOTH, expand=True)
+            self.cc_frame_visible = True
+            self.cc_menu_button.config(text="≡ Hide CC")
+            self.log_message("CC UI shown.")
+        self.master.update_idletasks()
+        self.master.geometry("")
+
+    # ---------------- Connection / Cleanup ----------------
+    def quit_app(self) -> None:
+        self.shutdown()
+        self.master.quit()
+
+# ---------------- Command Line ----------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Patchworld OSC <-> MIDI bridge and MIDI player.")
+    parser.add_argument("--headless", action="store_true", help="run the bridge without the Tk window")
+    parser.add_argument("--config", default=OSCMIDIBridge.CONFIG_FILE, help="config file (default: config.json)")
+    parser.add_argument("--mode", choices=["bidirectional", "obs"], default="bidirectional",
+                        help="server started in headless mode")
+    parser.add_argument("--osc-in-port", type=int, help="port the OSC server listens on")
+    parser.add_argument("--osc-out-ip", help="destination IP for OSC messages")
+    parser.add_argument("--osc-out-port", type=int, help="destination port for OSC messages")
+    parser.add_argument("--midi-in", help="MIDI input port name")
+    parser.add_argument("--midi-out", help="MIDI output port name")
+    parser.add_argument("--playback-process", action=argparse.BooleanOptionalAction, default=None,
+                        help="play MIDI files in a separate process")
+    parser.add_argument("--midi-clock", action=argparse.BooleanOptionalAction, default=None,
+                        help="send MIDI Clock and transport messages to the MIDI output during playback")
+    parser.add_argument("--follow-clock", action=argparse.BooleanOptionalAction, default=None,
+                        help="lock playback tempo to MIDI Clock on the MIDI input")
+    parser.add_argument("--playlist", nargs="+", metavar="PATH", help="MIDI files or folders to load")
+    parser.add_argument("--loop", action=argparse.BooleanOptionalAction, default=None, help="loop the playlist")
+    parser.add_argument("--shuffle", action="store_true", help="randomize the playlist")
+    parser.add_argument("--play", action="store_true", help="start playback once loaded")
+    parser.add_argument("--late-bundles", choices=TimedDispatcher.LATE_POLICIES,
+                        help="OSC bundles whose timetag has passed: play them now or drop them (default: play)")
+    parser.add_argument("--jitter-buffer", action=argparse.BooleanOptionalAction, default=None,
+                        help="even out network jitter per sender using bundle timetags as relative times")
+    parser.add_argument("--deck", action="append", nargs="+", metavar="FILE [CHANNELS] [lock|file]",
+                        help="layer a MIDI file as a deck, optionally remapped ('10' or '1:10,2:11') and "
+                             "with its own tempo ('file'); repeat for more decks, started with --play")
+    parser.add_argument("--lan-sync", choices=LanSync.ROLES,
+                        help="keep several instances in step on the LAN: one leader, any number of followers")
+    parser.add_argument("--lan-leader", metavar="HOST", help="leader address for a follower (default: found by broadcast)")
+    parser.add_argument("--lan-port", type=int, help=f"UDP port of the LAN sync leader (default: {LanSync.PORT})")
+    parser.add_argument("--transforms", metavar="FILE",
+                        help="transform rules (JSON) for MIDI->OSC and OSC->MIDI; reload with /reloadtransforms")
+    parser.add_argument("--raw-midi", action=argparse.BooleanOptionalAction, default=None,
+                        help="send MIDI as raw bytes on /midi ('m' or blob arguments), SysEx included")
+    parser.add_argument("--record", nargs="?", const="", metavar="JOURNAL",
+                        help="record all OSC and MIDI traffic from the start (default: a new file in recordings/)")
+    parser.add_argument("--export-mid", nargs=2, metavar=("JOURNAL", "MIDFILE"),
+                        help="write the MIDI output of a recorded session to a MIDI file and exit")
+    parser.add_argument("--replay", metavar="JOURNAL",
+                        help="replay a recorded session's incoming OSC against a running bridge, report and exit")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed, e.g. 2 for twice as fast (default: 1)")
+    parser.add_argument("--replay-midi", metavar="PORT", help="also replay the session's incoming MIDI to this port")
+    parser.add_argument("--flood", type=float, metavar="RATE",
+                        help="send RATE synthetic OSC messages per second to a running bridge, report and exit")
+    parser.add_argument("--flood-duration", type=float, default=10.0, metavar="SECONDS",
+                        help="length of the flood (default: 10)")
+    parser.add_argument("--flood-mix", default="note=6,cc=3,generic=1",
+                        help="weighted address mix of /noteN, /ccN and /generic (default: note=6,cc=3,generic=1)")
+    parser.add_argument("--flood-channels", type=int, default=16, choices=range(1, 17), metavar="1-16",
+                        help="channels N the flood spreads over (default: 16)")
+    parser.add_argument("--target-host", default="127.0.0.1",
+                        help="bridge for --replay and --flood (default: 127.0.0.1, port from --osc-in-port or config)")
+    parser.add_argument("--cues", metavar="FILE", help="cue lists to load (JSON); run them with /cue, /cuego, /cuestop")
+    parser.add_argument("--alarms", metavar="FILE",
+                        help="import alarms from a CSV (when,address,repeat,args...) or JSON file")
+    parser.add_argument("--log-level", type=parse_log_level,
+                        help="debug, info, warning, error or off (default: info); also settable via /loglevel")
+    parser.add_argument("--log-file", default="patchworld.log",
+                        help="size-rotated text log (default: patchworld.log); '' disables it")
+    parser.add_argument("--log-json", metavar="PATH", help="also write a rotated JSON-lines log to PATH")
+    return parser.parse_args(argv)
+
+
+def config_overrides(args) -> dict:
+    """Maps command-line flags onto config.json keys; unset flags leave the config alone."""
+    flags = {
+        "osc_in_port": args.osc_in_port,
+        "osc_out_ip": args.osc_out_ip,
+        "osc_out_port": args.osc_out_port,
+        "midi_input_port": args.midi_in,
+        "midi_output_port": args.midi_out,
+        "playback_process": args.playback_process,
+        "midi_clock": args.midi_clock,
+        "follow_midi_clock": args.follow_clock,
+        "cue_file": args.cues,
+        "transform_file": args.transforms,
+        "raw_midi": args.raw_midi,
+        "late_bundle_policy": args.late_bundles,
+        "jitter_buffer": args.jitter_buffer,
+        "lan_sync": args.lan_sync,
+        "lan_leader": args.lan_leader,
+        "lan_port": args.lan_port,
+        "log_level": args.log_level,
+    }
+    return {k: v for k, v in flags.items() if v is not None}
+
+
+def apply_playlist_args(bridge: OSCMIDIBridge, args) -> None:
+    if args.record is not None:
+        bridge.start_recording(args.record)
+    if args.alarms:
+        try:
+            bridge.schedule_alarms(args.alarms)
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            bridge.alert("Alarm Import Failed", f"{args.alarms}: {e}")
+    if args.playlist:
+        added = bridge.add_to_playlist(args.playlist)
+        bridge.log_message(f"Loaded {added} MIDI files from the command line.")
+    if args.loop is not None:
+        bridge.set_looping(args.loop)
+    if args.shuffle:
+        bridge.set_randomize(True)
+    for deck in args.deck or []:
+        remap = deck[1] if len(deck) > 1 else ""
+        tempo = deck[2] if len(deck) > 2 else "lock"
+        bridge.add_deck(deck[0], remap, tempo)
+    if args.play:
+        bridge.play()
+        if args.deck:
+            bridge.play_decks()
+
+
+def run_headless(args) -> int:
+    bridge = OSCMIDIBridge(args.config, config_overrides(args))
+    bridge.start()
+    try:
+        started = bridge.start_server(args.mode, int(bridge.saved_port), bridge.saved_out_ip,
+                                      int(bridge.saved_out_port), bridge.saved_midi_port, bridge.saved_midi_out_port)
+    except ValueError as e:
+        bridge.log_message(f"Invalid port number: {e}", level=logging.ERROR)
+        started = False
+    if not started:
+        bridge.shutdown()
+        return 1
+    bridge.report_startup_time("Server ready")
+    apply_playlist_args(bridge, args)
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    # Short waits so Ctrl+C is noticed promptly on Windows too.
+    while not stop.wait(0.5):
+        pass
+    bridge.shutdown()
+    return 0
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    level = logging.INFO if args.log_level is None else args.log_level
+    backend = LogBackend(level, args.log_file or None, args.log_json)
+    backend.start()
+    try:
+        return run(args)
+    finally:
+        backend.stop()
+
+
+def run_load_test(args) -> int:
+    """--replay or --flood: drives a bridge that is already running, logs the report and exits."""
+    port = args.osc_in_port
+    if port is None:
+        try:
+            with open(args.config) as f:
+                port = int(json.load(f).get("osc_in_port", 5550))
+        except (OSError, ValueError):
+            port = 5550
+    generator = LoadGenerator(args.target_host, port)
+    midi_out = None
+    try:
+        if args.replay:
+            if args.replay_midi:
+                midi_out = mido.open_output(args.replay_midi)
+            logging.info(f"Replaying {args.replay} at {args.speed:g}x to {args.target_host}:{port}")
+            report = generator.replay(args.replay, args.speed, midi_out)
+        else:
+            logging.info(f"Flooding {args.target_host}:{port} with {args.flood:g} msg/s for {args.flood_duration:g} s")
+            report = generator.flood(args.flood, args.flood_duration, parse_flood_mix(args.flood_mix),
+                                     args.flood_channels)
+    except (OSError, ValueError) as e:
+        logging.error(f"Load test failed: {e}")
+        return 1
+    finally:
+        generator.close()
+        if midi_out:
+            midi_out.close()
+    for line in LoadGenerator.describe(report).splitlines():
+        logging.info(line)
+    return 0
+
+
+def run(args) -> int:
+    if args.replay or args.flood:
+        return run_load_test(args)
+    if args.export_mid:
+        journal, out_path = args.export_mid
+        try:
+            count = export_journal_midi(journal, out_path)
+        except (OSError, ValueError) as e:
+            logging.error(f"Export failed: {journal}: {e}")
+            return 1
+        logging.info(f"Exported {count} MIDI events from {journal} to {out_path}")
+        return 0
+    if args.headless:
+        return run_headless(args)
+    import_tk()
+    root = tk.Tk()
+    root.geometry("500x420")
+    app = OSCMIDIApp(root, args.config, config_overrides(args))
+    root.protocol("WM_DELETE_WINDOW", app.quit_app)
+    apply_playlist_args(app, args)
+    root.mainloop()
+    return 0
+
+# ---------------- Main Execution ----------------
+if __name__ == "__main__":
+    mp.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import importlib.util
+import os
+
+import pytest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Patchworld OSC.py")
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The app module; its file name has a space, so it is loaded by path."""
+    spec = importlib.util.spec_from_file_location("patchworld_osc", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
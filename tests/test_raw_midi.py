@@ -0,0 +1,24 @@
+import mido
+import pytest
+from pythonosc import osc_message
+
+
+def round_trip(app, msg):
+    dgram = app.raw_midi_message("/midi", msg.bytes()).dgram
+    arg = osc_message.OscMessage(dgram).params[0]
+    return mido.Message.from_bytes(app.raw_midi_bytes(arg))
+
+
+@pytest.mark.parametrize("data", [(), (0x01,), (0x7D, 0x10, 0x01, 0x7F)])
+def test_sysex_round_trip(app, data):
+    msg = mido.Message("sysex", data=data)
+    assert round_trip(app, msg) == msg
+
+
+@pytest.mark.parametrize("msg", [
+    mido.Message("note_on", channel=3, note=60, velocity=100),
+    mido.Message("program_change", channel=1, program=9),
+    mido.Message("clock"),
+])
+def test_short_message_round_trip(app, msg):
+    assert round_trip(app, msg) == msg
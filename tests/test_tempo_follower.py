@@ -0,0 +1,33 @@
+import pytest
+
+
+def feed_clock(follower, t, bpm, beats):
+    """Feeds beats of 24 ppqn MIDI Clock at bpm starting at t; returns the time after the last pulse."""
+    for _ in range(beats * 24):
+        follower.feed(t)
+        t += 60.0 / (bpm * 24)
+    return t
+
+
+def clock_follower(app):
+    return app.TempoFollower(24, alpha=0.1, beta=0.005, tolerance=0.15, acquire=24)
+
+
+@pytest.mark.parametrize("new_bpm", [100, 90, 110, 160, 64])
+def test_tempo_step_relocks_and_keeps_count(app, new_bpm):
+    follower = clock_follower(app)
+    t = feed_clock(follower, 0.0, 128, 32)
+    count = follower.count
+    feed_clock(follower, t, new_bpm, 64)
+    assert follower.bpm == pytest.approx(new_bpm, abs=0.1)
+    assert follower.count - count == 64 * 24
+
+
+def test_missed_pulse_counts_without_relock(app):
+    follower = clock_follower(app)
+    t = feed_clock(follower, 0.0, 120, 8)
+    count = follower.count
+    period = 60.0 / (120 * 24)
+    follower.feed(t + period)  # the pulse at t was lost
+    assert follower.count - count == 2
+    assert follower.bpm == pytest.approx(120, abs=0.1)